@@ -0,0 +1,91 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+import settings
+from auth_session import forget_token, session_token
+from data_factory import get_test_data
+from endpoints import api_url
+from result_log import LoggedTestCase
+from worker_context import at_session_end
+
+
+def new_session(token=None):
+    """requests.Session with a keep-alive connection pool, optionally logged in with an auth token"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.API_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if token:
+        session.cookies.set(settings.AUTH_COOKIE, token)
+    return session
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_api_session(role=None):
+    """This process's shared session for a role from settings.CREDENTIALS, or an anonymous one"""
+    with _sessions_lock:
+        if role not in _sessions:
+            _sessions[role] = new_session(session_token(role) if role else None)
+            at_session_end(_sessions[role].close)
+        return _sessions[role]
+
+
+def forget_api_session(role):
+    """Drop a role's session and its cached token, e.g. after the backend rejected the token"""
+    with _sessions_lock:
+        session = _sessions.pop(role, None)
+    if session:
+        session.close()
+    forget_token(role)
+
+
+class ApiTestCase(LoggedTestCase):
+    """Base class for tests that check the /api/v1 routes directly, without a browser"""
+
+    def setUp(self):
+        super().setUp()
+        # Seed before the first request, so listings already contain this run's records
+        get_test_data()
+
+    @property
+    def data(self):
+        """Users, products and orders seeded for this run (see data_factory.py)"""
+        return get_test_data()
+
+    def url(self, path):
+        return f"{api_url()}{settings.API_PREFIX}{path}"
+
+    def api(self, method, path, role=None, session=None, **kwargs):
+        """Send a request with the shared session for role, or with session, e.g. one from self.login()"""
+        if session is not None or role is None:
+            return (session or get_api_session()).request(method, self.url(path), timeout=settings.API_TIMEOUT, **kwargs)
+        response = get_api_session(role).request(method, self.url(path), timeout=settings.API_TIMEOUT, **kwargs)
+        if response.status_code == 401:
+            # The cached token is no longer accepted, e.g. the backend restarted; log in again once
+            self.log("AUTH", f"{role} token rejected by {method} {path}, logging in again")
+            forget_api_session(role)
+            response = get_api_session(role).request(method, self.url(path), timeout=settings.API_TIMEOUT, **kwargs)
+        return response
+
+    def new_session(self):
+        """A session of its own, for tests that log in or change the account they use; closed after the test"""
+        session = new_session()
+        self.addCleanup(session.close)
+        return session
+
+    def login(self, credentials):
+        session = self.new_session()
+        response = self.api("POST", "/login", session=session, json={"email": credentials["email"], "password": credentials["password"]})
+        self.assertEqual(200, response.status_code, response.text)
+        return session
+
+    def assertSuccess(self, response, status=200):
+        """Check the status and the {"success": true} envelope, and return the parsed body"""
+        self.assertEqual(status, response.status_code, f"{response.request.method} {response.url}: {response.text[:200]}")
+        payload = response.json()
+        self.assertTrue(payload.get("success"), payload)
+        return payload
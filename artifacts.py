@@ -0,0 +1,71 @@
+import json
+import os
+
+from worker_context import RUN_ID, WORKER_ID
+
+
+def produces(*names):
+    """Mark a test as the source of the named artifacts; run_tests.py schedules it before their consumers"""
+    def decorate(test_method):
+        test_method.produces = names
+        return test_method
+    return decorate
+
+
+def consumes(*names):
+    """Mark a test as reading the named artifacts; it starts once their producers have finished"""
+    def decorate(test_method):
+        test_method.consumes = names
+        return test_method
+    return decorate
+
+
+def declared(test_case):
+    """(produces, consumes) of the test method a TestCase instance will run"""
+    method = getattr(test_case, getattr(test_case, "_testMethodName", ""), None)
+    return tuple(getattr(method, "produces", ())), tuple(getattr(method, "consumes", ()))
+
+
+class ArtifactStore:
+    """Values tests hand to each other, kept in memory and mirrored to per-run files for other workers"""
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._values = {}
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.json")
+
+    def __setitem__(self, name, value):
+        self._values[name] = value
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            temp_path = f"{self._path(name)}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(value, f)
+            os.replace(temp_path, self._path(name))
+
+    def get(self, name, default=None):
+        if name not in self._values and self.directory:
+            try:
+                with open(self._path(name)) as f:
+                    self._values[name] = json.load(f)
+            except (OSError, ValueError):
+                pass
+        return self._values.get(name, default)
+
+    def __getitem__(self, name):
+        """Missing artifacts read as None so consumers can fall back to doing the work themselves"""
+        return self.get(name)
+
+
+_store = None
+
+
+def get_artifacts():
+    global _store
+    if _store is None:
+        # Runner workers share one directory per run; a module run directly keeps everything in memory
+        directory = os.path.join("test_runs", RUN_ID, "artifacts") if WORKER_ID else None
+        _store = ArtifactStore(directory)
+    return _store
@@ -0,0 +1,66 @@
+import json
+import threading
+import urllib.request
+from http.cookies import SimpleCookie
+from selenium.common.exceptions import WebDriverException
+
+import settings
+from endpoints import api_url
+from result_log import log
+
+_tokens = {}
+_lock = threading.Lock()
+
+
+def request_token(email, password):
+    """Log in through POST /api/v1/login and return the auth token the backend issued"""
+    request = urllib.request.Request(
+        f"{api_url()}{settings.API_PREFIX}/login",
+        data=json.dumps({"email": email, "password": password}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        cookies = SimpleCookie()
+        for header in response.headers.get_all("Set-Cookie") or []:
+            cookies.load(header)
+        payload = json.loads(response.read().decode("utf-8"))
+
+    if settings.AUTH_COOKIE in cookies:
+        return cookies[settings.AUTH_COOKIE].value
+    if payload.get("token"):
+        return payload["token"]
+    raise Exception(f"Login for {email} returned no {settings.AUTH_COOKIE} cookie")
+
+
+def session_token(role):
+    """Token for a role from settings.CREDENTIALS, fetched once per test session"""
+    with _lock:
+        if role not in _tokens:
+            credentials = settings.CREDENTIALS[role]
+            _tokens[role] = request_token(credentials["email"], credentials["password"])
+            log("AUTH", f"Cached {role} session for {credentials['email']}")
+        return _tokens[role]
+
+
+def forget_token(role):
+    """Drop a cached token the backend rejected, so the next session_token(role) logs in again"""
+    with _lock:
+        _tokens.pop(role, None)
+
+
+def inject_token(driver, token):
+    """Put the auth cookie into the browser without loading a page first"""
+    try:
+        # Cookies ignore ports, so one host-only cookie covers both the frontend and the API origin
+        driver.execute_cdp_cmd("Network.setCookie", {
+            "name": settings.AUTH_COOKIE,
+            "value": token,
+            "url": settings.API_URL,
+            "path": "/",
+            "httpOnly": True,
+            "sameSite": "Lax",
+        })
+    except (AttributeError, WebDriverException):
+        driver.get(settings.BASE_URL)
+        driver.add_cookie({"name": settings.AUTH_COOKIE, "value": token, "path": "/", "httpOnly": True, "sameSite": "Lax"})
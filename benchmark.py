@@ -0,0 +1,256 @@
+import os
+
+# Benchmarks always run against the in-memory stand-in so the numbers do not depend on Express or MongoDB
+os.environ.setdefault("STUB_BACKEND", "1")
+
+import argparse
+import json
+import math
+import statistics
+import sys
+import time
+from datetime import datetime
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+
+import settings
+from auth_session import inject_token, session_token
+from data_factory import get_test_data
+from driver_pool import get_pool
+from waits import PageWaiter
+from worker_context import RUN_ID
+
+METRICS = ["wall", "setup", "teardown", "sleep", "round_trips"]
+
+
+class SleepMeter:
+    """Adds up every time.sleep call made while active, including WebDriverWait's polling"""
+
+    def __init__(self):
+        self.total = 0.0
+        self._sleep = time.sleep
+
+    def _measured_sleep(self, seconds):
+        self.total += seconds
+        self._sleep(seconds)
+
+    def __enter__(self):
+        time.sleep = self._measured_sleep
+        return self
+
+    def __exit__(self, *exc_info):
+        time.sleep = self._sleep
+
+
+class FlowFailed(Exception):
+    pass
+
+
+class Session:
+    def __init__(self, driver):
+        self.driver = driver
+        self.waiter = PageWaiter(driver)
+        self.data = get_test_data()
+
+    def ready(self, locator=None, label=None):
+        """PageWaiter.ready that fails the flow instead of returning None, so a broken page is not timed"""
+        result = self.waiter.ready(locator, label=label)
+        if result is None:
+            raise FlowFailed(f"{label or (locator and locator[1]) or self.driver.current_url} never became ready")
+        return result
+
+    def open(self, path, locator=None):
+        self.driver.get(f"{settings.BASE_URL}{path}")
+        return self.ready(locator)
+
+    def type(self, element_id, text):
+        field = self.ready((By.ID, element_id))
+        field.clear()
+        field.send_keys(text)
+
+
+def login(session):
+    user = session.data.user()
+    session.open("/login", (By.ID, "email_field"))
+    session.type("email_field", user["email"])
+    session.type("password_field", user["password"])
+    session.driver.find_element(By.ID, "login_button").click()
+    session.ready(label="login submit")
+
+
+def search(session):
+    session.open("/", (By.ID, "search_field"))
+    session.type("search_field", "MacBook")
+    session.driver.find_element(By.ID, "search_btn").click()
+    session.ready((By.CSS_SELECTOR, ".card-title"), label="search results")
+
+
+def add_to_cart(session):
+    session.open(f"/product/{session.data.products[0]['_id']}", (By.ID, "cart_btn")).click()
+    session.ready(label="add to cart")
+
+
+def prepare_checkout(session):
+    inject_token(session.driver, session_token("user"))
+    add_to_cart(session)
+
+
+def checkout_shipping(session):
+    session.open("/shipping", (By.ID, "address_field"))
+    session.type("address_field", "123 Test St")
+    session.type("city_field", "Test City")
+    session.type("phone_field", "1234567890")
+    session.type("postal_code_field", "12345")
+    session.type("country_field", "United States")
+    session.driver.find_element(By.ID, "shipping_btn").click()
+    session.ready(label="shipping submit")
+
+
+def prepare_admin(session):
+    inject_token(session.driver, session_token("admin"))
+
+
+def admin_product_list(session):
+    session.open("/admin/products", (By.CSS_SELECTOR, "table tbody tr"))
+
+
+# name: (prepare, flow); prepare runs as part of setup and is not counted in the flow's wall time
+FLOWS = {
+    "login": (None, login),
+    "search": (None, search),
+    "add_to_cart": (None, add_to_cart),
+    "checkout_shipping": (prepare_checkout, checkout_shipping),
+    "admin_product_list": (prepare_admin, admin_product_list),
+}
+
+
+def run_once(prepare, flow):
+    pool = get_pool()
+
+    started = time.perf_counter()
+    driver = pool.acquire()
+    session = Session(driver)
+    if prepare:
+        prepare(session)
+    setup = time.perf_counter() - started
+
+    commands = driver.command_count
+    failure = None
+    with SleepMeter() as sleeps:
+        started = time.perf_counter()
+        try:
+            flow(session)
+        except (FlowFailed, WebDriverException) as e:
+            failure = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+        wall = time.perf_counter() - started
+    round_trips = driver.command_count - commands
+
+    started = time.perf_counter()
+    pool.release(driver)
+    teardown = time.perf_counter() - started
+
+    sample = {"wall": wall, "setup": setup, "teardown": teardown, "sleep": sleeps.total, "round_trips": round_trips}
+    if failure:
+        sample["failed"] = failure
+    return sample
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(samples):
+    """Median and p95 over the runs that completed; failed runs are only counted"""
+    completed = [sample for sample in samples if "failed" not in sample]
+    summary = {"failed": len(samples) - len(completed)}
+    if not completed:
+        return summary
+    for metric in METRICS:
+        values = [sample[metric] for sample in completed]
+        summary[metric] = {"median": statistics.median(values), "p95": percentile(values, 0.95)}
+    summary["sleep"]["total"] = sum(sample["sleep"] for sample in completed)
+    return summary
+
+
+def run_benchmarks(flows, repeat, warmup):
+    results = {}
+    for name in flows:
+        prepare, flow = FLOWS[name]
+        for _ in range(warmup):
+            run_once(prepare, flow)
+        samples = [run_once(prepare, flow) for _ in range(repeat)]
+        results[name] = {"samples": samples, "summary": summarize(samples)}
+        summary = results[name]["summary"]
+        for sample in samples:
+            if "failed" in sample:
+                print(f"[BENCH] {name}: run failed: {sample['failed']}")
+        if "wall" in summary:
+            completed = repeat - summary["failed"]
+            print(f"[BENCH] {name}: median {summary['wall']['median']:.3f}s, p95 {summary['wall']['p95']:.3f}s over {completed} runs, {summary['failed']} failed")
+        else:
+            print(f"[BENCH] {name}: all {repeat} runs failed")
+    return results
+
+
+def print_report(results):
+    print(f"{'flow':<20} {'median':>8} {'p95':>8} {'setup':>8} {'teardown':>9} {'sleep':>8} {'trips':>6} {'failed':>6}")
+    for name, result in results.items():
+        summary = result["summary"]
+        if "wall" not in summary:
+            print(f"{name:<20} {'-':>8} {'-':>8} {'-':>8} {'-':>9} {'-':>8} {'-':>6} {summary['failed']:>6}")
+            continue
+        print(
+            f"{name:<20} {summary['wall']['median']:>8.3f} {summary['wall']['p95']:>8.3f} "
+            f"{summary['setup']['median']:>8.3f} {summary['teardown']['median']:>9.3f} "
+            f"{summary['sleep']['total']:>8.2f} {summary['round_trips']['median']:>6.0f} {summary['failed']:>6}"
+        )
+
+
+def print_comparison(baseline, results):
+    """Median change per flow and metric against an earlier benchmark file"""
+    print(f"{'flow':<20} {'metric':<12} {'before':>9} {'after':>9} {'change':>8}")
+    for name, result in results.items():
+        if name not in baseline["flows"] or "wall" not in result["summary"] or "wall" not in baseline["flows"][name]["summary"]:
+            continue
+        for metric in METRICS:
+            before = baseline["flows"][name]["summary"][metric]["median"]
+            after = result["summary"][metric]["median"]
+            change = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+            print(f"{name:<20} {metric:<12} {before:>9.3f} {after:>9.3f} {change:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time representative UI flows against the in-memory backend stand-in")
+    parser.add_argument("flows", nargs="*", default=list(FLOWS), help=f"flows to run: {', '.join(FLOWS)}")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="measured runs per flow")
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured runs per flow, e.g. to start the browser")
+    parser.add_argument("-o", "--output", default=os.path.join("benchmarks", f"bench-{RUN_ID}.json"), help="where to write the results")
+    parser.add_argument("--compare", help="earlier results file to compare medians against")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.flows if name not in FLOWS]
+    if unknown:
+        parser.error(f"unknown flows: {', '.join(unknown)}")
+
+    results = run_benchmarks(args.flows, args.repeat, args.warmup)
+    print_report(results)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "repeat": args.repeat,
+        "profile": {"browser": settings.BROWSER_PROFILE, "block_resources": settings.BLOCK_RESOURCES, "stub_backend": settings.STUB_BACKEND},
+        "flows": results,
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[BENCH] Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), results)
+    return 0 if not any(result["summary"]["failed"] for result in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import settings
+from auth_session import inject_token, session_token
+from data_factory import get_test_data
+from db import get_db
+from driver_pool import get_pool
+from flake_tracker import fingerprint_exception
+from impact import visited
+from instrumentation import get_tracer
+from resource_blocking import allowed_for, apply_blocking
+from result_log import LoggedTestCase
+from screenshots import ScreenshotRecorder
+from waits import PageWaiter
+from web_vitals import collect
+
+
+class BrowserTestCase(LoggedTestCase):
+    """Base class for UI tests that borrow a browser from the shared pool"""
+
+    def setUp(self):
+        super().setUp()
+        get_tracer().begin_test(self.id())
+        # Registered first so it runs last, after the browser is back in the pool
+        self.addCleanup(get_tracer().end_test)
+        with get_tracer().span("acquire", "pool"):
+            self.driver = get_pool().acquire()
+        # Cleanups run even when a subclass setUp fails, so the browser always goes back to the pool
+        self.addCleanup(self._release_driver)
+        self.impact = None
+        self.vitals = []
+        self.addCleanup(self._record_impact)
+        if settings.BLOCK_RESOURCES:
+            apply_blocking(self.driver, allowed_for(self))
+        self.waiter = PageWaiter(self.driver)
+        self.tolerated = []
+        self.screenshots = ScreenshotRecorder(self.driver)
+        self.addCleanup(self._finish_screenshots)
+
+    @property
+    def data(self):
+        """Users, products and orders seeded for this run (see data_factory.py)"""
+        return get_test_data()
+
+    @property
+    def db(self):
+        """The shop database through the process-wide pooled client (see db.py)"""
+        return get_db()
+
+    def tolerate(self, step, error):
+        """Carry on past an error the test accepts, but keep its fingerprint so the runner can report it"""
+        tolerated = fingerprint_exception(error, step, self._testMethodName)
+        self.tolerated.append(tolerated)
+        self.log("FLAKE", f"Tolerated {tolerated['exception'] or type(error).__name__} in {step} ({tolerated['id']})")
+
+    def login_as(self, role, path=None):
+        """Authenticate the browser with the cached API session for role, then open path if given"""
+        inject_token(self.driver, session_token(role))
+        if path is not None:
+            self.driver.get(f"{settings.BASE_URL}{path}")
+            self.waiter.ready()
+
+    def _finish_screenshots(self):
+        if self.has_failed():
+            self.log("SCREENSHOT", f"Test failed, saving last {len(self.screenshots.frames)} frames")
+            self.screenshots.flush()
+        else:
+            self.screenshots.discard()
+
+    def _record_impact(self):
+        """Keep the routes and API calls this test reached, and how fast its pages rendered, for run_tests.py"""
+        if self.driver:
+            self.impact = visited(self.driver)
+            if settings.VITALS:
+                self.vitals = collect(self.driver)
+
+    def _release_driver(self):
+        if self.driver:
+            with get_tracer().span("release", "pool"):
+                get_pool().release(self.driver)
+            self.driver = None
+
+    def tearDown(self):
+        if self.waiter.timings:
+            self.log("WAIT", self.waiter.summary())
@@ -0,0 +1,198 @@
+import hashlib
+import itertools
+import json
+import threading
+import urllib.request
+from datetime import datetime, timezone
+
+from bson import ObjectId
+
+import settings
+from db import get_db
+from endpoints import api_url
+from result_log import log
+from stub_backend import get_stub
+from worker_context import at_session_end, namespace
+
+try:
+    import bcrypt
+except ImportError:
+    # Without bcrypt users are created through POST /api/v1/register so the backend hashes their passwords
+    bcrypt = None
+
+DEFAULT_PASSWORD = "Test@123456"
+
+_counter = itertools.count(1)
+_counter_lock = threading.Lock()
+
+
+def run_scoped_id(kind):
+    """Identifier unique to this run and worker, e.g. 3fa9c1w2-user-4"""
+    with _counter_lock:
+        return f"{namespace()}-{kind}-{next(_counter)}"
+
+
+def object_id(key):
+    """ObjectId derived from a run-scoped key, so a run with a fixed TEST_RUN_ID makes the same requests again"""
+    return str(ObjectId(hashlib.sha1(key.encode("utf-8")).hexdigest()[:24]))
+
+
+def build_user(role="user"):
+    key = run_scoped_id("user")
+    return {
+        "_id": object_id(key),
+        "name": f"Test User {key}",
+        "email": f"testuser-{key}@example.com",
+        "password": DEFAULT_PASSWORD,
+        "avatar": {
+            "public_id": "avatars/default_avatar",
+            "url": "https://res.cloudinary.com/dxqnb8xjb/image/upload/v1602395872/avatars/default_avatar.jpg",
+        },
+        "role": role,
+    }
+
+
+def build_product(owner):
+    key = run_scoped_id("product")
+    return {
+        "_id": object_id(key),
+        "name": f"Test Product {key}",
+        "price": 99.99,
+        "description": "This is a test product description",
+        "ratings": 0,
+        "images": [{"public_id": f"products/{key}", "url": "http://example.com/image.jpg"}],
+        "category": "Electronics",
+        "seller": "Test Seller",
+        "stock": 50,
+        "numOfReviews": 0,
+        "reviews": [],
+        "user": owner["_id"],
+    }
+
+
+def build_order(user, products):
+    items = [
+        {"name": product["name"], "quantity": 1, "image": product["images"][0]["url"], "price": product["price"], "product": product["_id"]}
+        for product in products
+    ]
+    items_price = round(sum(item["price"] for item in items), 2)
+    return {
+        "_id": object_id(run_scoped_id("order")),
+        "shippingInfo": {"address": "123 Test St", "city": "Test City", "phoneNo": "1234567890", "postalCode": "12345", "country": "United States"},
+        "user": user["_id"],
+        "orderItems": items,
+        "paymentInfo": {"id": f"pi_{run_scoped_id('payment')}", "status": "succeeded"},
+        "itemsPrice": items_price,
+        "taxPrice": 0.0,
+        "shippingPrice": 0.0,
+        "totalPrice": items_price,
+        "orderStatus": "Processing",
+    }
+
+
+def _to_mongo(record):
+    """Copy of a record with ObjectId references and datetimes, as Mongoose would have stored it"""
+    document = dict(record, _id=ObjectId(record["_id"]), createdAt=datetime.now(timezone.utc))
+    if "user" in document:
+        document["user"] = ObjectId(document["user"])
+    if "orderItems" in document:
+        document["orderItems"] = [dict(item, product=ObjectId(item["product"])) for item in document["orderItems"]]
+        document["paidAt"] = document["createdAt"]
+    return document
+
+
+def _register(user):
+    """Create a user through the API and return the id the backend assigned"""
+    request = urllib.request.Request(
+        f"{api_url()}{settings.API_PREFIX}/register",
+        data=json.dumps({key: user[key] for key in ("name", "email", "password")}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read().decode("utf-8"))["user"]["_id"]
+
+
+class TestData:
+    """Users, products and orders a run needs, created up front with one bulk insert per collection"""
+
+    def __init__(self, users=2, products=2, orders=1):
+        self.users = [build_user() for _ in range(users)]
+        owner = build_user("admin")
+        self.products = [build_product(owner) for _ in range(products)]
+        self.orders = [build_order(self.users[0], self.products) for _ in range(orders)]
+        self._owner = owner
+        self._seeded_mongo = False
+
+    def user(self, index=0):
+        """Credentials of a seeded user, in the shape the tests fill into forms"""
+        user = self.users[index]
+        return {"name": user["name"], "email": user["email"], "password": user["password"]}
+
+    def new_user(self):
+        """Credentials for an account that does not exist yet, e.g. for the registration test"""
+        user = build_user()
+        return {"name": user["name"], "email": user["email"], "password": user["password"]}
+
+    def seed(self):
+        if settings.HTTP_CACHE == "replay":
+            log("DATA", f"Replaying recorded API responses, not seeding records for {namespace()}")
+            return
+        if settings.STUB_BACKEND:
+            store = get_stub().store
+            store.insert_many("users", self.users + [self._owner])
+            store.insert_many("products", self.products)
+            store.insert_many("orders", self.orders)
+        else:
+            self._seed_mongo()
+        log("DATA", f"Seeded {len(self.users)} users, {len(self.products)} products, {len(self.orders)} orders for {namespace()}")
+
+    def _seed_mongo(self):
+        db = get_db()
+        self._seeded_mongo = True
+
+        users = self.users + [self._owner]
+        if bcrypt:
+            # Few rounds keep seeding fast; bcryptjs reads the cost from the hash when comparing
+            documents = []
+            for user in users:
+                hashed = bcrypt.hashpw(user["password"].encode("utf-8"), bcrypt.gensalt(rounds=4, prefix=b"2a"))
+                documents.append(dict(_to_mongo(user), password=hashed.decode("utf-8")))
+            db.users.insert_many(documents)
+        else:
+            assigned = {}
+            for user in users:
+                assigned[user["_id"]] = _register(user)
+                user["_id"] = assigned[user["_id"]]
+            db.users.update_one({"_id": ObjectId(self._owner["_id"])}, {"$set": {"role": "admin"}})
+            for record in self.products + self.orders:
+                record["user"] = assigned.get(record["user"], record["user"])
+
+        db.products.insert_many([_to_mongo(product) for product in self.products])
+        if self.orders:
+            db.orders.insert_many([_to_mongo(order) for order in self.orders])
+
+    def cleanup(self):
+        """Remove this run's records again; the in-memory stand-in simply goes away with the process"""
+        if not self._seeded_mongo:
+            return
+        db = get_db()
+        for collection, records in (("users", self.users + [self._owner]), ("products", self.products), ("orders", self.orders)):
+            db[collection].delete_many({"_id": {"$in": [ObjectId(record["_id"]) for record in records]}})
+
+
+_data = None
+_data_lock = threading.Lock()
+
+
+def get_test_data():
+    """This worker's seeded fixtures, created on first use and removed when the session ends"""
+    global _data
+    with _data_lock:
+        if _data is None:
+            data = TestData()
+            data.seed()
+            # Registered after seeding so it runs before the shared database client closes
+            at_session_end(data.cleanup)
+            _data = data
+        return _data
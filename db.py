@@ -0,0 +1,124 @@
+import threading
+
+import pymongo
+from pymongo import monitoring
+
+import settings
+from result_log import log
+from worker_context import at_session_end
+
+
+class DatabaseStats(monitoring.CommandListener, monitoring.ConnectionPoolListener):
+    """Counts connections and times every command the suite sends to MongoDB"""
+
+    def __init__(self):
+        self.commands = {}
+        self.failures = 0
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self._lock = threading.Lock()
+
+    def _command_done(self, event):
+        with self._lock:
+            count, total, slowest = self.commands.get(event.command_name, (0, 0.0, 0.0))
+            elapsed = event.duration_micros / 1000
+            self.commands[event.command_name] = (count + 1, total + elapsed, max(slowest, elapsed))
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._command_done(event)
+
+    def failed(self, event):
+        self._command_done(event)
+        with self._lock:
+            self.failures += 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use -= 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def summary(self):
+        with self._lock:
+            count = sum(count for count, _, _ in self.commands.values())
+            total = sum(total for _, total, _ in self.commands.values())
+            lines = [
+                f"{count} commands in {total:.1f}ms ({self.failures} failed), "
+                f"{self.connections_created} connections opened for {self.checkouts} checkouts, "
+                f"at most {self.max_in_use} in use"
+            ]
+            for name, (count, total, slowest) in sorted(self.commands.items(), key=lambda item: -item[1][1]):
+                lines.append(f"  {name:<16} {count:>5} x  avg {total / count:.2f}ms  max {slowest:.2f}ms")
+        return lines
+
+
+stats = DatabaseStats()
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _close():
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
+    for line in stats.summary():
+        log("DB", line)
+
+
+def get_db():
+    """The shop database through one pooled client per test process, closed when the session ends"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = pymongo.MongoClient(
+                settings.MONGO_URL,
+                maxPoolSize=settings.MONGO_POOL_SIZE,
+                serverSelectionTimeoutMS=5000,
+                event_listeners=[stats],
+            )
+            at_session_end(_close)
+        return _client[settings.MONGO_DB]
@@ -0,0 +1,43 @@
+EXTRACT_JS = """
+var selectors = arguments[0];
+var root = arguments[1] || document;
+
+function describe(el) {
+  var attributes = {};
+  for (var i = 0; i < el.attributes.length; i++) {
+    attributes[el.attributes[i].name] = el.attributes[i].value;
+  }
+  var rect = el.getBoundingClientRect();
+  var style = window.getComputedStyle(el);
+  return {
+    element: el,
+    tag: el.tagName.toLowerCase(),
+    attributes: attributes,
+    text: (el.innerText || '').trim(),
+    value: el.value === undefined ? null : el.value,
+    href: el.href || null,
+    visible: rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden' && style.display !== 'none',
+    rect: { x: rect.x, y: rect.y, width: rect.width, height: rect.height }
+  };
+}
+
+for (var s = 0; s < selectors.length; s++) {
+  var nodes;
+  try { nodes = root.querySelectorAll(selectors[s]); } catch (e) { continue; }
+  if (nodes.length > 0) {
+    var matches = [];
+    for (var n = 0; n < nodes.length; n++) { matches.push(describe(nodes[n])); }
+    return matches;
+  }
+}
+return [];
+"""
+
+
+def extract(driver, selectors, root=None):
+    """Describe every element matching a CSS selector (or the first matching selector of a list) in one call"""
+    # Each match also carries its WebElement under "element" for tests that still need to click or type;
+    # "href" is the resolved absolute link like WebElement.get_attribute("href") returns
+    if isinstance(selectors, str):
+        selectors = [selectors]
+    return driver.execute_script(EXTRACT_JS, list(selectors), root)
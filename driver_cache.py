@@ -0,0 +1,146 @@
+import glob
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+import settings
+from result_log import log
+
+VERSION_PATTERN = re.compile(r"(\d+)\.\d+\.\d+\.\d+")
+
+CHROME_COMMANDS = [
+    "google-chrome",
+    "google-chrome-stable",
+    "chromium",
+    "chromium-browser",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+
+_resolved = None
+
+
+def _version_of(command):
+    try:
+        output = subprocess.run([command, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = VERSION_PATTERN.search(output)
+    return match.group(0) if match else None
+
+
+def _windows_chrome_version():
+    try:
+        import winreg
+    except ImportError:
+        return None
+    for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+        try:
+            with winreg.OpenKey(hive, r"Software\Google\Chrome\BLBeacon") as key:
+                return winreg.QueryValueEx(key, "version")[0]
+        except OSError:
+            continue
+    return None
+
+
+def chrome_version():
+    """Full version of the locally installed Chrome, or None if it cannot be found offline"""
+    if sys.platform.startswith("win"):
+        return _windows_chrome_version()
+    for command in CHROME_COMMANDS:
+        version = _version_of(command)
+        if version:
+            return version
+    return None
+
+
+def _major(version):
+    return version.split(".")[0] if version else None
+
+
+def _load_cache():
+    try:
+        with open(settings.DRIVER_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache):
+    os.makedirs(os.path.dirname(settings.DRIVER_CACHE_FILE), exist_ok=True)
+    temp_path = f"{settings.DRIVER_CACHE_FILE}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(temp_path, settings.DRIVER_CACHE_FILE)
+
+
+def _cached_driver(cache, version):
+    """Exact version first; any chromedriver recorded for the same major version also works"""
+    candidates = [cache.get(version)]
+    candidates += [path for key, path in cache.items() if _major(key) == _major(version)]
+    for path in candidates:
+        if path and os.path.isfile(path):
+            return path
+    return None
+
+
+def _local_driver(version):
+    """Look for a matching chromedriver already on disk, without touching the network"""
+    executable = "chromedriver.exe" if sys.platform.startswith("win") else "chromedriver"
+    candidates = [shutil.which(executable)]
+    candidates += sorted(glob.glob(os.path.join(os.path.expanduser("~"), ".wdm", "drivers", "chromedriver", "**", executable), recursive=True), reverse=True)
+
+    for path in candidates:
+        if not path:
+            continue
+        driver_version = _version_of(path)
+        if driver_version and (version is None or _major(driver_version) == _major(version)):
+            return path
+    return None
+
+
+def _download_driver():
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+
+def resolve_chromedriver():
+    """Path to a chromedriver matching the installed Chrome, resolved once and cached on disk"""
+    global _resolved
+    if _resolved:
+        return _resolved
+
+    if settings.CHROMEDRIVER_PATH:
+        _resolved = settings.CHROMEDRIVER_PATH
+        return _resolved
+
+    version = chrome_version()
+    if version is None:
+        # Without a version a cached driver could belong to any Chrome, so the cache is neither read nor written
+        log("DRIVER", "Could not detect the Chrome version, not using the chromedriver cache")
+        path = _local_driver(None)
+        if path is None:
+            if settings.DRIVER_OFFLINE:
+                raise Exception("Chrome version unknown and DRIVER_OFFLINE is set; install Chrome or set CHROMEDRIVER_PATH")
+            path = _download_driver()
+        _resolved = path
+        return _resolved
+
+    cache = _load_cache()
+    path = _cached_driver(cache, version)
+
+    if path is None:
+        path = _local_driver(version)
+        if path is None:
+            if settings.DRIVER_OFFLINE:
+                raise Exception(f"No cached chromedriver for Chrome {version} and DRIVER_OFFLINE is set")
+            log("DRIVER", f"Downloading chromedriver for Chrome {version}")
+            path = _download_driver()
+        cache[version] = path
+        _save_cache(cache)
+        log("DRIVER", f"Cached chromedriver for Chrome {version}: {path}")
+
+    _resolved = path
+    return _resolved
@@ -0,0 +1,151 @@
+import threading
+from urllib.parse import urlsplit
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+
+import settings
+from driver_cache import resolve_chromedriver
+from http_cache import get_http_cache
+from impact import install_impact_hooks
+from instrumentation import get_tracer, instrument_driver
+from payment_stub import install_payment_stub
+from result_log import log
+from stub_backend import get_stub
+from waits import install_page_hooks
+from web_vitals import install_vitals_hooks
+from worker_context import at_session_end
+
+
+def create_driver():
+    """Launch a new Chrome instance with the suite's standard options"""
+    chrome_options = Options()
+    for argument in settings.CHROME_ARGUMENTS:
+        chrome_options.add_argument(argument)
+    if settings.HEADLESS:
+        chrome_options.add_argument("--headless=new")
+    # The frontend calls the API origin directly; route that origin through this worker's cache or stand-in
+    if settings.HTTP_CACHE:
+        proxy_arguments = get_http_cache().chrome_arguments()
+    elif settings.STUB_BACKEND:
+        proxy_arguments = get_stub().chrome_arguments()
+    else:
+        proxy_arguments = []
+    for argument in proxy_arguments:
+        chrome_options.add_argument(argument)
+
+    driver = instrument_driver(webdriver.Chrome(service=Service(resolve_chromedriver()), options=chrome_options))
+    if not settings.HEADLESS:
+        driver.maximize_window()
+    install_page_hooks(driver)
+    install_impact_hooks(driver)
+    if settings.VITALS:
+        install_vitals_hooks(driver)
+    if settings.PAYMENT_STUB:
+        install_payment_stub(driver)
+    return driver
+
+
+def _origin(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _clear_browser_data(driver, current_url):
+    """Wipe cookies, cache and every storage type of the app's origins in a few CDP calls"""
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+    origins = {_origin(settings.BASE_URL), _origin(settings.API_URL)}
+    if current_url.startswith("http"):
+        origins.add(_origin(current_url))
+    for origin in origins:
+        # "all" covers localStorage, IndexedDB, Cache Storage and service workers
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+
+
+def reset_driver(driver):
+    """Bring a used browser back to a blank, logged-out state"""
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+    driver.switch_to.default_content()
+
+    current_url = driver.current_url
+    if current_url.startswith("http"):
+        # sessionStorage belongs to the tab rather than the origin, so CDP cannot reach it
+        driver.execute_script("window.sessionStorage.clear();")
+    try:
+        _clear_browser_data(driver, current_url)
+    except (AttributeError, WebDriverException):
+        if current_url.startswith("http"):
+            driver.execute_script("window.localStorage.clear();")
+        driver.delete_all_cookies()
+    driver.get("about:blank")
+
+
+class DriverPool:
+    """Hands out warm Chrome drivers and recycles them after max_uses tests"""
+
+    def __init__(self, max_uses=settings.DRIVER_MAX_USES, factory=create_driver):
+        self.max_uses = max_uses
+        self.factory = factory
+        self._idle = []
+        self._uses = {}
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            driver = self._idle.pop() if self._idle else None
+
+        if driver is None:
+            driver = self.factory()
+            self._uses[id(driver)] = 0
+            log("POOL", "Started new browser")
+
+        self._uses[id(driver)] += 1
+        return driver
+
+    def release(self, driver):
+        if self._uses.get(id(driver), 0) >= self.max_uses:
+            log("POOL", f"Browser reached {self.max_uses} uses, recycling")
+            self.discard(driver)
+            return
+
+        try:
+            with get_tracer().span("reset", "pool"):
+                reset_driver(driver)
+        except Exception as e:
+            log("POOL", f"Could not reset browser, discarding it: {str(e)}")
+            self.discard(driver)
+            return
+
+        with self._lock:
+            self._idle.append(driver)
+
+    def discard(self, driver):
+        self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def shutdown(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self.discard(driver)
+
+
+_pool = None
+
+
+def get_pool():
+    """Return the pool shared by every test in this process"""
+    global _pool
+    if _pool is None:
+        _pool = DriverPool()
+        at_session_end(_pool.shutdown)
+    return _pool
@@ -0,0 +1,18 @@
+import settings
+
+
+def backend_url():
+    """The backend that actually answers: the stand-in when STUB_BACKEND is set, else settings.API_URL"""
+    if settings.STUB_BACKEND:
+        # Imported here so runs against the real backend never load the stand-in
+        from stub_backend import get_stub
+        return get_stub().url
+    return settings.API_URL
+
+
+def api_url():
+    """Where Python-side clients reach the API, going through the record/replay cache when HTTP_CACHE is set"""
+    if settings.HTTP_CACHE:
+        from http_cache import get_http_cache
+        return get_http_cache().url
+    return backend_url()
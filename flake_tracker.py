@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import re
+import traceback
+
+import settings
+
+# Selenium's "Unable to locate element: {...}" messages, find_element_safely's "Could not find element by=value"
+# and locator tuples such as (By.ID, 'login_button')
+SELECTOR_PATTERNS = [
+    re.compile(r'"selector":\s*"((?:[^"\\]|\\.)*)"'),
+    re.compile(r"Could not find element ([^\n=]+=[^\n]+)"),
+    re.compile(r"\(By\.\w+,\s*['\"][^'\"]+['\"]\)"),
+]
+FRAME_PATTERN = re.compile(r'^  File "([^"]+)", line \d+, in (\S+)\n    (.+)$', re.MULTILINE)
+
+
+def _message(text):
+    """The exception line(s) after the last frame, so selectors in quoted source lines are not picked up"""
+    frames = list(FRAME_PATTERN.finditer(text))
+    return text[frames[-1].end():] if frames else text
+
+
+def _selector(message):
+    for pattern in SELECTOR_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            return (match.group(1) if match.groups() else match.group(0)).strip()
+    return ""
+
+
+def _step(text, test_method=""):
+    """Innermost test method line in the traceback, or failing that the innermost line of a test module or of
+    test_method; the source text survives edits that shift line numbers"""
+    all_frames = [(function, line.strip(), os.path.basename(filename)) for filename, function, line in FRAME_PATTERN.findall(text)]
+    frames = [(function, line) for function, line, filename in all_frames if filename.startswith("test_")]
+    steps = [frame for frame in frames if frame[0].startswith(("test", "setUp", "tearDown"))] or frames
+    if not steps and test_method:
+        steps = [(function, line) for function, line, _ in all_frames if function == test_method]
+    return f"{steps[-1][0]}: {steps[-1][1]}" if steps else ""
+
+
+def _exception_type(message):
+    for line in message.splitlines():
+        match = re.match(r"([A-Za-z_][\w.]*): ", line)
+        if match:
+            return match.group(1).rsplit(".", 1)[-1]
+    return ""
+
+
+def fingerprint(details, test_method=""):
+    """Exception type, selector and step of a formatted traceback, plus a short id to group identical failures"""
+    message = _message(details)
+    parts = {"exception": _exception_type(message), "selector": _selector(message), "step": _step(details, test_method)}
+    parts["id"] = hashlib.sha1("|".join(parts.values()).encode("utf-8")).hexdigest()[:10]
+    return parts
+
+
+def fingerprint_exception(error, step="", test_method=""):
+    """Fingerprint an exception a test caught itself; step names where when there is no test frame to point at"""
+    parts = fingerprint("".join(traceback.format_exception(type(error), error, error.__traceback__)), test_method)
+    if step and not parts["step"]:
+        parts["step"] = step
+        parts["id"] = hashlib.sha1("|".join((parts["exception"], parts["selector"], step)).encode("utf-8")).hexdigest()[:10]
+    return parts
+
+
+def is_failure(outcome):
+    return outcome in ("failed", "error", "quarantined")
+
+
+class FlakeHistory:
+    """Outcome of every test over the last runs, kept in one JSON file across runs"""
+
+    def __init__(self, path=settings.FLAKE_HISTORY_FILE, quarantine_path=settings.QUARANTINE_FILE, length=settings.FLAKE_HISTORY_LENGTH):
+        self.path = path
+        self.length = length
+        self.tests = {}
+        self.quarantined = {}
+        try:
+            with open(path) as f:
+                self.tests = json.load(f)
+        except (OSError, ValueError):
+            pass
+        # Hand-maintained {test_id: reason}; the history adds the tests it has seen flip
+        try:
+            with open(quarantine_path) as f:
+                self.quarantined = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def add(self, run_id, record):
+        runs = self.tests.setdefault(record["test_id"], [])
+        runs.append({
+            "run": run_id,
+            "outcome": record["outcome"],
+            "fingerprint": record.get("fingerprint"),
+            "tolerated": [tolerated["id"] for tolerated in record.get("tolerated", [])],
+        })
+        del runs[:-self.length]
+
+    def last_failed(self):
+        """Tests whose latest recorded outcome is a failure"""
+        return [test_id for test_id, runs in self.tests.items() if runs and is_failure(runs[-1]["outcome"])]
+
+    def flips(self, test_id):
+        outcomes = [is_failure(run["outcome"]) for run in self.tests.get(test_id, [])]
+        return sum(before != after for before, after in zip(outcomes, outcomes[1:]))
+
+    def passed_on_rerun(self, test_id):
+        return sum(run["outcome"] == "flaky" for run in self.tests.get(test_id, []))
+
+    def is_flaky(self, test_id):
+        """Passed only on a rerun in FLAKE_RERUN_PASSES runs, or went back and forth FLAKE_FLIPS times across the recorded runs"""
+        return self.passed_on_rerun(test_id) >= settings.FLAKE_RERUN_PASSES or self.flips(test_id) >= settings.FLAKE_FLIPS
+
+    def quarantine_reason(self, test_id):
+        if test_id in self.quarantined:
+            return self.quarantined[test_id]
+        if self.is_flaky(test_id):
+            runs = self.tests[test_id]
+            return f"passed on rerun {self.passed_on_rerun(test_id)} and flipped {self.flips(test_id)} times in the last {len(runs)} runs"
+        return None
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.tests, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path)
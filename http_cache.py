@@ -0,0 +1,169 @@
+import base64
+import hashlib
+import http.client
+import json
+import os
+import re
+import threading
+from http.server import ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import settings
+from endpoints import backend_url
+from result_log import log
+from stub_backend import HOP_HEADERS, StubRequestHandler
+from worker_context import at_session_end
+
+
+def cache_key(method, path, query, body, token):
+    """Stable key for a request: method, path, sorted query, body and the session it was made in"""
+    normalized = f"{method} {path}?{urlencode(sorted(parse_qsl(query, keep_blank_values=True)))}"
+    digest = hashlib.sha1(f"{normalized}\n{token or ''}\n".encode("utf-8") + body).hexdigest()
+    return normalized, digest
+
+
+class CachingRequestHandler(StubRequestHandler):
+    """Answers /api/v1 from the on-disk cache (replay) or from the backend while saving each response (record)"""
+
+    def _api(self, path, query, body):
+        cache = self.server.cache
+        # Replayed logins hand out the recorded tokens, so the session stays part of a matching key
+        # Multipart boundaries are random per request, so they are left out of the key
+        boundary = re.search(r"boundary=\"?([^\";]+)", self.headers.get("Content-Type", ""))
+        keyed_body = body.replace(boundary.group(1).encode("latin-1"), b"boundary") if boundary else body
+        request, digest = cache_key(self.command, f"{settings.API_PREFIX}{path}", query, keyed_body, self._token())
+        # Repeats of a request, e.g. logging in twice, each get their own entry and so their own token
+        digest = f"{digest}-{cache.occurrence(digest)}"
+
+        if cache.mode == "replay":
+            entry = cache.load(digest)
+            if entry is None:
+                cache.count("missed")
+                log("HTTP-CACHE", f"No recorded response for {request}")
+                self._send(504, {"success": False, "message": f"Not in HTTP cache: {request}"})
+                return
+            cache.count("replayed")
+        else:
+            try:
+                entry = self._fetch(f"{settings.API_PREFIX}{path}" + (f"?{query}" if query else ""), body)
+            except OSError as e:
+                self._send(502, {"success": False, "message": f"Backend unreachable: {str(e)}"})
+                return
+            if entry["status"] == 304:
+                # Never expected as the conditional headers are dropped, and would replay an empty body
+                self._send(502, {"success": False, "message": f"Backend answered 304 to {request}"})
+                return
+            entry["request"] = request
+            cache.save(digest, entry)
+            cache.count("recorded")
+
+        data = base64.b64decode(entry["body"]) if entry.get("encoding") == "base64" else entry["body"].encode("utf-8")
+        self.send_response(entry["status"])
+        for key, value in entry["headers"]:
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def _fetch(self, path, body):
+        upstream = urlsplit(self.server.upstream)
+        # Without the conditional headers Express answers 200 with a body instead of a 304 for the browser's cached copy
+        skipped = HOP_HEADERS | {"host", "if-none-match", "if-modified-since"}
+        headers = {key: value for key, value in self.headers.items() if key.lower() not in skipped}
+        connection = http.client.HTTPConnection(upstream.hostname, upstream.port or 80, timeout=30)
+        try:
+            connection.request(self.command, path, body or None, headers)
+            response = connection.getresponse()
+            data = response.read()
+        finally:
+            connection.close()
+
+        entry = {
+            "status": response.status,
+            "headers": [[key, value] for key, value in response.getheaders() if key.lower() not in HOP_HEADERS | {"content-length", "date"}],
+        }
+        try:
+            entry["body"] = data.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["body"] = base64.b64encode(data).decode("ascii")
+            entry["encoding"] = "base64"
+        return entry
+
+
+class HttpCache:
+    """A proxy Chrome is pointed at; every other origin is forwarded untouched, like the backend stand-in does"""
+
+    def __init__(self, mode, directory=settings.HTTP_CACHE_DIR):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"HTTP_CACHE must be record or replay, not {mode!r}")
+        self.mode = mode
+        self.directory = directory
+        self.counts = {}
+        self._seen = {}
+        self._lock = threading.Lock()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), CachingRequestHandler)
+        self.server.daemon_threads = True
+        self.server.cache = self
+        self.server.upstream = backend_url()
+        self.server.api_netloc = urlsplit(settings.API_URL).netloc
+        frontend = urlsplit(settings.BASE_URL)
+        self.server.frontend_origin = f"{frontend.scheme}://{frontend.netloc}"
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, name="http-cache", daemon=True)
+
+    def _path(self, digest):
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def load(self, digest):
+        try:
+            with open(self._path(digest)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, digest, entry):
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = f"{self._path(digest)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(entry, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self._path(digest))
+
+    def occurrence(self, digest):
+        """How many times this process has sent the request before; recording and replaying must run the same tests in the same order"""
+        with self._lock:
+            self._seen[digest] = self._seen.get(digest, 0) + 1
+            return self._seen[digest]
+
+    def count(self, outcome):
+        with self._lock:
+            self.counts[outcome] = self.counts.get(outcome, 0) + 1
+
+    def start(self):
+        self._thread.start()
+        log("HTTP-CACHE", f"{self.mode.capitalize()}ing {settings.API_PREFIX} responses in {self.directory} via {self.url}")
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        summary = ", ".join(f"{count} {outcome}" for outcome, count in sorted(self.counts.items())) or "no API calls"
+        log("HTTP-CACHE", summary)
+
+    def chrome_arguments(self):
+        return [f"--proxy-server={self.url}", "--proxy-bypass-list=<-loopback>"]
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache():
+    """The record/replay proxy for this process, started on first use"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache(settings.HTTP_CACHE).start()
+            at_session_end(_cache.stop)
+        return _cache
@@ -0,0 +1,284 @@
+import json
+import os
+import re
+import subprocess
+from selenium.common.exceptions import WebDriverException
+
+import settings
+from result_log import log
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+FRONTEND_DIR = os.path.join("frontend", "src")
+BACKEND_DIR = "backend"
+# Reaching one of these means a change can affect every page or every endpoint
+ROOT_FILES = {
+    os.path.join(FRONTEND_DIR, "index.js"),
+    os.path.join(FRONTEND_DIR, "App.js"),
+    os.path.join(BACKEND_DIR, "app.js"),
+    os.path.join(BACKEND_DIR, "server.js"),
+}
+# Changes to these never affect what a test sees
+IGNORED_PATTERNS = [re.compile(pattern) for pattern in (r"\.md$", r"^requests\.jsonl$", r"^\.gitignore$", r"^screenshots/", r"(^|/)test_runs/")]
+
+# Keeps the frontend paths a tab showed and the API calls its pages made in sessionStorage, which
+# reset_driver clears between tests; registered with Page.addScriptToEvaluateOnNewDocument like the wait hooks
+IMPACT_JS = """
+(function () {
+  if (window.__shopitImpactHooks) { return; }
+  window.__shopitImpactHooks = true;
+  var KEY = '__shopitImpact';
+
+  function note(kind, value) {
+    try {
+      var seen = JSON.parse(sessionStorage.getItem(KEY) || '{"routes": [], "api": []}');
+      if (seen[kind].indexOf(value) < 0) {
+        seen[kind].push(value);
+        sessionStorage.setItem(KEY, JSON.stringify(seen));
+      }
+    } catch (e) {}
+  }
+  function route() { note('routes', location.pathname); }
+  function call(method, url) { note('api', (method || 'GET').toUpperCase() + ' ' + new URL(url, location.href).pathname); }
+
+  ['pushState', 'replaceState'].forEach(function (name) {
+    var original = history[name];
+    history[name] = function () {
+      var result = original.apply(this, arguments);
+      route();
+      return result;
+    };
+  });
+  window.addEventListener('popstate', route);
+
+  var open = XMLHttpRequest.prototype.open;
+  XMLHttpRequest.prototype.open = function (method, url) {
+    call(method, url);
+    return open.apply(this, arguments);
+  };
+  if (window.fetch) {
+    var fetch = window.fetch;
+    window.fetch = function (input, init) {
+      call((init && init.method) || (input && input.method), typeof input === 'string' ? input : input.url);
+      return fetch.apply(this, arguments);
+    };
+  }
+  route();
+})();
+"""
+
+
+def install_impact_hooks(driver):
+    """Make every document the driver opens remember its route and API calls"""
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": IMPACT_JS})
+    except (AttributeError, WebDriverException) as e:
+        log("IMPACT", f"Could not register impact hooks: {str(e)}")
+
+
+def visited(driver):
+    """{"routes": [...], "api": [...]} the current tab has seen since the browser was last reset, or None"""
+    try:
+        # about:blank and other non-http pages have no sessionStorage to read
+        seen = driver.execute_script("try { return window.sessionStorage.getItem('__shopitImpact'); } catch (e) { return null; }")
+    except WebDriverException:
+        return None
+    return json.loads(seen) if seen else None
+
+
+def _read(path):
+    with open(os.path.join(REPO_DIR, path)) as f:
+        return f.read()
+
+
+def _pattern(path):
+    """Regex for an Express or React Router path such as /product/:id"""
+    return re.compile("^" + re.sub(r":\w+", "[^/]+", re.escape(path).replace("\\:", ":")) + "/?$")
+
+
+def _resolve(source, target):
+    """Repo-relative file a relative import or require() of source points at, or None for packages"""
+    if not target.startswith("."):
+        return None
+    base = os.path.normpath(os.path.join(os.path.dirname(source), target))
+    for candidate in (base, f"{base}.js", f"{base}.jsx", os.path.join(base, "index.js")):
+        if os.path.isfile(os.path.join(REPO_DIR, candidate)):
+            return candidate
+    return None
+
+
+def frontend_routes():
+    """[(path, component file)] of the <Route> elements in App.js"""
+    app_path = os.path.join(FRONTEND_DIR, "App.js")
+    source = _read(app_path)
+    imports = {name: _resolve(app_path, target) for name, target in re.findall(r"import\s+(\w+)\s+from\s+[\"']([^\"']+)[\"']", source)}
+    routes = []
+    for path, element in re.findall(r"<Route\s+path=\"([^\"]+)\"\s+element=\{(.*?)\}\s*/>", source, re.DOTALL):
+        components = [name for name in re.findall(r"<(\w+)", element) if name != "ProtectedRoute"]
+        if components:
+            routes.append((path, imports.get(components[-1])))
+    return routes
+
+
+def backend_endpoints():
+    """[(method, path, controller file, routes file)] of every router.route(...) in backend/routes"""
+    endpoints = []
+    routes_dir = os.path.join(BACKEND_DIR, "routes")
+    for filename in sorted(os.listdir(os.path.join(REPO_DIR, routes_dir))):
+        routes_path = os.path.join(routes_dir, filename)
+        source = re.sub(r"//[^\n]*", "", _read(routes_path))
+        handlers = {}
+        for names, target in re.findall(r"const\s*\{([^}]*)\}\s*=\s*require\(\s*[\"']([^\"']+)[\"']\s*\)", source):
+            for name in re.findall(r"\w+", names):
+                handlers[name] = _resolve(routes_path, target)
+        chunks = re.split(r"\.route\(", source)[1:]
+        for chunk in chunks:
+            path = re.match(r"\s*[\"']([^\"']+)[\"']", chunk)
+            if not path:
+                continue
+            for method, arguments in re.findall(r"\.(get|post|put|delete|patch)\(((?:[^()]|\([^()]*\))*)\)", chunk):
+                handler = arguments.split(",")[-1].strip()
+                endpoints.append((method.upper(), path.group(1), handlers.get(handler), routes_path))
+    return endpoints
+
+
+def dependency_graph():
+    """{file: files it imports or requires} for the frontend sources and the backend"""
+    graph = {}
+    for top in (FRONTEND_DIR, BACKEND_DIR):
+        for directory, subdirectories, filenames in os.walk(os.path.join(REPO_DIR, top)):
+            subdirectories[:] = [name for name in subdirectories if name != "node_modules"]
+            for filename in filenames:
+                if not filename.endswith((".js", ".jsx")):
+                    continue
+                path = os.path.relpath(os.path.join(directory, filename), REPO_DIR)
+                source = _read(path)
+                targets = re.findall(r"require\(\s*[\"']([^\"']+)[\"']\s*\)|(?:from|import)\s+[\"']([^\"']+)[\"']", source)
+                graph[path] = {resolved for target in targets if (resolved := _resolve(path, target[0] or target[1]))}
+    return graph
+
+
+def _dependents(changed, graph, stop):
+    """changed and the files that import it directly or through other files, not looking past the files in stop"""
+    importers = {}
+    for path, imports in graph.items():
+        for target in imports:
+            importers.setdefault(target, set()).add(path)
+    reached = {changed}
+    pending = [changed]
+    while pending:
+        path = pending.pop()
+        if path in stop:
+            continue
+        for importer in importers.get(path, ()):
+            if importer not in reached:
+                reached.add(importer)
+                pending.append(importer)
+    return reached
+
+
+_route_patterns = None
+
+
+def route_for(path):
+    """App.js route a visited path belongs to, e.g. /product/64f... is /product/:id; unknown paths stay as they are"""
+    global _route_patterns
+    if _route_patterns is None:
+        _route_patterns = [(route, _pattern(route)) for route, _ in frontend_routes()]
+    return next((route for route, pattern in _route_patterns if pattern.match(path)), path)
+
+
+def changed_files(ref):
+    """Files that differ from ref in the working tree, plus untracked ones"""
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout.split()
+    return sorted(set(git("diff", "--name-only", ref)) | set(git("ls-files", "--others", "--exclude-standard")))
+
+
+class ImpactMap:
+    """Which frontend routes and backend endpoints each test reached, merged over the runs that recorded it"""
+
+    def __init__(self, path=settings.IMPACT_MAP_FILE):
+        self.path = path
+        self.tests = {}
+        try:
+            with open(path) as f:
+                self.tests = json.load(f)
+        except (OSError, ValueError):
+            pass
+        self._routes = None
+        self._endpoints = None
+
+    def routes(self):
+        if self._routes is None:
+            self._routes = [(path, component, _pattern(path)) for path, component in frontend_routes()]
+        return self._routes
+
+    def endpoints(self):
+        if self._endpoints is None:
+            self._endpoints = [(method, path, controller, routes, _pattern(path)) for method, path, controller, routes in backend_endpoints()]
+        return self._endpoints
+
+    def _endpoint_for(self, call):
+        method, _, path = call.partition(" ")
+        if not path.startswith(settings.API_PREFIX):
+            return None
+        path = path[len(settings.API_PREFIX):]
+        for endpoint_method, endpoint_path, _, _, pattern in self.endpoints():
+            if endpoint_method == method and pattern.match(path):
+                return f"{method} {endpoint_path}"
+        return f"{method} {path}"
+
+    def record(self, test_id, seen):
+        """Add what one run of a test visited, e.g. /product/64f... becomes /product/:id"""
+        entry = self.tests.setdefault(test_id, {"routes": [], "api": []})
+        routes = set(entry["routes"]) | {route_for(path) for path in seen.get("routes", [])}
+        api = set(entry["api"]) | {endpoint for endpoint in map(self._endpoint_for, seen.get("api", [])) if endpoint}
+        entry["routes"], entry["api"] = sorted(routes), sorted(api)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.tests, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+    def affected(self, files, test_ids):
+        """{test id: reason} for the tests a change to files can affect; unmapped tests are always included"""
+        test_ids = list(test_ids)
+        selected = {test_id: "no recorded impact yet" for test_id in test_ids if test_id not in self.tests}
+        graph = None
+
+        for path in files:
+            if any(pattern.search(path) for pattern in IGNORED_PATTERNS):
+                continue
+            name = os.path.basename(path)
+            if os.path.dirname(path) == "" and name.startswith("test_") and name.endswith(".py"):
+                module = name[:-3]
+                selected.update({test_id: f"{path} changed" for test_id in test_ids if test_id.startswith(f"{module}.")})
+                continue
+            if not path.startswith((FRONTEND_DIR + os.sep, BACKEND_DIR + os.sep)) or not path.endswith((".js", ".jsx")):
+                # Harness code, settings, packages and anything unknown can affect every test
+                selected.update({test_id: f"{path} changed" for test_id in test_ids if test_id not in selected})
+                continue
+
+            if graph is None:
+                graph = dependency_graph()
+            # Route components, controllers and route files are where a change is pinned to routes and endpoints
+            stop = {component for _, component, _ in self.routes()}
+            stop |= {file for _, _, controller, routes_file, _ in self.endpoints() for file in (controller, routes_file)}
+            reached = _dependents(path, graph, stop)
+
+            if reached & ROOT_FILES:
+                selected.update({test_id: f"{path} is used app-wide" for test_id in test_ids if test_id not in selected})
+                continue
+            routes = {route for route, component, _ in self.routes() if component in reached}
+            endpoints = {
+                f"{method} {endpoint}"
+                for method, endpoint, controller, routes_file, _ in self.endpoints()
+                if controller in reached or routes_file in reached
+            }
+            for test_id in test_ids:
+                entry = self.tests.get(test_id)
+                if entry and test_id not in selected and (routes & set(entry["routes"]) or endpoints & set(entry["api"])):
+                    selected[test_id] = f"{path} reaches {', '.join(sorted((routes & set(entry['routes'])) | (endpoints & set(entry['api']))))}"
+        return selected
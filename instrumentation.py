@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import settings
+from result_log import log
+from worker_context import WORKER_ID, at_session_end, output_dir
+
+# WebDriver command names grouped into the columns of the breakdown table
+COMMAND_CATEGORIES = {
+    "get": "navigation",
+    "refresh": "navigation",
+    "goBack": "navigation",
+    "goForward": "navigation",
+    "findElement": "lookup",
+    "findElements": "lookup",
+    "findChildElement": "lookup",
+    "findChildElements": "lookup",
+    "w3cExecuteScript": "script",
+    "w3cExecuteScriptAsync": "script",
+    "screenshot": "screenshot",
+    "elementScreenshot": "screenshot",
+    "clickElement": "interaction",
+    "sendKeysToElement": "interaction",
+    "clearElement": "interaction",
+}
+
+CATEGORIES = ["pool", "navigation", "wait", "lookup", "interaction", "script", "screenshot", "driver", "other"]
+
+
+class Tracer:
+    """Collects timed spans per test and writes them as Chrome trace events"""
+
+    def __init__(self, enabled=settings.TRACE):
+        self.enabled = enabled
+        self.events = []
+        self.breakdowns = {}
+        self.test_id = None
+        self._test_started = 0.0
+        self._origin = time.perf_counter()
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name, category, inherit=False):
+        """Time a block; nested spans are subtracted, and inherit books it under the enclosing span's category"""
+        if not self.enabled:
+            yield
+            return
+
+        stack = self._stack()
+        if inherit and stack:
+            category = stack[-1][1]
+        frame = [0.0, category]
+        stack.append(frame)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            stack.pop()
+            if stack:
+                stack[-1][0] += elapsed
+            self.events.append((name, category, started, elapsed, threading.get_ident(), self.test_id))
+            if self.test_id is not None:
+                totals = self.breakdowns.setdefault(self.test_id, {})
+                totals[category] = totals.get(category, 0.0) + elapsed - frame[0]
+
+    def begin_test(self, test_id):
+        self.test_id = test_id
+        self.breakdowns[test_id] = {}
+        self._test_started = time.perf_counter()
+
+    def end_test(self):
+        """Close the current test; time not covered by any span is booked as "other\""""
+        if self.test_id is None:
+            return None
+        totals = self.breakdowns[self.test_id]
+        total = time.perf_counter() - self._test_started
+        totals["other"] = totals.get("other", 0.0) + max(0.0, total - sum(totals.values()))
+        totals["total"] = total
+        self.events.append((self.test_id, "test", self._test_started, total, threading.get_ident(), self.test_id))
+        self.test_id = None
+        return totals
+
+    def export(self, path):
+        pid = os.getpid()
+        trace_events = [
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round((started - self._origin) * 1e6),
+                "dur": round(elapsed * 1e6),
+                "pid": pid,
+                "tid": tid,
+                "args": {"test": test_id} if test_id else {},
+            }
+            for name, category, started, elapsed, tid, test_id in self.events
+        ]
+        trace_events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"worker-{WORKER_ID}" if WORKER_ID else "tests"}})
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+
+    def close(self):
+        if not self.enabled or not self.events:
+            return
+        path = os.path.join(output_dir(), "traces", f"trace-{os.getpid()}.json")
+        self.export(path)
+        log("TRACE", f"Wrote {len(self.events)} spans to {path} (open in chrome://tracing or ui.perfetto.dev)")
+        # Runner workers send their breakdowns to run_tests.py, which prints one table for the whole run
+        if not WORKER_ID:
+            print_breakdown(self.breakdowns)
+
+
+def print_breakdown(breakdowns):
+    """One row per test with seconds spent in each category"""
+    if not breakdowns:
+        return
+    width = max(len(test_id) for test_id in breakdowns)
+    print(f"{'test':<{width}} {'total':>7} " + " ".join(f"{category:>11}" for category in CATEGORIES))
+    for test_id, totals in breakdowns.items():
+        cells = " ".join(f"{totals.get(category, 0.0):>11.2f}" for category in CATEGORIES)
+        print(f"{test_id:<{width}} {totals.get('total', 0.0):>7.2f} {cells}")
+
+
+def instrument_driver(driver):
+    """Time and count every WebDriver command, including element commands, which are routed through driver.execute"""
+    execute = driver.execute
+    driver.command_count = 0
+
+    def traced_execute(driver_command, params=None):
+        driver.command_count += 1
+        with get_tracer().span(driver_command, COMMAND_CATEGORIES.get(driver_command, "driver"), inherit=True):
+            return execute(driver_command, params)
+
+    driver.execute = traced_execute
+    return driver
+
+
+_tracer = None
+
+
+def get_tracer():
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+        at_session_end(_tracer.close)
+    return _tracer
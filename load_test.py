@@ -0,0 +1,332 @@
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from http.cookies import SimpleCookie
+from urllib.parse import quote, urlsplit
+
+import settings
+from data_factory import get_test_data
+from endpoints import backend_url
+from worker_context import RUN_ID, run_session_end_hooks
+
+
+class HttpError(Exception):
+    pass
+
+
+class HttpClient:
+    """Minimal keep-alive HTTP/1.1 client for one virtual user, with its own connection and auth cookie"""
+
+    def __init__(self, base_url, timeout=30):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.token = None
+        self._reader = None
+        self._writer = None
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self._writer:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+            self._writer = None
+
+    async def _read_body(self, headers):
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self._reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self._reader.readline()
+                    return b"".join(chunks)
+                chunks.append(await self._reader.readexactly(size))
+                await self._reader.readline()
+        return await self._reader.readexactly(int(headers.get("content-length", "0")))
+
+    async def request(self, method, path, body=None):
+        """(status, parsed JSON body); reconnects once if the server closed an idle keep-alive connection"""
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(data)}", "Accept: application/json"]
+        if body is not None:
+            lines.append("Content-Type: application/json")
+        if self.token:
+            lines.append(f"Cookie: {settings.AUTH_COOKIE}={self.token}")
+        message = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + data
+
+        for attempt in range(2):
+            if self._writer is None:
+                await self._connect()
+            try:
+                self._writer.write(message)
+                await self._writer.drain()
+                status_line = await asyncio.wait_for(self._reader.readline(), self.timeout)
+                if not status_line:
+                    raise ConnectionResetError("connection closed")
+                break
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if attempt:
+                    raise
+
+        status = int(status_line.split()[1])
+        headers = {}
+        cookies = SimpleCookie()
+        while True:
+            line = (await self._reader.readline()).decode("latin-1").rstrip("\r\n")
+            if not line:
+                break
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+            if key.strip().lower() == "set-cookie":
+                cookies.load(value.strip())
+        payload = await asyncio.wait_for(self._read_body(headers), self.timeout)
+
+        if settings.AUTH_COOKIE in cookies:
+            self.token = cookies[settings.AUTH_COOKIE].value or None
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        try:
+            return status, json.loads(payload.decode("utf-8")) if payload else {}
+        except ValueError:
+            return status, {}
+
+
+class LoadStats:
+    """Latency samples, statuses and errors per endpoint"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.started = time.perf_counter()
+        self.active_users = 0
+
+    def add(self, endpoint, elapsed, ok):
+        self.latencies.setdefault(endpoint, []).append(elapsed)
+        if not ok:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def total(self):
+        return sum(len(samples) for samples in self.latencies.values())
+
+
+class VirtualUser:
+    def __init__(self, client, stats, data):
+        self.client = client
+        self.stats = stats
+        self.data = data
+
+    async def call(self, method, endpoint, path, body=None):
+        """Time one request; endpoint is the route pattern latencies are grouped under"""
+        started = time.perf_counter()
+        try:
+            status, payload = await self.client.request(method, f"{settings.API_PREFIX}{path}", body)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError) as e:
+            self.stats.add(f"{method} {endpoint}", time.perf_counter() - started, False)
+            raise HttpError(f"{method} {path}: {str(e)}")
+        self.stats.add(f"{method} {endpoint}", time.perf_counter() - started, status < 400)
+        if status >= 400:
+            raise HttpError(f"{method} {path} returned {status}: {payload.get('message', '')}")
+        return payload
+
+    def product_id(self):
+        return random.choice(self.data.products)["_id"]
+
+    async def login(self):
+        user = random.choice(self.data.users)
+        await self.call("POST", "/login", "/login", {"email": user["email"], "password": user["password"]})
+
+
+# The same journeys as test_1_product_search, test_3_add_to_cart and OrderPaymentTest, as the frontend's API calls
+async def search(user):
+    results = await user.call("GET", "/products", f"/products?keyword={quote('MacBook')}&page=1")
+    products = results.get("products") or [{"_id": user.product_id()}]
+    await user.call("GET", "/products/:id", f"/products/{products[0]['_id']}")
+
+
+async def product_detail(user):
+    await user.call("GET", "/products/:id", f"/products/{user.product_id()}")
+
+
+async def add_to_cart(user):
+    # The cart lives in the browser; adding an item re-fetches the product for its price and stock
+    product_id = user.product_id()
+    await user.call("GET", "/products/:id", f"/products/{product_id}")
+    await user.call("GET", "/products/:id", f"/products/{product_id}")
+
+
+async def new_order(user):
+    if not user.client.token:
+        await user.login()
+        await user.call("GET", "/me", "/me")
+    product = (await user.call("GET", "/products/:id", f"/products/{user.product_id()}"))["product"]
+    price = product["price"]
+    payment = {"id": f"pi_load_{random.getrandbits(32):08x}", "status": "succeeded"}
+    if settings.STUB_BACKEND:
+        payment["id"] = (await user.call("POST", "/payment/process", "/payment/process", {"amount": price, "card": "4242424242424242"}))["id"]
+    await user.call("POST", "/order/new", "/order/new", {
+        "orderItems": [{"name": product["name"], "quantity": 1, "image": product["images"][0]["url"], "price": price, "product": product["_id"]}],
+        "shippingInfo": {"address": "123 Test St", "city": "Test City", "phoneNo": "1234567890", "postalCode": "12345", "country": "United States"},
+        "itemsPrice": price,
+        "taxPrice": 0,
+        "shippingPrice": 0,
+        "totalPrice": price,
+        "paymentInfo": payment,
+    })
+    await user.call("GET", "/order/me", "/order/me")
+
+
+# name: (journey, weight in the mix a virtual user draws from)
+JOURNEYS = {
+    "search": (search, 4),
+    "product_detail": (product_detail, 3),
+    "add_to_cart": (add_to_cart, 2),
+    "new_order": (new_order, 1),
+}
+
+
+async def run_user(base_url, stats, data, journeys, deadline, think):
+    names = list(journeys)
+    weights = [JOURNEYS[name][1] for name in names]
+    client = HttpClient(base_url)
+    user = VirtualUser(client, stats, data)
+    stats.active_users += 1
+    try:
+        while time.perf_counter() < deadline:
+            name = random.choices(names, weights)[0]
+            try:
+                await JOURNEYS[name][0](user)
+            except HttpError:
+                # Counted under the endpoint that failed; start over with a fresh journey
+                pass
+            if think:
+                await asyncio.sleep(random.uniform(0, 2 * think))
+    finally:
+        stats.active_users -= 1
+        await client.close()
+
+
+async def report_progress(stats, every):
+    previous = 0
+    while True:
+        await asyncio.sleep(every)
+        total = stats.total()
+        elapsed = time.perf_counter() - stats.started
+        print(f"[LOAD] {elapsed:5.0f}s: {stats.active_users} users, {(total - previous) / every:.1f} req/s, {sum(stats.errors.values())} errors")
+        previous = total
+
+
+async def run_load(base_url, data, journeys, users, ramp, duration, think, every):
+    """Start users evenly over ramp seconds; every user keeps running journeys until duration is up"""
+    stats = LoadStats()
+    deadline = stats.started + duration
+    progress = asyncio.ensure_future(report_progress(stats, every))
+    tasks = []
+    try:
+        for index in range(users):
+            start_at = stats.started + (ramp * index / users if users else 0)
+            await asyncio.sleep(max(0.0, start_at - time.perf_counter()))
+            if time.perf_counter() >= deadline:
+                break
+            tasks.append(asyncio.ensure_future(run_user(base_url, stats, data, journeys, deadline, think)))
+        await asyncio.gather(*tasks)
+    finally:
+        progress.cancel()
+    stats.elapsed = time.perf_counter() - stats.started
+    return stats
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(stats):
+    endpoints = {}
+    for endpoint, samples in sorted(stats.latencies.items()):
+        endpoints[endpoint] = {
+            "requests": len(samples),
+            "errors": stats.errors.get(endpoint, 0),
+            "throughput": len(samples) / stats.elapsed,
+            "p50": percentile(samples, 0.50),
+            "p95": percentile(samples, 0.95),
+            "p99": percentile(samples, 0.99),
+        }
+    samples = list(itertools.chain.from_iterable(stats.latencies.values())) or [0.0]
+    overall = {
+        "requests": stats.total(),
+        "errors": sum(stats.errors.values()),
+        "throughput": stats.total() / stats.elapsed,
+        "p50": percentile(samples, 0.50),
+        "p95": percentile(samples, 0.95),
+        "p99": percentile(samples, 0.99),
+    }
+    return {"endpoints": endpoints, "overall": overall}
+
+
+def print_report(summary):
+    print(f"{'endpoint':<24} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for endpoint, row in list(summary["endpoints"].items()) + [("overall", summary["overall"])]:
+        print(
+            f"{endpoint:<24} {row['requests']:>9} {row['errors']:>7} {row['throughput']:>8.1f} "
+            f"{row['p50'] * 1000:>8.1f} {row['p95'] * 1000:>8.1f} {row['p99'] * 1000:>8.1f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay the UI journeys as API request sequences with many concurrent virtual users")
+    parser.add_argument("journeys", nargs="*", default=list(JOURNEYS), help=f"journeys to mix: {', '.join(JOURNEYS)}")
+    parser.add_argument("-u", "--users", type=int, default=20, help="virtual users at full load")
+    parser.add_argument("--ramp", type=float, default=10, help="seconds over which users are started")
+    parser.add_argument("-d", "--duration", type=float, default=30, help="seconds to run, ramp included")
+    parser.add_argument("--think", type=float, default=0.0, help="mean pause in seconds between journeys")
+    parser.add_argument("--url", help="API origin to load, defaults to the backend or, with STUB_BACKEND=1, the stand-in")
+    parser.add_argument("--report-every", type=float, default=5, help="seconds between progress lines")
+    parser.add_argument("-o", "--output", default=os.path.join("benchmarks", f"load-{RUN_ID}.json"), help="where to write the results")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.journeys if name not in JOURNEYS]
+    if unknown:
+        parser.error(f"unknown journeys: {', '.join(unknown)}")
+
+    base_url = args.url or backend_url()
+    data = get_test_data()
+    print(f"[LOAD] {args.users} users over {args.ramp:.0f}s against {base_url} for {args.duration:.0f}s: {', '.join(args.journeys)}")
+    try:
+        stats = asyncio.run(run_load(base_url, data, args.journeys, args.users, args.ramp, args.duration, args.think, args.report_every))
+    finally:
+        run_session_end_hooks()
+
+    summary = summarize(stats)
+    print_report(summary)
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "target": base_url,
+        "stub_backend": settings.STUB_BACKEND,
+        "users": args.users,
+        "ramp": args.ramp,
+        "duration": stats.elapsed,
+        "journeys": args.journeys,
+        **summary,
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[LOAD] Results written to {args.output}")
+    return 0 if not summary["overall"]["errors"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import contextlib
+import json
+import os
+import re
+import threading
+from urllib.parse import urlparse
+
+import settings
+from worker_context import at_session_end
+
+# Older results fade so a locator that starts failing after a frontend change is demoted quickly
+DECAY = 0.8
+
+ID_SEGMENT = re.compile(r"^(?:[0-9a-f]{24}|\d+)$")
+
+
+def page_key(url):
+    """Route-like key for a URL: /product/5f1d...c3 becomes /product/:id"""
+    path = urlparse(url).path or "/"
+    segments = [":id" if ID_SEGMENT.match(segment) else segment for segment in path.split("/")]
+    return "/".join(segments) or "/"
+
+
+@contextlib.contextmanager
+def _file_lock(path):
+    """Exclusive lock on path across processes, held for the with block"""
+    with open(path, "a+") as f:
+        if os.name == "nt":
+            import msvcrt
+
+            f.seek(0)
+            # LK_LOCK retries for about ten seconds before giving up
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def strategy_key(strategy):
+    by, value = strategy
+    return f"{by}={value}"
+
+
+class LocatorCache:
+    """Remembers which locator strategy matched each logical element and tries the best one first"""
+
+    def __init__(self, path):
+        self.path = path
+        self.scores = self._load()
+        self._events = []
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _apply(scores, page, name, key, found):
+        entry = scores.setdefault(page, {}).setdefault(name, {})
+        entry[key] = round(entry.get(key, 0.0) * DECAY + (1.0 if found else -1.0), 4)
+
+    def ordered(self, page, name, strategies):
+        """strategies sorted by learned score; unseen ones keep their given priority"""
+        known = self.scores.get(page, {}).get(name, {})
+        ranked = sorted(enumerate(strategies), key=lambda item: (-known.get(strategy_key(item[1]), 0.0), item[0]))
+        return [strategy for _, strategy in ranked]
+
+    def record(self, page, name, strategy, found):
+        key = strategy_key(strategy)
+        with self._lock:
+            self._apply(self.scores, page, name, key, found)
+            self._events.append((page, name, key, found))
+
+    def save(self):
+        """Replay this session's results onto the file on disk under a lock file, so parallel workers do not overwrite each other"""
+        with self._lock:
+            events, self._events = self._events, []
+        if not events:
+            return
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with _file_lock(f"{self.path}.lock"):
+            scores = self._load()
+            for page, name, key, found in events:
+                self._apply(scores, page, name, key, found)
+
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(scores, f, indent=2, sort_keys=True)
+            os.replace(temp_path, self.path)
+
+
+_cache = None
+
+
+def get_locator_cache():
+    global _cache
+    if _cache is None:
+        _cache = LocatorCache(settings.LOCATOR_CACHE_FILE)
+        at_session_end(_cache.save)
+    return _cache
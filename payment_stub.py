@@ -0,0 +1,102 @@
+import json
+
+from selenium.common.exceptions import WebDriverException
+
+import settings
+from result_log import log
+
+# Mounts a Stripe-like card element (.stripe-card-element > iframe > .InputElement) on the payment form.
+# What is typed into it is mirrored into the page's own card fields, and submitting the form confirms
+# the payment against POST /api/v1/payment/process; the outcome is kept in window.__shopitPayment.
+CARD_ELEMENT_JS = """
+(function () {
+  if (window.__shopitCardElement) { return; }
+  window.__shopitCardElement = true;
+  var API_URL = %s;
+  // [input name, digits, field on the payment page]
+  var FIELDS = [['cardnumber', 16, 'card_num_field'], ['exp-date', 4, 'card_exp_field'], ['cvc', 3, 'card_cvc_field']];
+
+  function setValue(input, value) {
+    var setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+    setter.call(input, value);
+    input.dispatchEvent(new Event('input', { bubbles: true }));
+  }
+
+  function mirror(index, digits) {
+    var target = document.getElementById(FIELDS[index][2]);
+    if (!target) { return; }
+    setValue(target, index === 1 && digits.length > 2 ? digits.slice(0, 2) + '/' + digits.slice(2) : digits);
+  }
+
+  function wire(frameDocument) {
+    var inputs = frameDocument.querySelectorAll('.InputElement');
+    Array.prototype.forEach.call(inputs, function (input, index) {
+      input.addEventListener('input', function () {
+        // Like Stripe's card element, digits typed past a complete field carry on into the next one
+        var digits = input.value.replace(/\\D/g, '');
+        var max = FIELDS[index][1];
+        if (digits.length > max && inputs[index + 1]) {
+          inputs[index + 1].value += digits.slice(max);
+          inputs[index + 1].dispatchEvent(new Event('input'));
+        }
+        digits = digits.slice(0, max);
+        if (input.value !== digits) { input.value = digits; }
+        mirror(index, digits);
+      });
+    });
+  }
+
+  function confirmPayment() {
+    var state = window.__shopitPayment = { status: 'processing' };
+    var orderInfo = JSON.parse(sessionStorage.getItem('orderInfo') || '{}');
+    var card = document.getElementById('card_num_field');
+    fetch(API_URL + '/api/v1/payment/process', {
+      method: 'POST',
+      credentials: 'include',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ amount: orderInfo.totalPrice || 0, card: card ? card.value : '' })
+    }).then(function (response) { return response.json(); }).then(function (data) {
+      state.status = data.success ? 'succeeded' : 'failed';
+      state.id = data.id || null;
+      state.message = data.message || null;
+    }).catch(function (error) {
+      state.status = 'failed';
+      state.message = String(error);
+    });
+  }
+
+  function mount() {
+    var number = document.getElementById('card_num_field');
+    if (!number || !number.form || number.form.querySelector('.stripe-card-element')) { return; }
+    var wrapper = document.createElement('div');
+    wrapper.className = 'stripe-card-element form-group';
+    var frame = document.createElement('iframe');
+    frame.name = '__privateStripeFrameLocal';
+    frame.title = 'Secure card payment input frame';
+    frame.style.cssText = 'width: 100%%; height: 44px; border: 0;';
+    frame.srcdoc = '<!doctype html><body style="margin:0;display:flex;gap:8px">' + FIELDS.map(function (field) {
+      return '<input class="InputElement" name="' + field[0] + '" inputmode="numeric" autocomplete="off" style="flex:1">';
+    }).join('') + '</body>';
+    frame.addEventListener('load', function () { wire(frame.contentDocument); });
+    wrapper.appendChild(frame);
+    number.form.insertBefore(wrapper, number.form.querySelector('.form-group'));
+    number.form.addEventListener('submit', confirmPayment, true);
+  }
+
+  // The payment page is a client-side route, so watch for its form rather than checking the URL once
+  new MutationObserver(mount).observe(document, { childList: true, subtree: true });
+})();
+"""
+
+
+def install_payment_stub(driver):
+    """Serve the local card element on every payment page this driver opens"""
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": CARD_ELEMENT_JS % json.dumps(settings.API_URL)})
+    except (AttributeError, WebDriverException) as e:
+        log("PAYMENT", f"Could not register the local card element: {str(e)}")
+
+
+def payment_result(driver):
+    """What the last confirm call returned, e.g. {"status": "succeeded", "id": "pi_..."}, or None"""
+    return driver.execute_script("return window.__shopitPayment || null;")
@@ -0,0 +1,32 @@
+from selenium.common.exceptions import WebDriverException
+
+import settings
+from result_log import log
+
+
+def allow_resources(*categories):
+    """Let a test method or class load resource categories that the headless profile blocks"""
+    def decorate(target):
+        target.allowed_resources = tuple(categories)
+        return target
+    return decorate
+
+
+def allowed_for(test_case):
+    method = getattr(test_case, test_case._testMethodName, None)
+    return set(getattr(type(test_case), "allowed_resources", ())) | set(getattr(method, "allowed_resources", ()))
+
+
+def apply_blocking(driver, allowed=()):
+    """Block every configured URL pattern except the allowed categories, for all later requests"""
+    patterns = [
+        pattern
+        for category, category_patterns in settings.BLOCKED_URL_PATTERNS.items()
+        if category not in allowed
+        for pattern in category_patterns
+    ]
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except (AttributeError, WebDriverException) as e:
+        log("BLOCK", f"Could not block resources: {str(e)}")
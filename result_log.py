@@ -0,0 +1,190 @@
+import json
+import os
+import sys
+import time
+import unittest
+from xml.etree import ElementTree
+
+import settings
+
+# Marks this module's frames as unittest's own, like case.py's, so failure tracebacks still start and end
+# at the test's lines rather than at LoggedTestCase._callTestMethod
+__unittest = True
+
+# Log of the test running in this process, so harness code can add to it without a reference to the test
+_current = None
+
+
+def log(tag, message):
+    """Add a harness message to the running test's log, or outside a test write it as one line straight away"""
+    test_log = _current
+    if test_log is not None:
+        test_log.log(tag, message)
+        return
+    # One write per line, as print() writes the newline separately and lines of parallel workers can run together
+    sys.stdout.write(f"[{tag}] {message}\n")
+    sys.stdout.flush()
+
+
+class TestLog:
+    """Events and timed steps of one test, kept in memory and written out in one piece when the test ends"""
+
+    def __init__(self, test_id):
+        self.test_id = test_id
+        self.started = time.perf_counter()
+        self.ended = None
+        self.events = []
+        self._steps = []
+        self._names = {}
+
+    def log(self, tag, message):
+        self.events.append({"time": self._now(), "tag": tag, "message": message})
+
+    def step(self, name):
+        """Start a step, ending the current one; a repeated name gets a #2, #3... suffix so each is reported apart"""
+        self._close_step()
+        self._names[name] = self._names.get(name, 0) + 1
+        if self._names[name] > 1:
+            name = f"{name}#{self._names[name]}"
+        self._steps.append({"name": name, "start": self._now()})
+
+    def _now(self):
+        return round(time.perf_counter() - self.started, 3)
+
+    def _close_step(self):
+        if self._steps and "duration" not in self._steps[-1]:
+            self._steps[-1]["duration"] = round(self._now() - self._steps[-1]["start"], 3)
+
+    def end(self):
+        if self.ended is None:
+            self._close_step()
+            self.ended = time.perf_counter()
+
+    def elapsed(self):
+        return (self.ended or time.perf_counter()) - self.started
+
+    def steps(self):
+        """Finished steps with their start and duration in seconds, in the order they ran"""
+        return [step for step in self._steps if "duration" in step]
+
+    def lines(self):
+        return [f"[{event['tag']}] +{event['time']:.2f}s {event['message']}" for event in self.events]
+
+    def flush(self, failed=False):
+        """Print the buffered events as one block, so lines of parallel workers do not interleave"""
+        self.end()
+        if settings.LOG_OUTPUT == "none" or (settings.LOG_OUTPUT == "failed" and not failed) or not self.events:
+            return
+        header = f"----- {self.test_id} ({self.elapsed():.2f}s{', failed' if failed else ''})"
+        sys.stdout.write("\n".join([header] + self.lines()) + "\n")
+        sys.stdout.flush()
+
+
+class LoggedTestCase(unittest.TestCase):
+    """Base for the suite's test cases: self.log() buffers tagged events that are written once per test"""
+
+    def setUp(self):
+        global _current
+        self.test_log = _current = TestLog(self.id())
+        self.test_log.step("setup")
+        # Registered first so it runs last and also covers the cleanups
+        self.addCleanup(self._flush_log)
+
+    def log(self, tag, message):
+        """Record an event, e.g. self.log("SEARCH", "Found search field"); it replaces print("[SEARCH] ...")"""
+        self.test_log.log(tag, message)
+
+    def step(self, name):
+        """Start a timed step of the test body before its action, e.g. self.step("add to cart")"""
+        self.test_log.step(name)
+
+    # unittest has no public hook between setUp, the test method and tearDown
+    def _callTestMethod(self, method):
+        self.step(self._testMethodName)
+        super()._callTestMethod(method)
+
+    def _callTearDown(self):
+        self.step("teardown")
+        super()._callTearDown()
+
+    def has_failed(self):
+        """Whether the test body or tearDown has already failed; usable from tearDown and cleanups"""
+        outcome = getattr(self, "_outcome", None)
+        if outcome is None:
+            return False
+        # Python < 3.11 keeps errors on the outcome until the test finishes
+        if any(exc_info for _, exc_info in getattr(outcome, "errors", [])):
+            return True
+        result = outcome.result
+        problems = getattr(result, "failures", []) + getattr(result, "errors", [])
+        return any(test is self for test, _ in problems)
+
+    def _flush_log(self):
+        global _current
+        if _current is self.test_log:
+            _current = None
+        self.test_log.flush(self.has_failed())
+
+
+def _junit_case(record):
+    module, _, name = record["test_id"].rpartition(".")
+    case = ElementTree.Element("testcase", classname=module, name=name, time=f"{record['duration']:.3f}")
+    if record.get("steps"):
+        properties = ElementTree.SubElement(case, "properties")
+        for step in record["steps"]:
+            ElementTree.SubElement(properties, "property", name=f"step.{step['name']}", value=f"{step['duration']:.3f}")
+    if record["outcome"] in ("failed", "error"):
+        element = "failure" if record["outcome"] == "failed" else "error"
+        lines = record["details"].strip().splitlines() or [""]
+        ElementTree.SubElement(case, element, message=lines[-1][:500]).text = record["details"]
+    elif record["outcome"] == "skipped":
+        ElementTree.SubElement(case, "skipped", message=record["details"][:500])
+    elif record["outcome"] in ("flaky", "quarantined"):
+        # Not failures for the run, but dashboards should still see what went wrong
+        ElementTree.SubElement(case, "system-err").text = f"{record['outcome']}: {record['details']}"
+    if record.get("log"):
+        ElementTree.SubElement(case, "system-out").text = "\n".join(
+            f"[{event['tag']}] +{event['time']:.2f}s {event['message']}" for event in record["log"]
+        )
+    return case
+
+
+def write_junit(records, path, run_id, elapsed):
+    """One <testsuite> per test module, with step durations as testcase properties"""
+    suites = {}
+    for record in records:
+        suites.setdefault(record["test_id"].split(".")[0], []).append(record)
+    root = ElementTree.Element("testsuites", name=f"run {run_id}", tests=str(len(records)), time=f"{elapsed:.3f}")
+    for module, module_records in sorted(suites.items()):
+        outcomes = [record["outcome"] for record in module_records]
+        suite = ElementTree.SubElement(
+            root,
+            "testsuite",
+            name=module,
+            tests=str(len(module_records)),
+            failures=str(outcomes.count("failed")),
+            errors=str(outcomes.count("error")),
+            skipped=str(outcomes.count("skipped")),
+            time=f"{sum(record['duration'] for record in module_records):.3f}",
+        )
+        suite.extend(_junit_case(record) for record in module_records)
+    ElementTree.indent(root)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    ElementTree.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def write_json(records, path, run_id, elapsed):
+    counts = {}
+    for record in records:
+        counts[record["outcome"]] = counts.get(record["outcome"], 0) + 1
+    fields = ("test_id", "outcome", "duration", "attempts", "worker", "steps", "timings", "fingerprint", "tolerated", "quarantine", "details", "log")
+    report = {
+        "run": run_id,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "elapsed": round(elapsed, 3),
+        "counts": counts,
+        "tests": [{field: record[field] for field in fields if record.get(field) not in (None, [], "")} for record in records],
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
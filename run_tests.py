@@ -0,0 +1,427 @@
+import argparse
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import traceback
+import unittest
+import uuid
+
+import settings
+from driver_cache import resolve_chromedriver
+
+# Run without a browser, the harness checks and the API over HTTP; they run first and gate the UI tier
+API_MODULES = [
+    "test_harness",
+    "test_api_tier",
+]
+
+DEFAULT_MODULES = API_MODULES + [
+    "test_product_cart",
+    "test_user_account",
+    "test_admin_panel",
+    "test_order_payment",
+]
+
+
+def collect_tests(modules):
+    """Expand test modules into individual test method ids, with the artifacts each produces and consumes"""
+    from artifacts import declared
+
+    suite = unittest.defaultTestLoader.loadTestsFromNames(modules)
+    tests = {}
+
+    def walk(item):
+        if isinstance(item, unittest.TestSuite):
+            for child in item:
+                walk(child)
+        else:
+            tests[item.id()] = declared(item)
+
+    walk(suite)
+    return tests
+
+
+class Scheduler:
+    """Releases each test once the producers of everything it consumes have finished, pass or fail"""
+
+    def __init__(self, tests):
+        producers = {}
+        for test_id, (produced, _) in tests.items():
+            for name in produced:
+                producers.setdefault(name, set()).add(test_id)
+        # Artifacts nobody produces impose no ordering; consumers fall back to doing the work themselves
+        self.waiting = {
+            test_id: set().union(*(producers.get(name, set()) for name in consumed)) - {test_id}
+            for test_id, (_, consumed) in tests.items()
+        }
+        self.finished = set()
+
+    def ready(self):
+        released = [test_id for test_id, needs in self.waiting.items() if needs <= self.finished]
+        for test_id in released:
+            del self.waiting[test_id]
+        return released
+
+    def finish(self, test_id):
+        self.finished.add(test_id)
+
+    def release_all(self):
+        """Give up on ordering, e.g. for a dependency cycle"""
+        released = list(self.waiting)
+        self.waiting.clear()
+        return released
+
+
+class RecordingResult(unittest.TestResult):
+    """TestResult that keeps one plain record per test so it can cross process boundaries"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self._started = 0.0
+
+    def startTest(self, test):
+        super().startTest(test)
+        self._started = time.time()
+
+    def _record(self, test, outcome, err=None):
+        self.records.append({
+            "test_id": test.id(),
+            "outcome": outcome,
+            "duration": time.time() - self._started,
+            "details": self._exc_info_to_string(err, test) if err else "",
+        })
+
+    def stopTest(self, test):
+        """Fill in what the test gathered; failures are reported before its cleanups have run, so it is read here"""
+        super().stopTest(test)
+        test_log = getattr(test, "test_log", None)
+        for record in self.records:
+            if record["test_id"] != test.id() or "log" in record:
+                continue
+            if record["outcome"] != "skipped":
+                record["duration"] = time.time() - self._started
+            record.update({
+                # Errors the test caught and chose to carry on past, see BrowserTestCase.tolerate
+                "tolerated": getattr(test, "tolerated", []),
+                "impact": getattr(test, "impact", None),
+                "vitals": getattr(test, "vitals", []),
+                "log": test_log.events if test_log else [],
+                "steps": test_log.steps() if test_log else [],
+            })
+
+    def addSuccess(self, test):
+        super().addSuccess(test)
+        self._record(test, "passed")
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self._record(test, "failed", err)
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        self._record(test, "error", err)
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self.records.append({"test_id": test.id(), "outcome": "skipped", "duration": 0.0, "details": reason})
+
+
+def worker_main(worker_id, run_id, task_queue, result_queue):
+    """Run test ids from the shared queue until it is drained"""
+    # worker_context reads these at import time, so neither this module nor anything it imports at the
+    # top may import it; otherwise every worker would share an empty worker id and get its own run id
+    if "worker_context" in sys.modules:
+        raise RuntimeError("worker_context was imported before the worker ids were set; import it lazily in run_tests.py")
+    os.environ["TEST_WORKER_ID"] = str(worker_id)
+    os.environ["TEST_RUN_ID"] = run_id
+
+    from instrumentation import get_tracer
+    from worker_context import run_session_end_hooks
+
+    try:
+        while True:
+            test_id = task_queue.get()
+            if test_id is None:
+                break
+
+            result = RecordingResult()
+            try:
+                unittest.defaultTestLoader.loadTestsFromName(test_id).run(result)
+            except Exception:
+                result.records.append({
+                    "test_id": test_id,
+                    "outcome": "error",
+                    "duration": 0.0,
+                    "details": traceback.format_exc(),
+                })
+
+            for record in result.records:
+                record["worker"] = worker_id
+                record["timings"] = get_tracer().breakdowns.get(record["test_id"])
+                result_queue.put(record)
+            result_queue.put({"done": test_id})
+    finally:
+        # multiprocessing children skip atexit handlers, so close browsers and flush caches explicitly
+        run_session_end_hooks()
+        result_queue.put(None)
+
+
+def run_parallel(tests, workers, run_id):
+    ctx = multiprocessing.get_context("spawn")
+    task_queue = ctx.Queue()
+    result_queue = ctx.Queue()
+    scheduler = Scheduler(tests)
+    in_flight = 0
+
+    def dispatch(test_ids):
+        nonlocal in_flight
+        for test_id in test_ids:
+            task_queue.put(test_id)
+        in_flight += len(test_ids)
+        if not in_flight and not scheduler.waiting:
+            for _ in range(workers):
+                task_queue.put(None)
+
+    processes = [
+        ctx.Process(target=worker_main, args=(worker_id, run_id, task_queue, result_queue))
+        for worker_id in range(1, workers + 1)
+    ]
+    for process in processes:
+        process.start()
+    dispatch(scheduler.ready() or scheduler.release_all())
+
+    records = []
+    finished = 0
+    while finished < workers:
+        try:
+            record = result_queue.get(timeout=1)
+        except queue.Empty:
+            # A worker that died mid-test never reports it done, so the others would wait forever for work
+            if sum(process.is_alive() for process in processes) < workers - finished:
+                print("[RUNNER] A worker exited before reporting every result")
+                break
+            continue
+        if record is None:
+            finished += 1
+            continue
+        if "done" in record:
+            scheduler.finish(record["done"])
+            in_flight -= 1
+            released = scheduler.ready()
+            if not released and not in_flight and scheduler.waiting:
+                print(f"[RUNNER] Unsatisfiable artifact dependencies, running the remaining {len(scheduler.waiting)} tests unordered")
+                released = scheduler.release_all()
+            dispatch(released)
+            continue
+        records.append(record)
+        print(f"[RUNNER] worker-{record['worker']} {record['outcome'].upper():7} {record['test_id']} ({record['duration']:.1f}s)")
+
+    for process in processes:
+        if finished < workers and process.is_alive():
+            process.terminate()
+        process.join()
+
+    # Tests a dead worker had in flight or that were never dispatched still count, so the run fails visibly
+    reported = {record["test_id"] for record in records}
+    for test_id in tests:
+        if test_id not in scheduler.finished and test_id not in reported:
+            records.append({"test_id": test_id, "outcome": "error", "duration": 0.0, "details": "worker exited before reporting a result", "worker": 0})
+            print(f"[RUNNER] worker-0 {'ERROR':7} {test_id} (worker exited before reporting a result)")
+    return records
+
+
+def run_with_reruns(tests, workers, run_id, reruns):
+    """Run tests, then run the ones that failed again up to reruns times; a later pass marks the test flaky"""
+    from flake_tracker import fingerprint, is_failure
+
+    final = {}
+    pending = tests
+    for attempt in range(reruns + 1):
+        if attempt:
+            print(f"[RUNNER] Rerun {attempt}/{reruns}: {len(pending)} failed tests")
+        for record in run_parallel(pending, max(1, min(workers, len(pending))), run_id):
+            if is_failure(record["outcome"]):
+                record["fingerprint"] = fingerprint(record["details"], record["test_id"].rsplit(".", 1)[-1])
+            earlier = final.get(record["test_id"])
+            if earlier and record["outcome"] == "passed":
+                # Keep the failure that made it flaky, it is what needs fixing
+                earlier.update(outcome="flaky", attempts=attempt + 1, duration=earlier["duration"] + record["duration"])
+                continue
+            record["attempts"] = attempt + 1
+            final[record["test_id"]] = record
+        pending = {test_id: tests[test_id] for test_id, record in final.items() if is_failure(record["outcome"])}
+        if not pending:
+            break
+    return list(final.values())
+
+
+def run_tiers(tests, workers, run_id, args, history):
+    """Run the API tier, then the UI tier; a failing API tier skips the UI tier unless --no-gate is given"""
+    from flake_tracker import is_failure
+
+    api_tests = {test_id: declared for test_id, declared in tests.items() if test_id.split(".")[0] in API_MODULES}
+    ui_tests = {test_id: declared for test_id, declared in tests.items() if test_id not in api_tests}
+    records = []
+
+    if api_tests:
+        print(f"[RUNNER] API tier: {len(api_tests)} tests")
+        records = run_with_reruns(api_tests, max(1, min(workers, len(api_tests))), run_id, args.reruns)
+        if not args.no_quarantine:
+            apply_quarantine(records, history)
+        failed = [record["test_id"] for record in records if is_failure(record["outcome"]) and record["outcome"] != "quarantined"]
+        if failed and ui_tests and not args.no_gate:
+            print(f"[RUNNER] {len(failed)} API tests failed, skipping the {len(ui_tests)} UI tests")
+            return records + [
+                {"test_id": test_id, "outcome": "skipped", "duration": 0.0, "details": "API tier failed", "worker": 0, "gated": True}
+                for test_id in ui_tests
+            ]
+
+    if ui_tests:
+        print(f"[RUNNER] UI tier: {len(ui_tests)} tests")
+        # Resolved here, only when browsers are needed, so no UI worker repeats the lookup
+        try:
+            os.environ["CHROMEDRIVER_PATH"] = resolve_chromedriver()
+        except Exception as e:
+            print(f"[RUNNER] Could not resolve chromedriver up front, workers will retry: {str(e)}")
+        ui_records = run_with_reruns(ui_tests, max(1, min(workers, len(ui_tests))), run_id, args.reruns)
+        if not args.no_quarantine:
+            apply_quarantine(ui_records, history)
+        records += ui_records
+    return records
+
+
+def apply_quarantine(records, history):
+    """Failures of quarantined tests are still reported but no longer fail the run"""
+    from flake_tracker import is_failure
+
+    for record in records:
+        reason = history.quarantine_reason(record["test_id"])
+        if reason and is_failure(record["outcome"]):
+            record["outcome"] = "quarantined"
+            record["quarantine"] = reason
+
+
+def print_summary(records, elapsed):
+    from instrumentation import print_breakdown
+
+    counts = {}
+    for record in records:
+        counts[record["outcome"]] = counts.get(record["outcome"], 0) + 1
+
+    for record in records:
+        if record["outcome"] in ("failed", "error", "flaky", "quarantined"):
+            print("=" * 70)
+            print(f"{record['outcome'].upper()}: {record['test_id']} (worker-{record['worker']}, attempt {record.get('attempts', 1)})")
+            if record.get("quarantine"):
+                print(f"Quarantined: {record['quarantine']}")
+            failure = record.get("fingerprint")
+            if failure:
+                print(f"Fingerprint {failure['id']}: {failure['exception']} at {failure['step'] or '?'} {failure['selector']}".rstrip())
+            print("-" * 70)
+            print(record["details"])
+
+    for record in records:
+        for tolerated in record.get("tolerated", []):
+            print(f"[FLAKE] {record['test_id']} tolerated {tolerated['exception']} at {tolerated['step']} ({tolerated['id']})")
+
+    print_breakdown({record["test_id"]: record["timings"] for record in records if record.get("timings")})
+
+    summary = ", ".join(f"{count} {outcome}" for outcome, count in sorted(counts.items()))
+    print(f"[RUNNER] Ran {len(records)} tests in {elapsed:.1f}s: {summary}")
+
+
+def check_vitals(records, run_id):
+    """Print this run's Web Vitals per route and add them to the history; False when a route is over budget"""
+    from web_vitals import VitalsHistory, print_budget_check, print_vitals, summarize
+
+    samples = [sample for record in records for sample in record.get("vitals") or []]
+    if not samples:
+        return True
+    history = VitalsHistory()
+    summary = summarize(samples)
+    print_vitals(summary)
+    violations, warnings = history.check(summary)
+    print_budget_check(violations, warnings)
+    history.add(run_id, summary)
+    history.save()
+    return not violations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the API tier, then the Selenium suites, across parallel worker processes")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="test modules, classes or methods to run")
+    parser.add_argument("-n", "--workers", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    parser.add_argument("--rerun-failed", action="store_true", help="only run the tests that failed in their last recorded run")
+    parser.add_argument("--reruns", type=int, default=1, help="times to run failed tests again before reporting them")
+    parser.add_argument("--no-quarantine", action="store_true", help="let failures of quarantined tests fail the run")
+    parser.add_argument("--changed-since", metavar="REF", help="only run the tests the changes since this git ref can affect")
+    parser.add_argument("--no-gate", action="store_true", help="run the UI tier even when the API tier fails")
+    parser.add_argument("--junit", help="where to write JUnit XML results, default test_runs/<run id>/junit.xml")
+    parser.add_argument("--json", help="where to write JSON results with per-step durations, default test_runs/<run id>/results.json")
+    args = parser.parse_args(argv)
+
+    from flake_tracker import FlakeHistory
+    from impact import ImpactMap, changed_files
+
+    impact_map = ImpactMap()
+
+    history = FlakeHistory()
+    tests = collect_tests(args.modules)
+    if args.rerun_failed:
+        failed = set(history.last_failed())
+        tests = {test_id: declared for test_id, declared in tests.items() if test_id in failed}
+        if not tests:
+            print("[RUNNER] No failed tests in the history, nothing to rerun")
+            return 0
+    if args.changed_since:
+        files = changed_files(args.changed_since)
+        affected = impact_map.affected(files, tests)
+        for test_id, reason in sorted(affected.items()):
+            print(f"[IMPACT] {test_id}: {reason}")
+        print(f"[IMPACT] {len(files)} files changed since {args.changed_since}, running {len(affected)} of {len(tests)} tests")
+        tests = {test_id: declared for test_id, declared in tests.items() if test_id in affected}
+        if not tests:
+            return 0
+    workers = max(1, min(args.workers, len(tests)))
+    if settings.HTTP_CACHE and workers > 1:
+        # Entries are keyed by session token and test data is namespaced per worker, and which worker runs
+        # which test changes between runs, so only a single worker records and replays the same requests
+        parser.error(f"HTTP_CACHE={settings.HTTP_CACHE} needs a single worker, run with -n 1")
+    # A fixed TEST_RUN_ID reproduces the same test data, e.g. to replay an HTTP_CACHE recording
+    run_id = os.environ.get("TEST_RUN_ID") or uuid.uuid4().hex[:6]
+
+    print(f"[RUNNER] Run {run_id}: {len(tests)} tests on {workers} workers")
+    started = time.time()
+    records = run_tiers(tests, workers, run_id, args, history)
+    elapsed = time.time() - started
+    print_summary(records, elapsed)
+
+    from result_log import write_json, write_junit
+
+    junit_path = args.junit or os.path.join("test_runs", run_id, "junit.xml")
+    json_path = args.json or os.path.join("test_runs", run_id, "results.json")
+    write_junit(records, junit_path, run_id, elapsed)
+    write_json(records, json_path, run_id, elapsed)
+    print(f"[RUNNER] Results written to {junit_path} and {json_path}")
+
+    for record in records:
+        # A test the gate skipped says nothing about whether it is flaky
+        if not record.get("gated"):
+            history.add(run_id, record)
+    history.save()
+    mapped = [record for record in records if record.get("impact")]
+    for record in mapped:
+        impact_map.record(record["test_id"], record["impact"])
+    if mapped:
+        impact_map.save()
+    within_budget = check_vitals(records, run_id)
+
+    passed = all(r["outcome"] in ("passed", "skipped", "flaky", "quarantined") for r in records)
+    return 0 if passed and within_budget else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+import queue
+import threading
+from collections import deque
+
+import settings
+from instrumentation import get_tracer
+from result_log import log
+from worker_context import at_session_end, screenshot_path
+
+
+class ScreenshotWriter:
+    """Writes PNG frames to disk on a background thread so tests never block on file I/O"""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="screenshot-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            path, png = item
+            try:
+                with open(path, "wb") as f:
+                    f.write(png)
+            except OSError as e:
+                log("SCREENSHOT", f"Could not write {path}: {str(e)}")
+
+    def submit(self, path, png):
+        self._queue.put((path, png))
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+
+_writer = None
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        _writer = ScreenshotWriter()
+        at_session_end(_writer.close)
+    return _writer
+
+
+class ScreenshotRecorder:
+    """Keeps the last few frames of a test in memory and only saves them when asked to"""
+
+    def __init__(self, driver, frames=settings.SCREENSHOT_FRAMES, verbose=settings.SCREENSHOTS_VERBOSE):
+        self.driver = driver
+        self.verbose = verbose
+        self.frames = deque(maxlen=frames)
+
+    def capture(self, name):
+        with get_tracer().span(name, "screenshot"):
+            png = self.driver.get_screenshot_as_png()
+        path = screenshot_path(name)
+        if self.verbose:
+            get_writer().submit(path, png)
+        else:
+            self.frames.append((path, png))
+        return path
+
+    def flush(self):
+        """Hand every buffered frame to the background writer"""
+        while self.frames:
+            get_writer().submit(*self.frames.popleft())
+
+    def discard(self):
+        self.frames.clear()
@@ -0,0 +1,135 @@
+import os
+
+BASE_URL = os.environ.get("SHOPIT_BASE_URL", "http://localhost:3000")
+
+# A pooled browser is quit and replaced after serving this many tests
+DRIVER_MAX_USES = int(os.environ.get("DRIVER_MAX_USES", "20"))
+
+CHROME_ARGUMENTS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--window-size=1920,1080",
+]
+
+# The frontend talks to the Express backend directly on this origin (see frontend/src/index.js)
+API_URL = os.environ.get("SHOPIT_API_URL", "http://localhost:5000")
+API_PREFIX = "/api/v1"
+# Same cookie backend/utils/jwtToken.js sets and auth_session.inject_token puts into the browser
+AUTH_COOKIE = "token"
+
+CREDENTIALS = {
+    "admin": {
+        "email": os.environ.get("SHOPIT_ADMIN_EMAIL", "admin@example.com"),
+        "password": os.environ.get("SHOPIT_ADMIN_PASSWORD", "admin123"),
+    },
+    "user": {
+        "email": os.environ.get("SHOPIT_USER_EMAIL", "test@example.com"),
+        "password": os.environ.get("SHOPIT_USER_PASSWORD", "password123"),
+    },
+}
+
+# Resolved chromedriver paths, keyed by Chrome version; shared by every test and worker
+DRIVER_CACHE_FILE = os.environ.get(
+    "DRIVER_CACHE_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".driver_cache", "chromedriver.json"),
+)
+# Skips resolution entirely; run_tests.py sets this for its workers
+CHROMEDRIVER_PATH = os.environ.get("CHROMEDRIVER_PATH", "")
+DRIVER_OFFLINE = os.environ.get("DRIVER_OFFLINE", "") == "1"
+
+# Which fallback locator matched for each logical element, per page
+LOCATOR_CACHE_FILE = os.environ.get(
+    "LOCATOR_CACHE_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".locator_cache.json"),
+)
+# Seconds the best-ranked locator gets to appear before a fallback may match instead
+LOCATOR_GRACE = float(os.environ.get("LOCATOR_GRACE", "1.0"))
+
+# Screenshots are kept in memory and only written when a test fails, unless verbose is set
+SCREENSHOT_FRAMES = int(os.environ.get("SCREENSHOT_FRAMES", "10"))
+SCREENSHOTS_VERBOSE = os.environ.get("SCREENSHOTS_VERBOSE", "") == "1"
+
+# The "headless" profile runs Chrome without a window and blocks the resource categories below
+BROWSER_PROFILE = os.environ.get("BROWSER_PROFILE", "headed")
+HEADLESS = BROWSER_PROFILE == "headless"
+BLOCK_RESOURCES = os.environ.get("BLOCK_RESOURCES", "1" if HEADLESS else "0") == "1"
+
+# Network.setBlockedURLs patterns by category; a test opts back in with resource_blocking.allow_resources
+BLOCKED_URL_PATTERNS = {
+    "images": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*res.cloudinary.com*"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*fonts.googleapis.com*", "*fonts.gstatic.com*"],
+    "analytics": ["*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*connect.facebook.net*"],
+    "stripe": ["*js.stripe.com*", "*m.stripe.network*", "*m.stripe.com*"],
+}
+
+# Serve /api/v1 from stub_backend.py (in memory, one per worker) instead of Express + MongoDB
+STUB_BACKEND = os.environ.get("STUB_BACKEND", "") == "1"
+STUB_SEED_FILE = os.environ.get(
+    "STUB_SEED_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend", "data", "product.json"),
+)
+
+# Database the Express backend uses; data_factory seeds run fixtures into it directly
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://127.0.0.1:27017/")
+MONGO_DB = os.environ.get("MONGO_DB", "shopit")
+# Each test process shares one client; a worker runs one test at a time, so a small pool is enough
+MONGO_POOL_SIZE = int(os.environ.get("MONGO_POOL_SIZE", "4"))
+
+# Time driver commands, waits and screenshots per test and export them as Chrome trace events
+TRACE = os.environ.get("TRACE", "1") == "1"
+
+# Mount a local Stripe-like card element on the payment page and confirm against the stand-in's /payment/process
+PAYMENT_STUB = os.environ.get("PAYMENT_STUB", "1" if STUB_BACKEND else "0") == "1"
+
+# "record" saves every /api/v1 response the browser and the suite receive; "replay" serves them back from disk
+HTTP_CACHE = os.environ.get("HTTP_CACHE", "")
+HTTP_CACHE_DIR = os.environ.get(
+    "HTTP_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".http_cache"),
+)
+
+# Outcomes of the last FLAKE_HISTORY_LENGTH runs per test, written by run_tests.py
+FLAKE_HISTORY_FILE = os.environ.get(
+    "FLAKE_HISTORY_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_runs", "history.json"),
+)
+FLAKE_HISTORY_LENGTH = int(os.environ.get("FLAKE_HISTORY_LENGTH", "20"))
+# A test that switched between pass and fail this many times in its history is quarantined
+FLAKE_FLIPS = int(os.environ.get("FLAKE_FLIPS", "3"))
+# ...as is one that passed only on a rerun this many times in its history; a single flaky run is not enough,
+# so one unlucky run does not hide real regressions in the test for the length of the history
+FLAKE_RERUN_PASSES = int(os.environ.get("FLAKE_RERUN_PASSES", "2"))
+# Hand-maintained {"test id": "reason"} of tests whose failures do not fail the run
+QUARANTINE_FILE = os.environ.get(
+    "QUARANTINE_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "quarantine.json"),
+)
+
+# Frontend routes and backend endpoints each test reached, for run_tests.py --changed-since
+IMPACT_MAP_FILE = os.environ.get(
+    "IMPACT_MAP_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "impact_map.json"),
+)
+
+# Measure Navigation Timing, FCP, LCP, CLS and long tasks of every page the tests open
+VITALS = os.environ.get("VITALS", "1") == "1"
+VITALS_HISTORY_FILE = os.environ.get(
+    "VITALS_HISTORY_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_runs", "vitals.json"),
+)
+VITALS_HISTORY_LENGTH = int(os.environ.get("VITALS_HISTORY_LENGTH", "20"))
+# {"default": {metric: limit}, "<App.js route>": {metric: limit}}; a route over budget fails the run
+VITALS_BUDGETS_FILE = os.environ.get(
+    "VITALS_BUDGETS_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "vitals_budgets.json"),
+)
+# Warn when a route's p75 grows past this multiple of its usual value, even within budget
+VITALS_REGRESSION = float(os.environ.get("VITALS_REGRESSION", "1.25"))
+
+# The API tier's pooled HTTP sessions; tests in a worker run one at a time, so the pool only needs a few keep-alive connections
+API_POOL_SIZE = int(os.environ.get("API_POOL_SIZE", "4"))
+API_TIMEOUT = float(os.environ.get("API_TIMEOUT", "10"))
+
+# Which tests' buffered step logs are printed when they finish: "all", "failed" or "none"
+LOG_OUTPUT = os.environ.get("LOG_OUTPUT", "all")
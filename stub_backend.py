@@ -0,0 +1,597 @@
+import email.parser
+import email.policy
+import http.client
+import json
+import os
+import re
+import secrets
+import select
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import settings
+from result_log import log
+from worker_context import at_session_end
+
+# Request headers that belong to one hop and must not be forwarded
+HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-connection", "proxy-authorization", "proxy-authenticate",
+    "te", "trailer", "transfer-encoding", "upgrade",
+}
+
+FILTER_OPERATORS = {
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+}
+
+# Stripe's test card numbers that always decline
+DECLINED_CARDS = {"4000000000000002", "4000000000009995"}
+
+DEFAULT_AVATAR = {
+    "public_id": "avatars/default_avatar",
+    "url": "https://res.cloudinary.com/dxqnb8xjb/image/upload/v1602395872/avatars/default_avatar.jpg",
+}
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=500):
+        super().__init__(message)
+        self.status = status
+
+
+def object_id():
+    """24-hex id shaped like a Mongo ObjectId, so /product/:id routes and page_key() treat it the same"""
+    return f"{int(time.time()):08x}{secrets.token_hex(8)}"
+
+
+def now():
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _public(user):
+    return {key: value for key, value in user.items() if key != "password"}
+
+
+class ShopitStore:
+    """In-memory products, users, sessions and orders with the same responses as the Express controllers"""
+
+    def __init__(self, seed_file=settings.STUB_SEED_FILE):
+        self.products = {}
+        self.users = {}
+        self.orders = {}
+        self.payments = {}
+        self.tokens = {}
+        self._lock = threading.Lock()
+
+        for role, credentials in settings.CREDENTIALS.items():
+            self._add_user("Admin" if role == "admin" else "Test User", credentials["email"], credentials["password"], role)
+
+        with open(seed_file) as f:
+            for product in json.load(f):
+                self._add_product(product)
+
+    def _add_user(self, name, email, password, role="user"):
+        user = {
+            "_id": object_id(),
+            "name": name,
+            "email": email,
+            "password": password,
+            "avatar": dict(DEFAULT_AVATAR),
+            "role": role,
+            "createdAt": now(),
+        }
+        self.users[user["_id"]] = user
+        return user
+
+    def _add_product(self, fields):
+        product = {"ratings": 0, "images": [], "stock": 0, "numOfReviews": 0, "reviews": []}
+        product.update(fields)
+        product.update({"_id": object_id(), "createdAt": now()})
+        for key in ("price", "ratings", "stock"):
+            if isinstance(product[key], str):
+                product[key] = _number(product[key]) or 0
+        self.products[product["_id"]] = product
+        return product
+
+    def insert_many(self, collection, records):
+        """Bulk-load fixture records from data_factory, keeping their ids"""
+        with self._lock:
+            target = getattr(self, collection)
+            for record in records:
+                target[record["_id"]] = dict(record, createdAt=now())
+
+    def authenticate(self, token):
+        user = self.users.get(self.tokens.get(token))
+        if token is None:
+            raise ApiError("Login first to access this resource", 401)
+        if user is None:
+            raise ApiError("Invalid token", 401)
+        return user
+
+    def _issue_token(self, user):
+        token = secrets.token_hex(24)
+        self.tokens[token] = user["_id"]
+        return token
+
+    def _find(self, collection, item_id, message):
+        if item_id not in collection:
+            raise ApiError(message, 404)
+        return collection[item_id]
+
+    # Products
+
+    def _matches(self, product, query):
+        keyword = query.get("keyword")
+        if keyword:
+            try:
+                if not re.search(keyword, product["name"], re.IGNORECASE):
+                    return False
+            except re.error:
+                if keyword.lower() not in product["name"].lower():
+                    return False
+
+        for key, value in query.items():
+            if key in ("keyword", "limit", "page"):
+                continue
+            field, _, operator = key.partition("[")
+            operator = operator.rstrip("]")
+            actual = product.get(field)
+            if operator in FILTER_OPERATORS:
+                if _number(actual) is None or _number(value) is None:
+                    return False
+                if not FILTER_OPERATORS[operator](_number(actual), _number(value)):
+                    return False
+            elif isinstance(actual, (int, float)):
+                if _number(value) != actual:
+                    return False
+            elif actual != value:
+                return False
+        return True
+
+    def get_products(self, user, query, body):
+        res_per_page = int(query["limit"]) if query.get("limit") else 4
+        page = int(query.get("page") or 1)
+        with self._lock:
+            matches = [product for product in self.products.values() if self._matches(product, query)]
+            product_count = len(self.products)
+        skip = res_per_page * (page - 1)
+        products = matches[skip:skip + res_per_page]
+        return 200, {
+            "success": True,
+            "productCount": product_count,
+            "resPerPage": res_per_page,
+            "filteredProductsCount": len(products),
+            "products": products,
+        }
+
+    def get_product(self, user, query, body, id):
+        if not re.fullmatch(r"[0-9a-fA-F]{24}", id):
+            return 400, {"success": False, "message": "Invalid Product ID format"}
+        return 200, {"success": True, "product": self._find(self.products, id, "Product not found")}
+
+    def admin_products(self, user, query, body):
+        return 200, {"success": True, "products": list(self.products.values())}
+
+    def new_product(self, user, query, body):
+        if not body.get("images"):
+            raise ApiError("Please provide at least one product image", 400)
+        missing = [field for field in ("name", "price", "description", "category", "seller") if not body.get(field)]
+        if missing:
+            raise ApiError(f"Product creation failed: missing {', '.join(missing)}", 500)
+        with self._lock:
+            product = self._add_product(dict(body, user=user["_id"]))
+        return 201, {"success": True, "message": "Product created successfully", "product": product}
+
+    def update_product(self, user, query, body, id):
+        with self._lock:
+            product = self._find(self.products, id, "Product not found")
+            product.update({key: value for key, value in body.items() if key != "_id"})
+        return 200, {"success": True, "product": product}
+
+    def delete_product(self, user, query, body, id):
+        with self._lock:
+            self._find(self.products, id, "Product not found")
+            del self.products[id]
+        return 200, {"success": True, "message": "Product is deleted."}
+
+    # Users and sessions
+
+    def register(self, user, query, body):
+        name, email, password = body.get("name"), body.get("email"), body.get("password")
+        if not name or not email or not password:
+            raise ApiError("Please provide all required fields", 400)
+        with self._lock:
+            if any(existing["email"] == email for existing in self.users.values()):
+                raise ApiError("User with this email already exists", 400)
+            user = self._add_user(name, email, password)
+            token = self._issue_token(user)
+        return 200, {"success": True, "token": token, "user": _public(user)}
+
+    def login(self, user, query, body):
+        email, password = body.get("email"), body.get("password")
+        if not email or not password:
+            raise ApiError("Please enter email & password", 400)
+        with self._lock:
+            user = next((user for user in self.users.values() if user["email"] == email), None)
+            if user is None or user["password"] != password:
+                raise ApiError("Invalid Email or Password", 401)
+            token = self._issue_token(user)
+        return 200, {"success": True, "token": token, "user": _public(user)}
+
+    def logout(self, user, query, body):
+        return 200, {"success": True, "message": "Logged out", "token": None}
+
+    def forgot_password(self, user, query, body):
+        if not body.get("email"):
+            raise ApiError("Please provide an email address", 400)
+        if not any(user["email"] == body["email"] for user in self.users.values()):
+            raise ApiError("User not found with this email", 404)
+        return 200, {"success": True, "message": f"Email sent to: {body['email']}"}
+
+    def me(self, user, query, body):
+        return 200, {"success": True, "user": _public(user)}
+
+    def update_me(self, user, query, body):
+        with self._lock:
+            user.update({key: body[key] for key in ("name", "email") if body.get(key)})
+        return 200, {"success": True}
+
+    def update_password(self, user, query, body):
+        if body.get("oldPassword") != user["password"]:
+            raise ApiError("Old password is incorrect", 400)
+        with self._lock:
+            user["password"] = body.get("password") or user["password"]
+            token = self._issue_token(user)
+        return 200, {"success": True, "token": token, "user": _public(user)}
+
+    def delete_me(self, user, query, body):
+        with self._lock:
+            self.users.pop(user["_id"], None)
+        return 200, {"success": True, "message": "Account deleted successfully", "token": None}
+
+    def admin_users(self, user, query, body):
+        return 200, {"success": True, "users": [_public(user) for user in self.users.values()]}
+
+    def admin_user(self, user, query, body, id):
+        return 200, {"success": True, "user": _public(self._find(self.users, id, f"User not found with id : {id}"))}
+
+    def admin_update_user(self, user, query, body, id):
+        with self._lock:
+            target = self._find(self.users, id, f"User not found with id : {id}")
+            target.update({key: body[key] for key in ("name", "email", "role") if body.get(key)})
+        return 200, {"success": True}
+
+    def admin_delete_user(self, user, query, body, id):
+        with self._lock:
+            self._find(self.users, id, f"User not found with id : {id}")
+            del self.users[id]
+        return 200, {"success": True}
+
+    # Orders
+
+    def new_order(self, user, query, body):
+        fields = ("orderItems", "shippingInfo", "itemsPrice", "taxPrice", "shippingPrice", "totalPrice", "paymentInfo")
+        order = {field: body.get(field) for field in fields}
+        order.update({
+            "_id": object_id(),
+            "user": user["_id"],
+            "paidAt": now(),
+            "orderStatus": "Processing",
+            "createdAt": now(),
+        })
+        with self._lock:
+            self.orders[order["_id"]] = order
+        return 200, {"success": True, "order": order}
+
+    def my_orders(self, user, query, body):
+        return 200, {"success": True, "orders": [order for order in self.orders.values() if order["user"] == user["_id"]]}
+
+    def get_order(self, user, query, body, id):
+        order = dict(self._find(self.orders, id, "No order found with this ID"))
+        owner = self.users.get(order["user"])
+        if owner:
+            order["user"] = {"_id": owner["_id"], "name": owner["name"], "email": owner["email"]}
+        return 200, {"success": True, "order": order}
+
+    def all_orders(self, user, query, body):
+        orders = list(self.orders.values())
+        total_amount = sum(_number(order.get("totalPrice")) or 0 for order in orders)
+        return 200, {"success": True, "totalAmount": total_amount, "orders": orders}
+
+    def update_order(self, user, query, body, id):
+        with self._lock:
+            order = self._find(self.orders, id, "No order found with this ID")
+            if order["orderStatus"] == "Delivered":
+                raise ApiError("You have already delivered this order.", 400)
+            for item in order.get("orderItems") or []:
+                product = self.products.get(item.get("product"))
+                if product:
+                    product["stock"] = product.get("stock", 0) - (_number(item.get("quantity")) or 0)
+            order["orderStatus"] = body.get("status")
+            order["deliveredAt"] = now()
+        return 200, {"success": True}
+
+    # Payments
+
+    def process_payment(self, user, query, body):
+        """Confirm a card payment the way the local card element (payment_stub.py) expects"""
+        card = re.sub(r"\D", "", str(body.get("card") or ""))
+        if card in DECLINED_CARDS:
+            return 402, {"success": False, "message": "Your card was declined."}
+        payment_id = f"pi_{secrets.token_hex(12)}"
+        with self._lock:
+            self.payments[payment_id] = {"user": user["_id"], "amount": _number(body.get("amount")) or 0, "status": "succeeded"}
+        return 200, {"success": True, "id": payment_id, "client_secret": f"{payment_id}_secret_{secrets.token_hex(8)}"}
+
+    def delete_order(self, user, query, body, id):
+        with self._lock:
+            self._find(self.orders, id, "No order found with this ID")
+            del self.orders[id]
+        return 200, {"success": True}
+
+
+# (method, path under /api/v1, ShopitStore method, required role); the first match wins
+ROUTES = [
+    ("GET", r"/products", "get_products", None),
+    ("GET", r"/products/(?P<id>[^/]+)", "get_product", None),
+    ("GET", r"/admin/products", "admin_products", "admin"),
+    ("POST", r"/admin/products/new", "new_product", "admin"),
+    ("PUT", r"/admin/products/(?P<id>[^/]+)", "update_product", "admin"),
+    ("DELETE", r"/admin/products/(?P<id>[^/]+)", "delete_product", "admin"),
+    ("POST", r"/register", "register", None),
+    ("POST", r"/login", "login", None),
+    ("GET", r"/logout", "logout", None),
+    ("POST", r"/password/forgot", "forgot_password", None),
+    ("GET", r"/me", "me", "user"),
+    ("PUT", r"/me/update", "update_me", "user"),
+    ("PUT", r"/password/update", "update_password", "user"),
+    ("DELETE", r"/me/delete", "delete_me", "user"),
+    ("GET", r"/admin/users", "admin_users", "admin"),
+    ("GET", r"/admin/users/(?P<id>[^/]+)", "admin_user", "admin"),
+    ("PUT", r"/admin/users/(?P<id>[^/]+)", "admin_update_user", "admin"),
+    ("DELETE", r"/admin/users/(?P<id>[^/]+)", "admin_delete_user", "admin"),
+    ("POST", r"/order/new", "new_order", "user"),
+    ("GET", r"/order/me", "my_orders", "user"),
+    ("GET", r"/order/(?P<id>[^/]+)", "get_order", "user"),
+    ("GET", r"/admin/order", "all_orders", "admin"),
+    ("PUT", r"/admin/order/(?P<id>[^/]+)", "update_order", "admin"),
+    ("DELETE", r"/admin/order/(?P<id>[^/]+)", "delete_order", "admin"),
+    ("POST", r"/payment/process", "process_payment", "user"),
+]
+ROUTES = [(method, re.compile(pattern + "/?"), action, role) for method, pattern, action, role in ROUTES]
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """Serves /api/v1 from the store; as Chrome's proxy it forwards every other origin untouched"""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, keep-alive clients wait out the delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch()
+
+    do_POST = do_PUT = do_DELETE = do_PATCH = do_HEAD = do_OPTIONS = do_GET
+
+    def do_CONNECT(self):
+        """Tunnel https and websocket traffic (e.g. the dev server's hot reload) straight through"""
+        host, _, port = self.path.rpartition(":")
+        try:
+            upstream = socket.create_connection((host, int(port)), timeout=30)
+        except (OSError, ValueError):
+            self.send_error(502)
+            return
+
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        self.close_connection = True
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                readable, _, broken = select.select(sockets, [], sockets, 60)
+                if broken or not readable:
+                    return
+                for source in readable:
+                    data = source.recv(65536)
+                    if not data:
+                        return
+                    (upstream if source is self.connection else self.connection).sendall(data)
+        except OSError:
+            pass
+        finally:
+            upstream.close()
+
+    def _dispatch(self):
+        if self.path.startswith("http://"):
+            url = urlsplit(self.path)
+            if url.netloc != self.server.api_netloc:
+                self._forward(url)
+                return
+            path, query = url.path, url.query
+        else:
+            path, _, query = self.path.partition("?")
+
+        body = self._read_body()
+        if self.command == "OPTIONS":
+            self._send(204, None)
+        elif path.startswith(settings.API_PREFIX):
+            self._api(path[len(settings.API_PREFIX):], query, body)
+        elif path == "/api/test":
+            self._send(200, {"message": "API is working!"})
+        else:
+            self._send(404, {"success": False, "message": f"Cannot {self.command} {path}"})
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _parse_body(self, body):
+        content_type = self.headers.get("Content-Type", "")
+        if not body:
+            return {}
+        if content_type.startswith("application/json"):
+            return json.loads(body.decode("utf-8"))
+        if content_type.startswith("multipart/form-data"):
+            # Product forms post FormData; uploaded files become image entries like multer + newProduct do
+            message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+                f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + body
+            )
+            fields = {}
+            for part in message.iter_parts():
+                name = part.get_param("name", header="content-disposition")
+                filename = part.get_filename()
+                if filename:
+                    stored = f"{object_id()}-{filename}"
+                    fields.setdefault("images", []).append({"public_id": stored, "url": f"/uploads/{stored}"})
+                elif name:
+                    fields[name] = part.get_payload(decode=True).decode("utf-8")
+            return fields
+        return {key: values[-1] for key, values in parse_qs(body.decode("utf-8")).items()}
+
+    def _token(self):
+        for chunk in (self.headers.get("Cookie") or "").split(";"):
+            name, _, value = chunk.strip().partition("=")
+            if name == settings.AUTH_COOKIE and value:
+                return value
+        authorization = self.headers.get("Authorization") or ""
+        if authorization.startswith("Bearer "):
+            return authorization.split(" ")[1]
+        return None
+
+    def _api(self, path, query, body):
+        store = self.server.store
+        for method, pattern, action, role in ROUTES:
+            match = pattern.fullmatch(path)
+            if method != self.command or match is None:
+                continue
+            try:
+                user = store.authenticate(self._token()) if role else None
+                if role == "admin" and user["role"] != "admin":
+                    raise ApiError(f"Role ({user['role']}) is not allowed to access this resource", 403)
+                params = {key: values[-1] for key, values in parse_qs(query, keep_blank_values=True).items()}
+                status, payload = getattr(store, action)(user, params, self._parse_body(body), **match.groupdict())
+            except ApiError as e:
+                status, payload = e.status, {"success": False, "message": str(e)}
+            except (ValueError, KeyError) as e:
+                status, payload = 400, {"success": False, "message": str(e)}
+            self._send(status, payload)
+            return
+        self._send(404, {"success": False, "message": f"Cannot {self.command} {settings.API_PREFIX}{path}"})
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Access-Control-Allow-Origin", self.server.frontend_origin)
+        self.send_header("Access-Control-Allow-Credentials", "true")
+        self.send_header("Vary", "Origin")
+        if self.command == "OPTIONS":
+            self.send_header("Access-Control-Allow-Methods", "GET,HEAD,PUT,PATCH,POST,DELETE")
+            self.send_header("Access-Control-Allow-Headers", self.headers.get("Access-Control-Request-Headers", "Content-Type"))
+        if payload and "token" in payload:
+            token = payload["token"]
+            if token:
+                self.send_header("Set-Cookie", f"{settings.AUTH_COOKIE}={token}; Path=/; HttpOnly; SameSite=Lax")
+            else:
+                del payload["token"]
+                data = json.dumps(payload).encode("utf-8")
+                self.send_header("Set-Cookie", f"{settings.AUTH_COOKIE}=; Path=/; Expires=Thu, 01 Jan 1970 00:00:00 GMT; HttpOnly")
+        if payload is not None:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def _forward(self, url):
+        body = self._read_body()
+        headers = {key: value for key, value in self.headers.items() if key.lower() not in HOP_HEADERS}
+        path = url.path or "/"
+        if url.query:
+            path = f"{path}?{url.query}"
+
+        connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+        try:
+            connection.request(self.command, path, body or None, headers)
+            response = connection.getresponse()
+            data = response.read()
+        except OSError:
+            self.send_error(502, f"Could not reach {url.netloc}")
+            return
+        finally:
+            connection.close()
+
+        self.send_response(response.status, response.reason)
+        for key, value in response.getheaders():
+            if key.lower() not in HOP_HEADERS and key.lower() != "content-length":
+                self.send_header(key, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+
+class StubBackend:
+    """A running stand-in server; doubles as the HTTP proxy Chrome is pointed at"""
+
+    def __init__(self, port=0):
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), StubRequestHandler)
+        self.server.daemon_threads = True
+        self.server.store = ShopitStore()
+        self.server.api_netloc = urlsplit(settings.API_URL).netloc
+        frontend = urlsplit(settings.BASE_URL)
+        self.server.frontend_origin = f"{frontend.scheme}://{frontend.netloc}"
+        self.store = self.server.store
+        self.port = self.server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, name="stub-backend", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        log("STUB", f"Serving {settings.API_PREFIX} from memory on {self.url} ({len(self.store.products)} products)")
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def chrome_arguments(self):
+        # Chrome bypasses proxies for localhost unless <-loopback> is listed
+        return [f"--proxy-server={self.url}", "--proxy-bypass-list=<-loopback>"]
+
+
+_stub = None
+_stub_lock = threading.Lock()
+
+
+def get_stub():
+    """The stand-in backend for this process, started on first use; each runner worker gets its own"""
+    global _stub
+    with _stub_lock:
+        if _stub is None:
+            _stub = StubBackend().start()
+            at_session_end(_stub.stop)
+        return _stub
+
+
+if __name__ == "__main__":
+    stub = StubBackend(int(os.environ.get("STUB_PORT", "5000"))).start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.stop()
@@ -1,47 +1,43 @@
 import unittest
-import time
-import random
-import os
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
-class AdminPanelTest(unittest.TestCase):
+import settings
+from browser_test import BrowserTestCase
+from data_factory import run_scoped_id
+from dom_query import extract
+from worker_context import output_path
+
+class AdminPanelTest(BrowserTestCase):
     def setUp(self):
-        chrome_options = Options()
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        
-        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-        self.driver.maximize_window()
+        super().setUp()
         
-        if not os.path.exists("screenshots"):
-            os.makedirs("screenshots")
+        self.base_url = settings.BASE_URL
         
-        self.base_url = "http://localhost:3000"
-        
-        self.admin_email = "admin@example.com"
-        self.admin_password = "admin123"
+        self.admin_email = settings.CREDENTIALS["admin"]["email"]
+        self.admin_password = settings.CREDENTIALS["admin"]["password"]
         
         self.wait = WebDriverWait(self.driver, 10)
         
         self.admin_login()
         
     def admin_login(self):
-        """Helper method to login as admin"""
+        """Helper method to login as admin, reusing the session's API login when the backend allows it"""
+        try:
+            self.log("SETUP", "Logging in as admin through the API")
+            self.login_as("admin")
+            return
+        except Exception as e:
+            self.log("SETUP", f"API login failed, falling back to the login form: {str(e)}")
+        
         try:
-            print("[SETUP] Logging in as admin")
+            self.log("SETUP", "Logging in as admin")
             self.driver.get(f"{self.base_url}/login")
-            time.sleep(2)
+            self.waiter.ready((By.ID, "email_field"))
             
-            self.driver.save_screenshot("screenshots/admin_login_page.png")
+            self.screenshots.capture("admin_login_page")
             
             email_field = self.wait.until(EC.presence_of_element_located((By.ID, "email_field")))
             email_field.clear()
@@ -54,16 +50,11 @@ class AdminPanelTest(unittest.TestCase):
             submit_button = self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
             submit_button.click()
             
-            time.sleep(3)
-            self.driver.save_screenshot("screenshots/admin_after_login.png")
-            
-            print("[SETUP] Navigating to admin dashboard")
-            self.driver.get(f"{self.base_url}/admin/dashboard")
-            time.sleep(2)
-            self.driver.save_screenshot("screenshots/admin_dashboard.png")
+            self.waiter.ready(label="admin login")
+            self.screenshots.capture("admin_after_login")
             
         except Exception as e:
-            self.driver.save_screenshot("screenshots/admin_login_error.png")
+            self.screenshots.capture("admin_login_error")
             raise Exception(f"Admin login failed: {str(e)}")
 
     def find_element_safely(self, by, value, timeout=10, screenshot_prefix="element"):
@@ -74,7 +65,7 @@ class AdminPanelTest(unittest.TestCase):
             )
             return element
         except (TimeoutException, NoSuchElementException):
-            self.driver.save_screenshot(f"screenshots/{screenshot_prefix}_not_found.png")
+            self.screenshots.capture(f"{screenshot_prefix}_not_found")
             raise Exception(f"Could not find element {by}={value}")
 
     def test_admin_dashboard(self):
@@ -82,7 +73,12 @@ class AdminPanelTest(unittest.TestCase):
         try:
             driver = self.driver
             
-            print("[DASHBOARD] Verifying dashboard elements")
+            self.log("DASHBOARD", "Navigating to admin dashboard")
+            driver.get(f"{self.base_url}/admin/dashboard")
+            self.waiter.ready()
+            self.screenshots.capture("admin_dashboard")
+            
+            self.log("DASHBOARD", "Verifying dashboard elements")
             
             dashboard = self.find_element_safely(
                 By.CSS_SELECTOR, 
@@ -104,13 +100,13 @@ class AdminPanelTest(unittest.TestCase):
                     screenshot_prefix=f"dashboard_{name}"
                 )
                 self.assertTrue(section.is_displayed())
-                print(f"[DASHBOARD] Verified {name} section")
+                self.log("DASHBOARD", f"Verified {name} section")
             
-            driver.save_screenshot("screenshots/dashboard_test_complete.png")
-            print("[DASHBOARD] Dashboard test completed successfully")
+            self.screenshots.capture("dashboard_test_complete")
+            self.log("DASHBOARD", "Dashboard test completed successfully")
             
         except Exception as e:
-            self.driver.save_screenshot("screenshots/dashboard_test_error.png")
+            self.screenshots.capture("dashboard_test_error")
             self.fail(f"Dashboard test failed: {str(e)}")
 
     def test_product_management(self):
@@ -118,10 +114,10 @@ class AdminPanelTest(unittest.TestCase):
         try:
             driver = self.driver
             
-            print("[PRODUCTS] Navigating to products list")
+            self.log("PRODUCTS", "Navigating to products list")
             driver.get(f"{self.base_url}/admin/products")
-            time.sleep(2)
-            driver.save_screenshot("screenshots/products_list.png")
+            self.waiter.ready()
+            self.screenshots.capture("products_list")
             
             products_table = self.find_element_safely(
                 By.CSS_SELECTOR, 
@@ -130,20 +126,19 @@ class AdminPanelTest(unittest.TestCase):
             )
             self.assertTrue(products_table.is_displayed())
             
-            print("[PRODUCTS] Testing new product creation")
+            self.log("PRODUCTS", "Testing new product creation")
             new_product_btn = self.find_element_safely(
                 By.CSS_SELECTOR, 
                 ".new-product-btn", 
                 screenshot_prefix="new_product_btn"
             )
             new_product_btn.click()
-            time.sleep(2)
-            driver.save_screenshot("screenshots/new_product_form.png")
+            self.waiter.ready((By.ID, "name_field"))
+            self.screenshots.capture("new_product_form")
             
-            random_num = random.randint(1000, 9999)
-            product_name = f"Test Product {random_num}"
+            product_name = f"Test Product {run_scoped_id('product')}"
             
-            print(f"[PRODUCTS] Creating product: {product_name}")
+            self.log("PRODUCTS", f"Creating product: {product_name}")
             
             name_field = self.find_element_safely(
                 By.ID, 
@@ -193,30 +188,30 @@ class AdminPanelTest(unittest.TestCase):
             seller_field.clear()
             seller_field.send_keys("Test Seller")
             
-            driver.save_screenshot("screenshots/product_form_filled.png")
+            self.screenshots.capture("product_form_filled")
             
-            print("[PRODUCTS] Submitting product form")
+            self.log("PRODUCTS", "Submitting product form")
             submit_button = self.find_element_safely(
                 By.CSS_SELECTOR, 
                 "button[type='submit']", 
                 screenshot_prefix="product_submit_button"
             )
             submit_button.click()
-            time.sleep(3)
+            self.waiter.ready(label="product submit")
             
-            driver.save_screenshot("screenshots/after_product_creation.png")
+            self.screenshots.capture("after_product_creation")
             
             self.assertIn("success", driver.page_source.lower())
-            print("[PRODUCTS] Product management test completed successfully")
+            self.log("PRODUCTS", "Product management test completed successfully")
             
-            with open("test_product_info.txt", "w") as f:
+            with open(output_path("test_product_info.txt"), "w") as f:
                 f.write(f"Product Name: {product_name}\n")
                 f.write("Price: 99.99\n")
                 f.write("Category: Electronics\n")
                 f.write("Stock: 50\n")
             
         except Exception as e:
-            self.driver.save_screenshot("screenshots/product_test_error.png")
+            self.screenshots.capture("product_test_error")
             self.fail(f"Product management test failed: {str(e)}")
 
     def test_order_management(self):
@@ -224,10 +219,10 @@ class AdminPanelTest(unittest.TestCase):
         try:
             driver = self.driver
             
-            print("[ORDERS] Navigating to orders list")
+            self.log("ORDERS", "Navigating to orders list")
             driver.get(f"{self.base_url}/admin/orders")
-            time.sleep(2)
-            driver.save_screenshot("screenshots/orders_list.png")
+            self.waiter.ready()
+            self.screenshots.capture("orders_list")
             
             try:
                 orders_table = self.find_element_safely(
@@ -238,9 +233,9 @@ class AdminPanelTest(unittest.TestCase):
                 )
                 self.assertTrue(orders_table.is_displayed())
                 
-                order_rows = driver.find_elements(By.CSS_SELECTOR, ".orders-table tr")
+                order_rows = extract(driver, ".orders-table tr")
                 if len(order_rows) > 1:
-                    print("[ORDERS] Viewing order details")
+                    self.log("ORDERS", "Viewing order details")
                     view_button = self.find_element_safely(
                         By.CSS_SELECTOR, 
                         ".view-order-btn", 
@@ -248,8 +243,8 @@ class AdminPanelTest(unittest.TestCase):
                         timeout=5
                     )
                     view_button.click()
-                    time.sleep(2)
-                    driver.save_screenshot("screenshots/order_details.png")
+                    self.waiter.ready((By.CSS_SELECTOR, ".order-details"))
+                    self.screenshots.capture("order_details")
                     
                     order_details = self.find_element_safely(
                         By.CSS_SELECTOR, 
@@ -259,17 +254,18 @@ class AdminPanelTest(unittest.TestCase):
                     )
                     self.assertTrue(order_details.is_displayed())
                     
-                    print("[ORDERS] Order details verified successfully")
+                    self.log("ORDERS", "Order details verified successfully")
                 else:
-                    print("[ORDERS] No orders found to test details view")
+                    self.log("ORDERS", "No orders found to test details view")
             except Exception as e:
-                print(f"[ORDERS] Could not verify orders table: {str(e)}")
-                print("[ORDERS] This may be normal if no orders exist yet")
+                self.log("ORDERS", f"Could not verify orders table: {str(e)}")
+                self.log("ORDERS", "This may be normal if no orders exist yet")
+                self.tolerate("verify orders table", e)
             
-            print("[ORDERS] Order management test completed")
+            self.log("ORDERS", "Order management test completed")
             
         except Exception as e:
-            self.driver.save_screenshot("screenshots/order_test_error.png")
+            self.screenshots.capture("order_test_error")
             self.fail(f"Order management test failed: {str(e)}")
 
     def test_user_management(self):
@@ -277,10 +273,10 @@ class AdminPanelTest(unittest.TestCase):
         try:
             driver = self.driver
             
-            print("[USERS] Navigating to users list")
+            self.log("USERS", "Navigating to users list")
             driver.get(f"{self.base_url}/admin/users")
-            time.sleep(2)
-            driver.save_screenshot("screenshots/users_list.png")
+            self.waiter.ready()
+            self.screenshots.capture("users_list")
             
             try:
                 users_table = self.find_element_safely(
@@ -291,25 +287,26 @@ class AdminPanelTest(unittest.TestCase):
                 )
                 self.assertTrue(users_table.is_displayed())
                 
-                user_rows = driver.find_elements(By.CSS_SELECTOR, ".users-table tr")
+                user_rows = extract(driver, ".users-table tr")
                 if len(user_rows) > 1:
-                    print("[USERS] Users table verified successfully")
+                    self.log("USERS", "Users table verified successfully")
                 else:
-                    print("[USERS] No users found in the table")
+                    self.log("USERS", "No users found in the table")
             except Exception as e:
-                print(f"[USERS] Could not verify users table: {str(e)}")
-                print("[USERS] This may be normal if the table has a different class name")
+                self.log("USERS", f"Could not verify users table: {str(e)}")
+                self.log("USERS", "This may be normal if the table has a different class name")
+                self.tolerate("verify users table", e)
             
-            print("[USERS] User management test completed")
+            self.log("USERS", "User management test completed")
             
         except Exception as e:
-            self.driver.save_screenshot("screenshots/user_test_error.png")
+            self.screenshots.capture("user_test_error")
             self.fail(f"User management test failed: {str(e)}")
 
     def tearDown(self):
         if self.driver:
-            print("[TEARDOWN] Closing browser")
-            self.driver.quit()
+            self.log("TEARDOWN", "Returning browser to pool")
+        super().tearDown()
 
 if __name__ == "__main__":
     print("[MAIN] Starting admin panel tests")
@@ -0,0 +1,95 @@
+import unittest
+
+import settings
+from api_test import ApiTestCase
+from data_factory import run_scoped_id
+
+# A 1x1 PNG; product creation requires at least one uploaded image
+PIXEL_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c489"
+    "0000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+
+class UserAccountApiTest(ApiTestCase):
+    """The scenarios of UserAccountTest, checked against the API"""
+
+    def test_register(self):
+        user = self.data.new_user()
+        session = self.new_session()
+        payload = self.assertSuccess(self.api("POST", "/register", session=session, json=user))
+        self.assertEqual(user["email"], payload["user"]["email"])
+        self.assertIn(settings.AUTH_COOKIE, session.cookies)
+
+    def test_register_duplicate_email(self):
+        response = self.api("POST", "/register", session=self.new_session(), json=self.data.user())
+        self.assertEqual(400, response.status_code)
+
+    def test_login(self):
+        session = self.login(self.data.user())
+        self.assertIn(settings.AUTH_COOKIE, session.cookies)
+
+    def test_login_wrong_password(self):
+        user = self.data.user()
+        response = self.api("POST", "/login", session=self.new_session(), json={"email": user["email"], "password": "wrong-password"})
+        self.assertEqual(401, response.status_code)
+
+    def test_profile(self):
+        user = self.data.user()
+        payload = self.assertSuccess(self.api("GET", "/me", session=self.login(user)))
+        self.assertEqual(user["email"], payload["user"]["email"])
+
+    def test_profile_requires_login(self):
+        self.assertEqual(401, self.api("GET", "/me", session=self.new_session()).status_code)
+
+    def test_update_profile(self):
+        # A fresh account, so the seeded users the UI tier logs in with keep their names
+        user = self.data.new_user()
+        session = self.new_session()
+        self.assertSuccess(self.api("POST", "/register", session=session, json=user))
+
+        name = f"Updated {user['name']}"
+        self.assertSuccess(self.api("PUT", "/me/update", session=session, json={"name": name, "email": user["email"]}))
+        payload = self.assertSuccess(self.api("GET", "/me", session=session))
+        self.assertEqual(name, payload["user"]["name"])
+
+    def test_forgot_password(self):
+        payload = self.assertSuccess(self.api("POST", "/password/forgot", session=self.new_session(), json={"email": self.data.user()["email"]}))
+        self.assertIn(self.data.user()["email"], payload["message"])
+
+
+class AdminPanelApiTest(ApiTestCase):
+    """The scenarios of AdminPanelTest, checked against the API"""
+
+    def test_create_product(self):
+        name = run_scoped_id("product")
+        fields = {"name": name, "price": "99.99", "description": "Created by the API tier", "category": "Electronics", "stock": "50", "seller": "Test Seller"}
+        response = self.api("POST", "/admin/products/new", role="admin", data=fields, files=[("images", ("pixel.png", PIXEL_PNG, "image/png"))])
+        product = self.assertSuccess(response, 201)["product"]
+        self.addCleanup(self.api, "DELETE", f"/admin/products/{product['_id']}", role="admin")
+
+        self.assertEqual(name, product["name"])
+        payload = self.assertSuccess(self.api("GET", f"/products/{product['_id']}"))
+        self.assertEqual(name, payload["product"]["name"])
+
+    def test_product_list(self):
+        payload = self.assertSuccess(self.api("GET", "/admin/products", role="admin"))
+        ids = {product["_id"] for product in payload["products"]}
+        self.assertTrue({product["_id"] for product in self.data.products} <= ids)
+
+    def test_order_list(self):
+        payload = self.assertSuccess(self.api("GET", "/admin/order", role="admin"))
+        ids = {order["_id"] for order in payload["orders"]}
+        self.assertIn(self.data.orders[0]["_id"], ids)
+
+    def test_user_list(self):
+        payload = self.assertSuccess(self.api("GET", "/admin/users", role="admin"))
+        emails = {user["email"] for user in payload["users"]}
+        self.assertIn(self.data.user()["email"], emails)
+
+    def test_admin_routes_need_admin_role(self):
+        self.assertEqual(403, self.api("GET", "/admin/users", role="user").status_code)
+
+
+if __name__ == "__main__":
+    unittest.main()
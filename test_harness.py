@@ -0,0 +1,243 @@
+import os
+import tempfile
+import unittest
+
+import settings
+from flake_tracker import FlakeHistory, fingerprint
+from http_cache import cache_key
+from impact import ImpactMap, route_for
+from locator_cache import LocatorCache, page_key
+from run_tests import Scheduler
+from result_log import LoggedTestCase
+
+
+class LoggedTestCaseTest(unittest.TestCase):
+    """Result logging and step timing, without a browser"""
+
+    def run_failing(self):
+        # Defined here so the loader does not collect it as a test of its own
+        class FailingTest(LoggedTestCase):
+            def test_fail(self):
+                self.step("check")
+                self.fail("boom")
+
+        test = FailingTest("test_fail")
+        result = unittest.TestResult()
+        test.run(result)
+        return test, result
+
+    def test_failure_traceback_names_the_test_line(self):
+        _, result = self.run_failing()
+        self.assertEqual(1, len(result.failures))
+        details = result.failures[0][1]
+        self.assertIn('self.fail("boom")', details)
+        self.assertNotIn("_callTestMethod", details)
+
+    def test_steps(self):
+        test, _ = self.run_failing()
+        self.assertEqual(["setup", "test_fail", "check", "teardown"], [step["name"] for step in test.test_log.steps()])
+
+
+
+class FingerprintTest(unittest.TestCase):
+    """Failure fingerprints as run_tests.py records them in the history"""
+
+    def failure_details(self):
+        # The suite's usual style: a caught error reported again through self.fail
+        class FailingTest(LoggedTestCase):
+            def test_fail(self):
+                try:
+                    raise Exception("Could not find element id=cart_btn")
+                except Exception as e:
+                    self.fail(f"Add to cart test failed: {str(e)}")
+
+            def test_other(self):
+                self.assertEqual(1, 2)
+
+        result = unittest.TestResult()
+        FailingTest("test_fail").run(result)
+        FailingTest("test_other").run(result)
+        return [details for _, details in result.failures]
+
+    def test_step_is_the_failing_assertion(self):
+        details, _ = self.failure_details()
+        parts = fingerprint(details, "test_fail")
+        self.assertEqual("AssertionError", parts["exception"])
+        self.assertEqual("id=cart_btn", parts["selector"])
+        self.assertEqual('test_fail: self.fail(f"Add to cart test failed: {str(e)}")', parts["step"])
+
+    def test_different_assertions_differ(self):
+        first, second = self.failure_details()
+        self.assertNotEqual(fingerprint(first, "test_fail")["id"], fingerprint(second, "test_other")["id"])
+
+    def test_step_falls_back_to_the_test_method(self):
+        details = (
+            "Traceback (most recent call last):\n"
+            '  File "/suite/checks.py", line 12, in test_login\n'
+            "    self.assertTrue(ok)\n"
+            '  File "/suite/helpers.py", line 3, in check\n'
+            "    raise ValueError(name)\n"
+            "ValueError: login\n"
+        )
+        self.assertEqual("test_login: self.assertTrue(ok)", fingerprint(details, "test_login")["step"])
+        self.assertEqual("", fingerprint(details)["step"])
+
+
+
+class FlakeHistoryTest(unittest.TestCase):
+    """Which tests the history quarantines"""
+
+    def history(self, *outcomes):
+        directory = tempfile.mkdtemp()
+        history = FlakeHistory(os.path.join(directory, "history.json"), os.path.join(directory, "quarantine.json"), length=20)
+        for index, outcome in enumerate(outcomes):
+            history.add(f"run{index}", {"test_id": "t", "outcome": outcome})
+        return history
+
+    def test_one_flaky_run_does_not_quarantine(self):
+        self.assertIsNone(self.history("passed", "flaky", "passed", "failed").quarantine_reason("t"))
+
+    def test_repeated_flaky_runs_quarantine(self):
+        self.assertIsNotNone(self.history("flaky", "passed", "flaky").quarantine_reason("t"))
+
+    def test_flips_quarantine(self):
+        self.assertIsNotNone(self.history("passed", "failed", "passed", "failed").quarantine_reason("t"))
+
+    def test_flaky_runs_age_out(self):
+        self.assertIsNone(self.history("flaky", "flaky", *["passed"] * 19).quarantine_reason("t"))
+
+
+
+class LocatorCacheTest(unittest.TestCase):
+    """Scores of fallback locators and how sessions merge into the file"""
+
+    STRATEGIES = [("id", "login_button"), ("css selector", "button[type='submit']")]
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "locators.json")
+
+    def test_page_key(self):
+        self.assertEqual("/product/:id", page_key("http://localhost:3000/product/64f1c2a3b4d5e6f708192a3b"))
+        self.assertEqual("/admin/orders", page_key("http://localhost:3000/admin/orders?page=2"))
+
+    def test_unseen_strategies_keep_their_order(self):
+        self.assertEqual(self.STRATEGIES, LocatorCache(self.path).ordered("/login", "login_button", self.STRATEGIES))
+
+    def test_misses_demote_and_decay(self):
+        cache = LocatorCache(self.path)
+        cache.record("/login", "login_button", self.STRATEGIES[0], False)
+        cache.record("/login", "login_button", self.STRATEGIES[1], True)
+        self.assertEqual(self.STRATEGIES[::-1], cache.ordered("/login", "login_button", self.STRATEGIES))
+
+        for _ in range(3):
+            cache.record("/login", "login_button", self.STRATEGIES[0], True)
+        # -1 decayed three times plus three hits outweighs the single fallback hit
+        self.assertEqual(self.STRATEGIES, cache.ordered("/login", "login_button", self.STRATEGIES))
+        self.assertEqual(round(((-1 * 0.8 + 1) * 0.8 + 1) * 0.8 + 1, 4), cache.scores["/login"]["login_button"]["id=login_button"])
+
+    def test_sessions_merge_into_the_file(self):
+        # Both loaded before either saved, like two workers finishing together
+        first, second = LocatorCache(self.path), LocatorCache(self.path)
+        first.record("/login", "login_button", self.STRATEGIES[0], True)
+        second.record("/cart", "checkout_btn", ("id", "checkout_btn"), True)
+        first.save()
+        second.save()
+
+        scores = LocatorCache(self.path).scores
+        self.assertEqual(1.0, scores["/login"]["login_button"]["id=login_button"])
+        self.assertEqual(1.0, scores["/cart"]["checkout_btn"]["id=checkout_btn"])
+
+
+class ImpactMapTest(unittest.TestCase):
+    """Test selection from the recorded routes and endpoints against the real app sources"""
+
+    PRODUCT = "test_product_cart.ProductCartTest.test_add_to_cart"
+    LOGIN = "test_order_payment.OrderPaymentTest.test_login"
+    NEW = "test_new_feature.NewFeatureTest.test_it"
+
+    def setUp(self):
+        self.map = ImpactMap(os.path.join(tempfile.mkdtemp(), "impact.json"))
+        self.map.record(self.PRODUCT, {"routes": ["/product/64f1c2a3b4d5e6f708192a3b"], "api": [f"GET {settings.API_PREFIX}/products/64f1c2a3b4d5e6f708192a3b"]})
+        self.map.record(self.LOGIN, {"routes": ["/login"], "api": [f"POST {settings.API_PREFIX}/login"]})
+        self.test_ids = [self.PRODUCT, self.LOGIN, self.NEW]
+
+    def test_route_for(self):
+        self.assertEqual("/product/:id", route_for("/product/64f1c2a3b4d5e6f708192a3b"))
+        self.assertEqual("/no/such/page", route_for("/no/such/page"))
+
+    def test_record_normalizes_paths(self):
+        self.assertEqual({"routes": ["/product/:id"], "api": ["GET /products/:id"]}, self.map.tests[self.PRODUCT])
+
+    def test_unmapped_tests_always_run(self):
+        self.assertEqual({self.NEW: "no recorded impact yet"}, self.map.affected(["README.md"], self.test_ids))
+
+    def test_changed_test_module_selects_its_tests(self):
+        self.assertEqual(
+            {self.NEW: "no recorded impact yet", self.LOGIN: "test_order_payment.py changed"},
+            self.map.affected(["test_order_payment.py"], self.test_ids),
+        )
+
+    def test_harness_change_selects_everything(self):
+        self.assertEqual(set(self.test_ids), set(self.map.affected(["waits.py"], self.test_ids)))
+
+    def test_frontend_component_selects_tests_on_its_route(self):
+        selected = self.map.affected(["frontend/src/components/product/ProductDetails.js"], self.test_ids)
+        self.assertEqual({self.PRODUCT, self.NEW}, set(selected))
+        self.assertIn("/product/:id", selected[self.PRODUCT])
+
+    def test_backend_controller_selects_tests_on_its_endpoints(self):
+        selected = self.map.affected(["backend/controllers/authController.js"], self.test_ids)
+        self.assertIn(self.LOGIN, selected)
+        self.assertNotIn(self.PRODUCT, selected)
+
+    def test_app_root_selects_everything(self):
+        selected = self.map.affected(["frontend/src/App.js"], self.test_ids)
+        self.assertEqual(set(self.test_ids), set(selected))
+
+
+class CacheKeyTest(unittest.TestCase):
+    """Record and replay must agree on the key of the same request"""
+
+    def test_query_order_does_not_matter(self):
+        self.assertEqual(
+            cache_key("GET", "/api/v1/products", "page=2&keyword=shoe", b"", None),
+            cache_key("GET", "/api/v1/products", "keyword=shoe&page=2", b"", None),
+        )
+        self.assertEqual("GET /api/v1/products?keyword=shoe&page=2", cache_key("GET", "/api/v1/products", "page=2&keyword=shoe", b"", None)[0])
+
+    def test_session_and_body_change_the_digest(self):
+        _, digest = cache_key("POST", "/api/v1/order/new", "", b'{"total": 1}', "admin-token")
+        self.assertNotEqual(digest, cache_key("POST", "/api/v1/order/new", "", b'{"total": 1}', "user-token")[1])
+        self.assertNotEqual(digest, cache_key("POST", "/api/v1/order/new", "", b'{"total": 2}', "admin-token")[1])
+        self.assertNotEqual(digest, cache_key("PUT", "/api/v1/order/new", "", b'{"total": 1}', "admin-token")[1])
+
+
+class SchedulerTest(unittest.TestCase):
+    """Order of tests that share fixtures through produced and consumed artifacts"""
+
+    def test_consumers_wait_for_every_producer(self):
+        scheduler = Scheduler({
+            "order": ({"order"}, {"product"}),
+            "product": ({"product"}, set()),
+            "stock": ({"product"}, set()),
+            "search": (set(), set()),
+        })
+        self.assertEqual(["product", "stock", "search"], scheduler.ready())
+        self.assertEqual([], scheduler.ready())
+        scheduler.finish("product")
+        self.assertEqual([], scheduler.ready())
+        scheduler.finish("stock")
+        self.assertEqual(["order"], scheduler.ready())
+
+    def test_unproduced_artifacts_impose_no_order(self):
+        self.assertEqual(["order"], Scheduler({"order": (set(), {"product"})}).ready())
+
+    def test_release_all_breaks_cycles(self):
+        scheduler = Scheduler({"a": ({"a"}, {"b"}), "b": ({"b"}, {"a"})})
+        self.assertEqual([], scheduler.ready())
+        self.assertEqual(["a", "b"], scheduler.release_all())
+        self.assertEqual({}, scheduler.waiting)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,40 +1,36 @@
 import unittest
-import time
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
 
-class OrderPaymentTest(unittest.TestCase):
+import settings
+from browser_test import BrowserTestCase
+from dom_query import extract
+from payment_stub import payment_result
+from resource_blocking import allow_resources
+
+class OrderPaymentTest(BrowserTestCase):
     def setUp(self):
-        self.driver = webdriver.Chrome()
-        self.driver.maximize_window()
-        self.driver.get("http://localhost:3000")
-        time.sleep(1)
-        
-        self.driver.get("http://localhost:3000/login")
-        time.sleep(2)
-        self.driver.find_element(By.ID, "email_field").send_keys("test@example.com")
-        self.driver.find_element(By.ID, "password_field").send_keys("password123")
-        self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
-        time.sleep(3)
+        super().setUp()
+        self.login_as("user")
         
-        self.driver.get("http://localhost:3000/product/123")
-        time.sleep(2)
+        self.product = self.data.products[0]
+        self.driver.get(f"{settings.BASE_URL}/product/{self.product['_id']}")
+        self.waiter.ready((By.ID, "cart_btn"))
         self.driver.find_element(By.ID, "cart_btn").click()
-        time.sleep(2)
+        self.waiter.ready(label="add to cart")
 
     def test_checkout_shipping(self):
         driver = self.driver
         
-        driver.get("http://localhost:3000/cart")
-        time.sleep(2)
+        driver.get(f"{settings.BASE_URL}/cart")
+        self.waiter.ready()
         
         checkout_buttons = driver.find_elements(By.CSS_SELECTOR, ".checkout-btn")
         if len(checkout_buttons) > 0:
             checkout_buttons[0].click()
-            time.sleep(2)
+            self.waiter.ready((By.ID, "address_field"))
             
             driver.find_element(By.ID, "address_field").send_keys("123 Test Street")
             driver.find_element(By.ID, "city_field").send_keys("Test City")
@@ -45,20 +41,20 @@ class OrderPaymentTest(unittest.TestCase):
             country_select.select_by_visible_text("United States")
             
             driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
-            time.sleep(2)
+            self.waiter.ready(label="shipping submit")
             
             self.assertIn("confirm", driver.current_url.lower())
-            print("[SHIPPING] Shipping information test completed successfully")
+            self.log("SHIPPING", "Shipping information test completed successfully")
 
     def test_order_confirmation(self):
         driver = self.driver
         
-        driver.get("http://localhost:3000/confirm")
-        time.sleep(2)
+        driver.get(f"{settings.BASE_URL}/confirm")
+        self.waiter.ready((By.CSS_SELECTOR, ".order-summary"))
         
         self.assertTrue(driver.find_element(By.CSS_SELECTOR, ".order-summary").is_displayed())
      
-        order_items = driver.find_elements(By.CSS_SELECTOR, ".cart-item")
+        order_items = extract(driver, ".cart-item")
         self.assertTrue(len(order_items) > 0)
         
         self.assertTrue(driver.find_element(By.CSS_SELECTOR, ".shipping-info").is_displayed())
@@ -66,21 +62,22 @@ class OrderPaymentTest(unittest.TestCase):
         payment_buttons = driver.find_elements(By.CSS_SELECTOR, ".payment-btn")
         if len(payment_buttons) > 0:
             payment_buttons[0].click()
-            time.sleep(2)
+            self.waiter.ready(label="proceed to payment")
             
             self.assertIn("payment", driver.current_url.lower())
-            print("[CONFIRM] Order confirmation test completed successfully")
+            self.log("CONFIRM", "Order confirmation test completed successfully")
 
+    @allow_resources("stripe")
     def test_payment_process(self):
         driver = self.driver
         
-        driver.get("http://localhost:3000/payment")
-        time.sleep(2)
+        driver.get(f"{settings.BASE_URL}/payment")
+        self.waiter.ready()
         
         try:
-            WebDriverWait(driver, 10).until(
-                EC.frame_to_be_available_and_switch_to_it((By.CSS_SELECTOR, ".stripe-card-element iframe"))
-            )
+            self.step("enter card")
+            card_frame = self.waiter.ready((By.CSS_SELECTOR, ".stripe-card-element iframe"), label="card element")
+            driver.switch_to.frame(card_frame)
             
             driver.find_element(By.CSS_SELECTOR, ".InputElement").send_keys("4242424242424242")
             driver.find_element(By.CSS_SELECTOR, ".InputElement").send_keys("1225")
@@ -88,44 +85,48 @@ class OrderPaymentTest(unittest.TestCase):
             
             driver.switch_to.default_content()
             
+            self.step("submit payment")
             driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
-            time.sleep(5)
+            self.waiter.ready(label="payment submit")
             
             self.assertIn("success", driver.page_source.lower())
-            print("[PAYMENT] Payment process test completed successfully")
+            if settings.PAYMENT_STUB:
+                self.assertEqual("succeeded", (payment_result(driver) or {}).get("status"))
+            self.log("PAYMENT", "Payment process test completed successfully")
             
         except Exception as e:
-            print(f"[PAYMENT] Error in payment test: {e}")
+            # Only the real Stripe element may be unavailable; the local stand-in has to work
+            if settings.PAYMENT_STUB:
+                raise
+            self.log("PAYMENT", f"Error in payment test: {e}")
+            self.tolerate("stripe payment", e)
             self.assertIn("payment", driver.current_url.lower())
 
     def test_order_history(self):
         driver = self.driver
         
-        driver.get("http://localhost:3000/orders/me")
-        time.sleep(2)
+        driver.get(f"{settings.BASE_URL}/orders/me")
+        self.waiter.ready()
         
         self.assertIn("orders", driver.current_url.lower())
         
-        orders = driver.find_elements(By.CSS_SELECTOR, ".order-item")
+        orders = extract(driver, ".order-item")
         
         if len(orders) > 0:
-            print(f"[HISTORY] Found {len(orders)} orders")
+            self.log("HISTORY", f"Found {len(orders)} orders")
             
             view_buttons = driver.find_elements(By.CSS_SELECTOR, ".view-order-btn")
             if len(view_buttons) > 0:
                 view_buttons[0].click()
-                time.sleep(2)
+                self.waiter.ready((By.CSS_SELECTOR, ".order-details"))
                 
                 self.assertIn("order", driver.current_url.lower())
                 self.assertTrue(driver.find_element(By.CSS_SELECTOR, ".order-details").is_displayed())
-                print("[HISTORY] Order details view test completed successfully")
+                self.log("HISTORY", "Order details view test completed successfully")
         else:
-            print("[HISTORY] No orders found in history")
+            self.log("HISTORY", "No orders found in history")
             
-        print("[HISTORY] Order history test completed")
-
-    def tearDown(self):
-        self.driver.quit()
+        self.log("HISTORY", "Order history test completed")
 
 if __name__ == "__main__":
     unittest.main()
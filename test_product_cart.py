@@ -1,142 +1,95 @@
 import unittest
-import time
-import os
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.common.keys import Keys
 
-class ProductCartTest(unittest.TestCase):
+import settings
+from artifacts import consumes, get_artifacts, produces
+from browser_test import BrowserTestCase
+from locator_cache import get_locator_cache, page_key
+from dom_query import extract
+from waits import find_first
+
+SEARCH_TERM = "MacBook"
+
+# Alternatives tried when an element's primary ID is missing, in their default priority
+FALLBACK_LOCATORS = {
+    "search_field": [
+        (By.CSS_SELECTOR, "input[type='search']"),
+        (By.CSS_SELECTOR, ".search-input"),
+        (By.CSS_SELECTOR, "[placeholder*='search']"),
+        (By.CSS_SELECTOR, "input.form-control")
+    ],
+    "search_btn": [
+        (By.CSS_SELECTOR, "button[type='submit']"),
+        (By.CSS_SELECTOR, ".search-button"),
+        (By.CSS_SELECTOR, ".btn-search"),
+        (By.XPATH, "//button[contains(@class, 'search') or contains(@class, 'btn')]")
+    ],
+    "cart_btn": [
+        (By.CSS_SELECTOR, ".add-to-cart"),
+        (By.CSS_SELECTOR, "button.btn-cart"),
+        (By.XPATH, "//button[contains(text(), 'Add to Cart') or contains(text(), 'Add To Cart')]"),
+        (By.CSS_SELECTOR, "[data-test='add-to-cart']")
+    ],
+    "product_price": [
+        (By.CSS_SELECTOR, ".price"),
+        (By.CSS_SELECTOR, ".product-price"),
+        (By.CSS_SELECTOR, "[data-test='price']"),
+        (By.XPATH, "//div[contains(@class, 'price')]")
+    ],
+}
+PRODUCT_SELECTORS = [".product-card", ".product", "[data-test='product']"]
+
+class ProductCartTest(BrowserTestCase):
     def setUp(self):
-        chrome_options = Options()
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
+        super().setUp()
         
-        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-        self.driver.maximize_window()
-        
-        if not os.path.exists("screenshots"):
-            os.makedirs("screenshots")
-            
-        self.base_url = "http://localhost:3000"
+        self.base_url = settings.BASE_URL
         self.driver.get(self.base_url)
         
         self.wait = WebDriverWait(self.driver, 10)
         
-        self.driver.save_screenshot("screenshots/homepage.png")
-        print("[SETUP] Browser initialized and navigated to homepage")
+        self.screenshots.capture("homepage")
+        self.log("SETUP", "Browser acquired and navigated to homepage")
         
-        self.product_info = {
-            "search_term": "MacBook",
-            "product_url": None,
-            "product_name": None,
-            "search_result_url": None,
-            "category_product_url": None
-        }
+        # Shared across tests (and workers) so later steps reuse what earlier ones found
+        self.product_info = get_artifacts()
 
     def find_element_safely(self, by, value, timeout=10, screenshot_prefix=None):
-        try:
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((by, value))
-            )
-            return element
-        except (TimeoutException, NoSuchElementException):
-            if screenshot_prefix:
-                self.driver.save_screenshot(f"screenshots/{screenshot_prefix}_not_found.png")
-            
-            if by == By.ID and value == "search_field":
-                try:
-                    alternatives = [
-                        (By.CSS_SELECTOR, "input[type='search']"),
-                        (By.CSS_SELECTOR, ".search-input"),
-                        (By.CSS_SELECTOR, "[placeholder*='search']"),
-                        (By.CSS_SELECTOR, "input.form-control")
-                    ]
-                    for alt_by, alt_value in alternatives:
-                        try:
-                            element = WebDriverWait(self.driver, 3).until(
-                                EC.presence_of_element_located((alt_by, alt_value))
-                            )
-                            print(f"[INFO] Found alternative for {value} using {alt_by}={alt_value}")
-                            return element
-                        except:
-                            continue
-                except:
-                    pass
-            
-            elif by == By.ID and value == "search_btn":
-                try:
-                    alternatives = [
-                        (By.CSS_SELECTOR, "button[type='submit']"),
-                        (By.CSS_SELECTOR, ".search-button"),
-                        (By.CSS_SELECTOR, ".btn-search"),
-                        (By.XPATH, "//button[contains(@class, 'search') or contains(@class, 'btn')]")
-                    ]
-                    for alt_by, alt_value in alternatives:
-                        try:
-                            element = WebDriverWait(self.driver, 3).until(
-                                EC.presence_of_element_located((alt_by, alt_value))
-                            )
-                            print(f"[INFO] Found alternative for {value} using {alt_by}={alt_value}")
-                            return element
-                        except:
-                            continue
-                except:
-                    pass
-            
-            elif by == By.ID and value == "cart_btn":
-                try:
-                    alternatives = [
-                        (By.CSS_SELECTOR, ".add-to-cart"),
-                        (By.CSS_SELECTOR, "button.btn-cart"),
-                        (By.XPATH, "//button[contains(text(), 'Add to Cart') or contains(text(), 'Add To Cart')]"),
-                        (By.CSS_SELECTOR, "[data-test='add-to-cart']")
-                    ]
-                    for alt_by, alt_value in alternatives:
-                        try:
-                            element = WebDriverWait(self.driver, 3).until(
-                                EC.presence_of_element_located((alt_by, alt_value))
-                            )
-                            print(f"[INFO] Found alternative for {value} using {alt_by}={alt_value}")
-                            return element
-                        except:
-                            continue
-                except:
-                    pass
-            
-            elif by == By.ID and value == "product_price":
-                try:
-                    alternatives = [
-                        (By.CSS_SELECTOR, ".price"),
-                        (By.CSS_SELECTOR, ".product-price"),
-                        (By.CSS_SELECTOR, "[data-test='price']"),
-                        (By.XPATH, "//div[contains(@class, 'price')]")
-                    ]
-                    for alt_by, alt_value in alternatives:
-                        try:
-                            element = WebDriverWait(self.driver, 3).until(
-                                EC.presence_of_element_located((alt_by, alt_value))
-                            )
-                            print(f"[INFO] Found alternative for {value} using {alt_by}={alt_value}")
-                            return element
-                        except:
-                            continue
-                except:
-                    pass
-            
+        strategies = [(by, value)]
+        if by == By.ID:
+            strategies += FALLBACK_LOCATORS.get(value, [])
+        
+        cache = get_locator_cache()
+        page = page_key(self.driver.current_url)
+        strategies = cache.ordered(page, value, strategies)
+        
+        element, index, missed = find_first(self.driver, strategies, timeout)
+        
+        for strategy in missed:
+            cache.record(page, value, strategy, False)
+        if index != 0 and screenshot_prefix:
+            self.screenshots.capture(f"{screenshot_prefix}_not_found")
+        
+        if element is None:
             raise Exception(f"Could not find element {by}={value}")
+        
+        alt_by, alt_value = strategies[index]
+        cache.record(page, value, strategies[index], True)
+        if (alt_by, alt_value) != (by, value):
+            self.log("INFO", f"Found alternative for {value} using {alt_by}={alt_value}")
+        return element
 
+    @produces("search_result_url")
     def test_1_product_search(self):
         try:
             driver = self.driver
             
-            print("[SEARCH] Testing product search")
-            driver.save_screenshot("screenshots/before_search.png")
+            self.step("search")
+            self.log("SEARCH", "Testing product search")
+            self.screenshots.capture("before_search")
             
             search_box = None
             try:
@@ -145,29 +98,25 @@ class ProductCartTest(unittest.TestCase):
                     screenshot_prefix="search_field"
                 )
             except Exception as e:
-                print(f"[SEARCH] Could not find search field by ID: {str(e)}")
+                self.log("SEARCH", f"Could not find search field by ID: {str(e)}")
                 
                 try:
-                    inputs = driver.find_elements(By.TAG_NAME, "input")
-                    for input_elem in inputs:
-                        attr_type = input_elem.get_attribute("type")
-                        attr_placeholder = input_elem.get_attribute("placeholder") or ""
+                    for input_info in extract(driver, "input"):
+                        attr_type = input_info["attributes"].get("type")
+                        attr_placeholder = input_info["attributes"].get("placeholder") or ""
                         if attr_type == "search" or "search" in attr_placeholder.lower():
-                            search_box = input_elem
-                            print("[SEARCH] Found search field by input attributes")
+                            search_box = input_info["element"]
+                            self.log("SEARCH", "Found search field by input attributes")
                             break
                 except:
                     pass
                 
                 if not search_box:
                     try:
-                        forms = driver.find_elements(By.TAG_NAME, "form")
-                        for form in forms:
-                            inputs = form.find_elements(By.TAG_NAME, "input")
-                            if inputs:
-                                search_box = inputs[0]
-                                print("[SEARCH] Using first input in a form as search field")
-                                break
+                        form_inputs = extract(driver, "form input")
+                        if form_inputs:
+                            search_box = form_inputs[0]["element"]
+                            self.log("SEARCH", "Using first input in a form as search field")
                     except:
                         pass
             
@@ -175,7 +124,7 @@ class ProductCartTest(unittest.TestCase):
                 self.fail("Could not find search field with any method")
                 
             search_box.clear()
-            search_box.send_keys(self.product_info["search_term"])
+            search_box.send_keys(SEARCH_TERM)
             
             search_btn = None
             try:
@@ -184,7 +133,7 @@ class ProductCartTest(unittest.TestCase):
                     screenshot_prefix="search_button"
                 )
             except Exception as e:
-                print(f"[SEARCH] Could not find search button by ID: {str(e)}")
+                self.log("SEARCH", f"Could not find search button by ID: {str(e)}")
                 
                 try:
                     if search_box:
@@ -192,7 +141,7 @@ class ProductCartTest(unittest.TestCase):
                         buttons = parent.find_elements(By.TAG_NAME, "button")
                         if buttons:
                             search_btn = buttons[0]
-                            print("[SEARCH] Found search button near search field")
+                            self.log("SEARCH", "Found search button near search field")
                 except:
                     pass
                 
@@ -201,16 +150,17 @@ class ProductCartTest(unittest.TestCase):
                         buttons = driver.find_elements(By.CSS_SELECTOR, "button[type='submit']")
                         if buttons:
                             search_btn = buttons[0]
-                            print("[SEARCH] Using first submit button as search button")
+                            self.log("SEARCH", "Using first submit button as search button")
                     except:
                         pass
                 
                 if not search_btn:
-                    print("[SEARCH] No search button found, pressing Enter key")
+                    self.log("SEARCH", "No search button found, pressing Enter key")
                     search_box.send_keys(Keys.RETURN)
-                    time.sleep(2)
-                    driver.save_screenshot("screenshots/after_search_enter.png")
+                    self.waiter.ready(label="search submit")
+                    self.screenshots.capture("after_search_enter")
             
+            self.step("search results")
             if search_btn:
                 search_btn.click()
             
@@ -225,94 +175,87 @@ class ProductCartTest(unittest.TestCase):
                     except:
                         pass
             
-            driver.save_screenshot("screenshots/search_results.png")
+            self.screenshots.capture("search_results")
             
-            search_term_found = self.product_info["search_term"].lower() in driver.page_source.lower()
+            search_term_found = SEARCH_TERM.lower() in driver.page_source.lower()
             
-            products = driver.find_elements(By.CSS_SELECTOR, ".product-card")
-            if len(products) == 0:
-                products = driver.find_elements(By.CSS_SELECTOR, ".product")
-            if len(products) == 0:
-                products = driver.find_elements(By.CSS_SELECTOR, "[data-test='product']")
+            products = extract(driver, PRODUCT_SELECTORS)
             
             if len(products) > 0:
-                print(f"[SEARCH] Found {len(products)} products")
+                self.log("SEARCH", f"Found {len(products)} products")
                 
-                try:
-                    first_product = products[0].find_element(By.TAG_NAME, "a")
-                    self.product_info["search_result_url"] = first_product.get_attribute("href")
-                    print(f"[SEARCH] Found product URL: {self.product_info['search_result_url']}")
-                except:
+                product_links = extract(driver, "a", root=products[0]["element"])
+                if product_links:
+                    self.product_info["search_result_url"] = product_links[0]["href"]
+                    self.log("SEARCH", f"Found product URL: {self.product_info['search_result_url']}")
+                else:
                     try:
-                        products[0].click()
-                        time.sleep(2)
+                        products[0]["element"].click()
+                        self.waiter.ready(label="product page")
                         self.product_info["search_result_url"] = driver.current_url
-                        print(f"[SEARCH] Clicked product and got URL: {self.product_info['search_result_url']}")
+                        self.log("SEARCH", f"Clicked product and got URL: {self.product_info['search_result_url']}")
                         driver.back()
-                        time.sleep(2)
+                        self.waiter.ready(label="search results")
                     except:
-                        print("[SEARCH] Could not get product URL")
+                        self.log("SEARCH", "Could not get product URL")
             elif search_term_found:
-                print(f"[SEARCH] Search term '{self.product_info['search_term']}' found in page")
+                self.log("SEARCH", f"Search term '{SEARCH_TERM}' found in page")
             else:
                 self.fail("No products found and search term not in page")
             
-            print("[SEARCH] Search test completed successfully")
+            self.log("SEARCH", "Search test completed successfully")
             
         except Exception as e:
-            self.driver.save_screenshot("screenshots/search_test_error.png")
+            self.screenshots.capture("search_test_error")
             self.fail(f"Product search test failed: {str(e)}")
 
+    # Browses from the homepage on purpose, so it does not wait for test_1; search_result_url is only
+    # a last resort when it happens to be there already
+    @produces("product_url", "product_name")
     def test_2_product_details(self):
         try:
             driver = self.driver
             
-            print("[DETAILS] Testing product details by browsing from homepage")
+            self.step("browse homepage")
+            self.log("DETAILS", "Testing product details by browsing from homepage")
             driver.get(self.base_url)
             
-            time.sleep(3)
-            driver.save_screenshot("screenshots/homepage_for_details.png")
+            self.waiter.ready()
+            self.screenshots.capture("homepage_for_details")
             
-            products = driver.find_elements(By.CSS_SELECTOR, ".product-card")
-            if len(products) == 0:
-                products = driver.find_elements(By.CSS_SELECTOR, ".product")
-            if len(products) == 0:
-                products = driver.find_elements(By.CSS_SELECTOR, "[data-test='product']")
+            products = extract(driver, PRODUCT_SELECTORS)
             
             if len(products) == 0:
                 try:
-                    print("[DETAILS] No products on homepage, trying products page")
+                    self.log("DETAILS", "No products on homepage, trying products page")
                     driver.get(f"{self.base_url}/products")
-                    time.sleep(3)
+                    self.waiter.ready()
                     
-                    products = driver.find_elements(By.CSS_SELECTOR, ".product-card")
-                    if len(products) == 0:
-                        products = driver.find_elements(By.CSS_SELECTOR, ".product")
-                    if len(products) == 0:
-                        products = driver.find_elements(By.CSS_SELECTOR, "[data-test='product']")
+                    products = extract(driver, PRODUCT_SELECTORS)
                 except:
                     pass
             
             if len(products) == 0:
                 if self.product_info["search_result_url"]:
-                    print("[DETAILS] Using search result URL")
+                    self.log("DETAILS", "Using search result URL")
                     driver.get(self.product_info["search_result_url"])
                 else:
                     self.fail("No products found on homepage or products page")
                     return
             else:
                 try:
-                    product_link = products[0].find_element(By.TAG_NAME, "a")
+                    product_link = products[0]["element"].find_element(By.TAG_NAME, "a")
                     product_link.click()
                 except:
-                    products[0].click()
+                    products[0]["element"].click()
             
-            time.sleep(3)
-            driver.save_screenshot("screenshots/product_details_page.png")
+            self.step("product details")
+            self.waiter.ready(label="product details")
+            self.screenshots.capture("product_details_page")
             
             current_url = driver.current_url
             self.product_info["product_url"] = current_url
-            print(f"[DETAILS] Product page URL: {current_url}")
+            self.log("DETAILS", f"Product page URL: {current_url}")
             
             product_name = None
             try:
@@ -331,9 +274,9 @@ class ProductCartTest(unittest.TestCase):
             
             if product_name and len(product_name) > 0:
                 self.product_info["product_name"] = product_name
-                print(f"[DETAILS] Product name: {product_name}")
+                self.log("DETAILS", f"Product name: {product_name}")
             else:
-                print("[DETAILS] Could not find product name")
+                self.log("DETAILS", "Could not find product name")
             
             price_found = False
             try:
@@ -354,9 +297,9 @@ class ProductCartTest(unittest.TestCase):
                         pass
             
             if price_found:
-                print("[DETAILS] Product price found")
+                self.log("DETAILS", "Product price found")
             else:
-                print("[DETAILS] Warning: Product price not found")
+                self.log("DETAILS", "Warning: Product price not found")
             
             cart_btn_found = False
             try:
@@ -377,52 +320,46 @@ class ProductCartTest(unittest.TestCase):
                         pass
             
             if cart_btn_found:
-                print("[DETAILS] Add to cart button found")
+                self.log("DETAILS", "Add to cart button found")
             else:
-                print("[DETAILS] Warning: Add to cart button not found")
+                self.log("DETAILS", "Warning: Add to cart button not found")
             
             images_found = False
             try:
-                product_images = driver.find_elements(By.CSS_SELECTOR, ".carousel-item img")
+                product_images = extract(driver, [".carousel-item img", ".product-image", "img"])
                 images_found = len(product_images) > 0
             except:
-                try:
-                    product_images = driver.find_elements(By.CSS_SELECTOR, ".product-image")
-                    images_found = len(product_images) > 0
-                except:
-                    try:
-                        product_images = driver.find_elements(By.TAG_NAME, "img")
-                        images_found = len(product_images) > 0
-                    except:
-                        pass
+                pass
             
             if images_found:
-                print("[DETAILS] Product images found")
+                self.log("DETAILS", "Product images found")
             else:
-                print("[DETAILS] Warning: Product images not found")
+                self.log("DETAILS", "Warning: Product images not found")
             
             if product_name and (price_found or cart_btn_found):
-                print(f"[DETAILS] Product details test completed for: {product_name}")
+                self.log("DETAILS", f"Product details test completed for: {product_name}")
             else:
                 self.fail("Could not verify essential product details")
             
         except Exception as e:
-            self.driver.save_screenshot("screenshots/product_details_error.png")
+            self.screenshots.capture("product_details_error")
             self.fail(f"Product details test failed: {str(e)}")
 
+    @consumes("product_url")
     def test_3_add_to_cart(self):
         try:
             driver = self.driver
             
+            self.step("open product")
             if self.product_info["product_url"]:
-                print(f"[CART] Using product URL from previous test: {self.product_info['product_url']}")
+                self.log("CART", f"Using product URL from previous test: {self.product_info['product_url']}")
                 driver.get(self.product_info["product_url"])
             else:
                 if self.product_info["search_result_url"]:
-                    print(f"[CART] Using search result URL: {self.product_info['search_result_url']}")
+                    self.log("CART", f"Using search result URL: {self.product_info['search_result_url']}")
                     driver.get(self.product_info["search_result_url"])
                 else:
-                    print("[CART] No saved URLs, browsing from homepage")
+                    self.log("CART", "No saved URLs, browsing from homepage")
                     driver.get(self.base_url)
                     
                     self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".product-card")))
@@ -434,88 +371,91 @@ class ProductCartTest(unittest.TestCase):
                     first_product.click()
             
             self.wait.until(EC.presence_of_element_located((By.ID, "cart_btn")))
-            driver.save_screenshot("screenshots/before_add_to_cart.png")
+            self.screenshots.capture("before_add_to_cart")
             
             try:
                 product_name = driver.find_element(By.CSS_SELECTOR, "h3").text
-                print(f"[CART] Testing with product: {product_name}")
+                self.log("CART", f"Testing with product: {product_name}")
                 self.product_info["product_name"] = product_name
             except:
-                print("[CART] Could not get product name")
+                self.log("CART", "Could not get product name")
             
             try:
-                print("[CART] Trying to increase quantity")
+                self.log("CART", "Trying to increase quantity")
                 plus_buttons = driver.find_elements(By.CSS_SELECTOR, ".plus")
                 if len(plus_buttons) > 0:
                     plus_buttons[0].click()
-                    time.sleep(1)
-                    driver.save_screenshot("screenshots/after_quantity_increase.png")
-                    print("[CART] Quantity increased")
+                    self.waiter.ready(label="quantity increase")
+                    self.screenshots.capture("after_quantity_increase")
+                    self.log("CART", "Quantity increased")
                 else:
-                    print("[CART] Plus button not found")
+                    self.log("CART", "Plus button not found")
             except Exception as e:
-                print(f"[CART] Could not increase quantity: {str(e)}")
+                self.log("CART", f"Could not increase quantity: {str(e)}")
             
+            self.step("add to cart")
             cart_btn = self.find_element_safely(
                 By.ID, "cart_btn", 
                 screenshot_prefix="add_to_cart_button"
             )
             cart_btn.click()
-            time.sleep(2)
-            driver.save_screenshot("screenshots/after_add_to_cart.png")
+            self.waiter.ready(label="add to cart")
+            self.screenshots.capture("after_add_to_cart")
             
+            self.step("verify cart")
             success = False
             
             try:
                 success_alert = WebDriverWait(driver, 5).until(
                     EC.presence_of_element_located((By.CSS_SELECTOR, ".alert-success"))
                 )
-                print(f"[CART] Success message found: {success_alert.text}")
+                self.log("CART", f"Success message found: {success_alert.text}")
                 success = True
             except:
-                print("[CART] No success message found, trying other verification methods")
+                self.log("CART", "No success message found, trying other verification methods")
             
             if not success:
                 try:
-                    cart_count = driver.find_elements(By.CSS_SELECTOR, ".cart-count")
-                    if len(cart_count) > 0 and cart_count[0].text != "0":
-                        print(f"[CART] Cart count updated: {cart_count[0].text}")
+                    cart_count = extract(driver, ".cart-count")
+                    if len(cart_count) > 0 and cart_count[0]["text"] != "0":
+                        self.log("CART", f"Cart count updated: {cart_count[0]['text']}")
                         success = True
                 except:
-                    print("[CART] Could not verify cart count")
+                    self.log("CART", "Could not verify cart count")
             
             if not success:
                 try:
                     driver.get(f"{self.base_url}/cart")
-                    time.sleep(3)
-                    driver.save_screenshot("screenshots/cart_verification.png")
+                    self.waiter.ready()
+                    self.screenshots.capture("cart_verification")
                     
                     if "Your Cart is Empty" not in driver.page_source:
-                        print("[CART] Cart is not empty, item was added successfully")
+                        self.log("CART", "Cart is not empty, item was added successfully")
                         success = True
                     else:
-                        print("[CART] Cart appears to be empty")
+                        self.log("CART", "Cart appears to be empty")
                 except Exception as e:
-                    print(f"[CART] Error checking cart: {str(e)}")
+                    self.log("CART", f"Error checking cart: {str(e)}")
             
             self.assertTrue(success, "Failed to verify item was added to cart")
-            print("[CART] Add to cart test completed successfully")
+            self.log("CART", "Add to cart test completed successfully")
             
         except Exception as e:
-            self.driver.save_screenshot("screenshots/add_to_cart_error.png")
+            self.screenshots.capture("add_to_cart_error")
             self.fail(f"Add to cart test failed: {str(e)}")
 
+    @consumes("product_url")
     def test_4_cart_operations(self):
         try:
             driver = self.driver
             
-            print("[CART-OPS] Navigating to cart page")
+            self.log("CART-OPS", "Navigating to cart page")
             driver.get(f"{self.base_url}/cart")
-            time.sleep(3)
-            driver.save_screenshot("screenshots/cart_page.png")
+            self.waiter.ready()
+            self.screenshots.capture("cart_page")
             
             if "Your Cart is Empty" in driver.page_source:
-                print("[CART-OPS] Cart is empty, adding an item first")
+                self.log("CART-OPS", "Cart is empty, adding an item first")
                 
                 if self.product_info["product_url"]:
                     driver.get(self.product_info["product_url"])
@@ -537,56 +477,44 @@ class ProductCartTest(unittest.TestCase):
                     screenshot_prefix="cart_ops_add_button"
                 )
                 cart_btn.click()
-                time.sleep(3)
+                self.waiter.ready(label="add to cart")
                 
                 driver.get(f"{self.base_url}/cart")
-                time.sleep(3)
-                driver.save_screenshot("screenshots/cart_page_after_adding.png")
+                self.waiter.ready()
+                self.screenshots.capture("cart_page_after_adding")
                 
                 if "Your Cart is Empty" in driver.page_source:
                     self.fail("Cart is still empty after adding an item, cannot test cart operations")
                     return
             
-            print("[CART-OPS] Cart has items, continuing with test")
+            self.log("CART-OPS", "Cart has items, continuing with test")
             
-            cart_items = driver.find_elements(By.CSS_SELECTOR, ".cart-item")
-            if len(cart_items) == 0:
-                cart_items = driver.find_elements(By.CSS_SELECTOR, ".cart_item")
-                if len(cart_items) == 0:
-                    cart_items = driver.find_elements(By.CSS_SELECTOR, "[data-test='cart-item']")
+            cart_items = extract(driver, [".cart-item", ".cart_item", "[data-test='cart-item']"])
             
             self.assertTrue(len(cart_items) > 0, "No items found in cart")
-            print(f"[CART-OPS] Found {len(cart_items)} items in cart")
+            self.log("CART-OPS", f"Found {len(cart_items)} items in cart")
             
             try:
-                print("[CART-OPS] Testing quantity adjustment")
-                plus_buttons = driver.find_elements(By.CSS_SELECTOR, ".plus")
-                if len(plus_buttons) == 0:
-                    plus_buttons = driver.find_elements(By.CSS_SELECTOR, ".increment")
-                if len(plus_buttons) == 0:
-                    plus_buttons = driver.find_elements(By.CSS_SELECTOR, "[data-test='increase-qty']")
+                self.log("CART-OPS", "Testing quantity adjustment")
+                plus_buttons = extract(driver, [".plus", ".increment", "[data-test='increase-qty']"])
                     
                 if len(plus_buttons) > 0:
-                    plus_buttons[0].click()
-                    time.sleep(2)
-                    driver.save_screenshot("screenshots/after_cart_quantity_increase.png")
-                    print("[CART-OPS] Quantity increased")
+                    plus_buttons[0]["element"].click()
+                    self.waiter.ready(label="cart quantity increase")
+                    self.screenshots.capture("after_cart_quantity_increase")
+                    self.log("CART-OPS", "Quantity increased")
                     
-                    minus_buttons = driver.find_elements(By.CSS_SELECTOR, ".minus")
-                    if len(minus_buttons) == 0:
-                        minus_buttons = driver.find_elements(By.CSS_SELECTOR, ".decrement")
-                    if len(minus_buttons) == 0:
-                        minus_buttons = driver.find_elements(By.CSS_SELECTOR, "[data-test='decrease-qty']")
+                    minus_buttons = extract(driver, [".minus", ".decrement", "[data-test='decrease-qty']"])
                         
                     if len(minus_buttons) > 0:
-                        minus_buttons[0].click()
-                        time.sleep(2)
-                        driver.save_screenshot("screenshots/after_cart_quantity_decrease.png")
-                        print("[CART-OPS] Quantity decreased")
+                        minus_buttons[0]["element"].click()
+                        self.waiter.ready(label="cart quantity decrease")
+                        self.screenshots.capture("after_cart_quantity_decrease")
+                        self.log("CART-OPS", "Quantity decreased")
                 else:
-                    print("[CART-OPS] No quantity adjustment buttons found")
+                    self.log("CART-OPS", "No quantity adjustment buttons found")
             except Exception as e:
-                print(f"[CART-OPS] Could not test quantity adjustment: {str(e)}")
+                self.log("CART-OPS", f"Could not test quantity adjustment: {str(e)}")
             
             try:
                 checkout_selectors = [
@@ -597,76 +525,65 @@ class ProductCartTest(unittest.TestCase):
                     "a.checkout-btn"
                 ]
                 
-                checkout_btn = None
-                for selector in checkout_selectors:
-                    try:
-                        elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                        if len(elements) > 0:
-                            checkout_btn = elements[0]
-                            break
-                    except:
-                        continue
+                checkout_buttons = extract(driver, checkout_selectors)
                 
-                if checkout_btn:
-                    self.assertTrue(checkout_btn.is_displayed(), "Checkout button is not displayed")
-                    print("[CART-OPS] Checkout button verified")
+                if checkout_buttons:
+                    self.assertTrue(checkout_buttons[0]["visible"], "Checkout button is not displayed")
+                    self.log("CART-OPS", "Checkout button verified")
                 else:
-                    print("[CART-OPS] Checkout button not found with any selector")
+                    self.log("CART-OPS", "Checkout button not found with any selector")
             except Exception as e:
-                print(f"[CART-OPS] Could not verify checkout button: {str(e)}")
+                self.log("CART-OPS", f"Could not verify checkout button: {str(e)}")
             
-            print("[CART-OPS] Cart operations test completed")
+            self.log("CART-OPS", "Cart operations test completed")
             
         except Exception as e:
-            self.driver.save_screenshot("screenshots/cart_operations_error.png")
+            self.screenshots.capture("cart_operations_error")
             self.fail(f"Cart operations test failed: {str(e)}")
 
+    @produces("category_product_url")
     def test_5_browse_categories(self):
         try:
             driver = self.driver
             
-            print("[CATEGORIES] Testing category browsing")
+            self.log("CATEGORIES", "Testing category browsing")
             driver.get(self.base_url)
             
-            category_links = driver.find_elements(By.CSS_SELECTOR, ".category-link")
-            if len(category_links) == 0:
-                category_links = driver.find_elements(By.CSS_SELECTOR, "[data-test='category']")
-                if len(category_links) == 0:
-                    category_links = driver.find_elements(By.CSS_SELECTOR, ".sidebar a")
+            category_links = extract(driver, [".category-link", "[data-test='category']", ".sidebar a"])
             
             if len(category_links) == 0:
-                print("[CATEGORIES] No category links found, skipping test")
+                self.log("CATEGORIES", "No category links found, skipping test")
                 return
             
-            print(f"[CATEGORIES] Found {len(category_links)} categories, clicking first one")
-            category_links[0].click()
+            self.log("CATEGORIES", f"Found {len(category_links)} categories, clicking first one")
+            category_links[0]["element"].click()
             
             self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".products")))
-            driver.save_screenshot("screenshots/category_products.png")
+            self.screenshots.capture("category_products")
             
-            products = driver.find_elements(By.CSS_SELECTOR, ".product-card")
-            print(f"[CATEGORIES] Found {len(products)} products in category")
+            products = extract(driver, ".product-card")
+            self.log("CATEGORIES", f"Found {len(products)} products in category")
             
             if len(products) > 0:
-                products[0].find_element(By.TAG_NAME, "a").click()
+                products[0]["element"].find_element(By.TAG_NAME, "a").click()
                 
                 self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "h3")))
-                driver.save_screenshot("screenshots/category_product_details.png")
+                self.screenshots.capture("category_product_details")
                 
                 self.product_info["category_product_url"] = driver.current_url
-                print(f"[CATEGORIES] Stored category product URL: {self.product_info['category_product_url']}")
+                self.log("CATEGORIES", f"Stored category product URL: {self.product_info['category_product_url']}")
             
-            print("[CATEGORIES] Category browsing test completed")
+            self.log("CATEGORIES", "Category browsing test completed")
             
         except Exception as e:
-            self.driver.save_screenshot("screenshots/category_browse_error.png")
-            print(f"[CATEGORIES] Category browsing test encountered an error: {str(e)}")
-            pass
+            self.screenshots.capture("category_browse_error")
+            self.log("CATEGORIES", f"Category browsing test encountered an error: {str(e)}")
+            self.tolerate("browse categories", e)
 
     def tearDown(self):
         if self.driver:
-            print("[TEARDOWN] Closing browser")
-            self.driver.quit()
+            self.log("TEARDOWN", "Returning browser to pool")
+        super().tearDown()
 
 if __name__ == "__main__":
     print("[MAIN] Starting product and cart tests")
@@ -1,86 +1,55 @@
 import unittest
-import time
-import random
-import os
-import pymongo
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
 
-class UserAccountTest(unittest.TestCase):
+import settings
+from browser_test import BrowserTestCase
+from locator_cache import get_locator_cache, page_key, strategy_key
+from waits import find_first
+from worker_context import output_path
+
+class UserAccountTest(BrowserTestCase):
     def setUp(self):
-        chrome_options = Options()
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        
-        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-        self.driver.maximize_window()
+        super().setUp()
         
-        self.base_url = "http://localhost:3000"
+        self.base_url = settings.BASE_URL
         self.driver.get(self.base_url)
         
-        self.wait = WebDriverWait(self.driver, 15)
-        print(f"[SETUP] Browser initialized and navigated to {self.base_url}")
+        self.wait_timeout = 15
+        self.wait = WebDriverWait(self.driver, self.wait_timeout)
+        self.log("SETUP", f"Browser acquired and navigated to {self.base_url}")
         
         self.take_screenshot("homepage")
         
-        try:
-            client = pymongo.MongoClient("mongodb://127.0.0.1:27017/")
-            db = client["shopit"]  
-            users_collection = db["users"]  
-            
-            user_doc = users_collection.find_one({"role": "user"})
-            
-            if user_doc:
-                self.test_user = {
-                    "name": user_doc.get("name", "Test User"),
-                    "email": user_doc.get("email", "test@example.com"),
-                    "password": "password123"  
-                }
-                print(f"[SETUP] Found test user in database: {self.test_user['email']}")
-            else:
-                self.random_num = random.randint(1000, 9999)
-                self.test_user = {
-                    "name": f"Test User {self.random_num}",
-                    "email": f"testuser{self.random_num}@example.com",
-                    "password": "Test@123456"
-                }
-                print(f"[SETUP] Generated test user: {self.test_user['name']}, {self.test_user['email']}")
-        except Exception as e:
-            print(f"[SETUP] Error connecting to database: {str(e)}")
-            self.random_num = random.randint(1000, 9999)
-            self.test_user = {
-                "name": f"Test User {self.random_num}",
-                "email": f"testuser{self.random_num}@example.com",
-                "password": "Test@123456"
-            }
-            print(f"[SETUP] Generated test user: {self.test_user['name']}, {self.test_user['email']}")
+        self.test_user = self.data.user()
+        self.log("SETUP", f"Using seeded test user: {self.test_user['email']}")
 
     def take_screenshot(self, name):
-        if not os.path.exists("screenshots"):
-            os.makedirs("screenshots")
-        self.driver.save_screenshot(f"screenshots/{name}.png")
-        print(f"[INFO] Screenshot saved: screenshots/{name}.png")
+        path = self.screenshots.capture(name)
+        self.log("INFO", f"Screenshot captured: {path}")
 
-    def find_element_with_multiple_strategies(self, strategies):
-        for strategy in strategies:
-            by, value = strategy
-            try:
-                element = self.wait.until(EC.presence_of_element_located((by, value)))
-                print(f"[INFO] Found element using {by}={value}")
-                return element
-            except (TimeoutException, NoSuchElementException):
-                print(f"[INFO] Could not find element using {by}={value}")
-                continue
+    def find_element_with_multiple_strategies(self, strategies, name=None):
+        cache = get_locator_cache()
+        page = page_key(self.driver.current_url)
+        name = name or strategy_key(strategies[0])
+        
+        strategies = cache.ordered(page, name, strategies)
+        
+        element, index, missed = find_first(self.driver, strategies, self.wait_timeout)
+        
+        for by, value in missed:
+            cache.record(page, name, (by, value), False)
+            self.log("INFO", f"Could not find element using {by}={value}")
+        
+        if element is not None:
+            by, value = strategies[index]
+            cache.record(page, name, (by, value), True)
+            self.log("INFO", f"Found element using {by}={value}")
+            return element
         
         self.take_screenshot("element_not_found")
         raise NoSuchElementException(f"Could not find element using any of the strategies: {strategies}")
@@ -88,13 +57,15 @@ class UserAccountTest(unittest.TestCase):
     def test_1_user_registration(self):
         driver = self.driver
         
+        self.test_user = self.data.new_user()
+        
         try:
-            print("[REGISTER] Navigating to registration page")
+            self.log("REGISTER", "Navigating to registration page")
             driver.get(f"{self.base_url}/register")
-            time.sleep(2)
+            self.waiter.ready()
             self.take_screenshot("register_page")
             
-            print(f"[REGISTER] Filling form with name={self.test_user['name']}, email={self.test_user['email']}")
+            self.log("REGISTER", f"Filling form with name={self.test_user['name']}, email={self.test_user['email']}")
             
             name_field = self.find_element_with_multiple_strategies([
                 (By.ID, "name"),
@@ -124,7 +95,7 @@ class UserAccountTest(unittest.TestCase):
             
             self.take_screenshot("register_form_filled")
             
-            print("[REGISTER] Submitting registration form")
+            self.log("REGISTER", "Submitting registration form")
             submit_button = self.find_element_with_multiple_strategies([
                 (By.CSS_SELECTOR, "button[type='submit']"),
                 (By.XPATH, "//button[contains(text(), 'Register')]"),
@@ -132,16 +103,16 @@ class UserAccountTest(unittest.TestCase):
             ])
             submit_button.click()
             
-            time.sleep(5)
+            self.waiter.ready(label="registration submit")
             self.take_screenshot("after_registration")
             
             page_source = driver.page_source.lower()
             success = any(word in page_source for word in ["registered", "success", "welcome", "account", "profile"])
             
             self.assertTrue(success, "Registration success indicator not found")
-            print("[REGISTER] Registration test completed successfully")
+            self.log("REGISTER", "Registration test completed successfully")
             
-            with open("test_user_credentials.txt", "w") as f:
+            with open(output_path("test_user_credentials.txt"), "w") as f:
                 f.write(f"Name: {self.test_user['name']}\n")
                 f.write(f"Email: {self.test_user['email']}\n")
                 f.write(f"Password: {self.test_user['password']}\n")
@@ -154,12 +125,12 @@ class UserAccountTest(unittest.TestCase):
         driver = self.driver
         
         try:
-            print("[LOGIN] Navigating to login page")
+            self.log("LOGIN", "Navigating to login page")
             driver.get(f"{self.base_url}/login")
-            time.sleep(2)
+            self.waiter.ready()
             self.take_screenshot("login_page")
             
-            print(f"[LOGIN] Entering credentials for {self.test_user['email']}")
+            self.log("LOGIN", f"Entering credentials for {self.test_user['email']}")
             email_field = self.find_element_with_multiple_strategies([
                 (By.ID, "email"),
                 (By.NAME, "email"),
@@ -179,7 +150,7 @@ class UserAccountTest(unittest.TestCase):
             
             self.take_screenshot("login_form_filled")
             
-            print("[LOGIN] Submitting login form")
+            self.log("LOGIN", "Submitting login form")
             submit_button = self.find_element_with_multiple_strategies([
                 (By.CSS_SELECTOR, "button[type='submit']"),
                 (By.XPATH, "//button[contains(text(), 'Login')]"),
@@ -187,14 +158,14 @@ class UserAccountTest(unittest.TestCase):
             ])
             submit_button.click()
             
-            time.sleep(5)
+            self.waiter.ready(label="login submit")
             self.take_screenshot("after_login")
             
             page_source = driver.page_source.lower()
             success = any(word in page_source for word in ["logout", "profile", "account", "dashboard"])
             
             self.assertTrue(success, "Login success indicator not found")
-            print("[LOGIN] Login test completed successfully")
+            self.log("LOGIN", "Login test completed successfully")
             
         except Exception as e:
             self.take_screenshot("login_error")
@@ -204,9 +175,9 @@ class UserAccountTest(unittest.TestCase):
         driver = self.driver
         
         try:
-            print("[PROFILE] Logging in first")
+            self.log("PROFILE", "Logging in first")
             driver.get(f"{self.base_url}/login")
-            time.sleep(2)
+            self.waiter.ready()
             
             email_field = self.find_element_with_multiple_strategies([
                 (By.ID, "email"),
@@ -229,9 +200,9 @@ class UserAccountTest(unittest.TestCase):
                 (By.XPATH, "//button[contains(text(), 'Login')]")
             ])
             submit_button.click()
-            time.sleep(3)
+            self.waiter.ready(label="login submit")
             
-            print("[PROFILE] Navigating to profile page")
+            self.log("PROFILE", "Navigating to profile page")
             profile_urls = [
                 f"{self.base_url}/me/update",
                 f"{self.base_url}/profile",
@@ -242,23 +213,23 @@ class UserAccountTest(unittest.TestCase):
             for url in profile_urls:
                 try:
                     driver.get(url)
-                    time.sleep(2)
+                    self.waiter.ready()
                     try:
                         self.find_element_with_multiple_strategies([
                             (By.ID, "name"),
                             (By.NAME, "name"),
                             (By.CSS_SELECTOR, "input[placeholder*='name' i]")
                         ])
-                        print(f"[PROFILE] Found profile page at {url}")
+                        self.log("PROFILE", f"Found profile page at {url}")
                         self.take_screenshot("profile_page")
                         break
                     except:
-                        print(f"[PROFILE] {url} does not appear to be a profile page")
+                        self.log("PROFILE", f"{url} does not appear to be a profile page")
                         continue
                 except:
                     continue
             
-            print("[PROFILE] Updating profile information")
+            self.log("PROFILE", "Updating profile information")
             name_field = self.find_element_with_multiple_strategies([
                 (By.ID, "name"),
                 (By.NAME, "name"),
@@ -270,7 +241,7 @@ class UserAccountTest(unittest.TestCase):
             
             self.take_screenshot("profile_form_filled")
             
-            print("[PROFILE] Submitting updated profile")
+            self.log("PROFILE", "Submitting updated profile")
             submit_button = self.find_element_with_multiple_strategies([
                 (By.CSS_SELECTOR, "button[type='submit']"),
                 (By.XPATH, "//button[contains(text(), 'Update')]"),
@@ -278,14 +249,14 @@ class UserAccountTest(unittest.TestCase):
             ])
             submit_button.click()
             
-            time.sleep(5)
+            self.waiter.ready(label="profile submit")
             self.take_screenshot("after_profile_update")
             
             page_source = driver.page_source.lower()
             success = any(word in page_source for word in ["updated", "success", "profile"])
             
             self.assertTrue(success, "Profile update success indicator not found")
-            print("[PROFILE] Profile update test completed successfully")
+            self.log("PROFILE", "Profile update test completed successfully")
             
             self.test_user['name'] = updated_name
             
@@ -297,7 +268,7 @@ class UserAccountTest(unittest.TestCase):
         driver = self.driver
         
         try:
-            print("[PASSWORD] Navigating to password reset page")
+            self.log("PASSWORD", "Navigating to password reset page")
             reset_urls = [
                 f"{self.base_url}/password/forgot",
                 f"{self.base_url}/forgot-password",
@@ -308,23 +279,23 @@ class UserAccountTest(unittest.TestCase):
             for url in reset_urls:
                 try:
                     driver.get(url)
-                    time.sleep(2)
+                    self.waiter.ready()
                     try:
                         self.find_element_with_multiple_strategies([
                             (By.ID, "email"),
                             (By.NAME, "email"),
                             (By.CSS_SELECTOR, "input[type='email']")
                         ])
-                        print(f"[PASSWORD] Found password reset page at {url}")
+                        self.log("PASSWORD", f"Found password reset page at {url}")
                         self.take_screenshot("password_reset_page")
                         break
                     except:
-                        print(f"[PASSWORD] {url} does not appear to be a password reset page")
+                        self.log("PASSWORD", f"{url} does not appear to be a password reset page")
                         continue
                 except:
                     continue
             
-            print(f"[PASSWORD] Entering email for password reset: {self.test_user['email']}")
+            self.log("PASSWORD", f"Entering email for password reset: {self.test_user['email']}")
             email_field = self.find_element_with_multiple_strategies([
                 (By.ID, "email"),
                 (By.NAME, "email"),
@@ -336,7 +307,7 @@ class UserAccountTest(unittest.TestCase):
             
             self.take_screenshot("password_reset_form_filled")
             
-            print("[PASSWORD] Submitting password reset request")
+            self.log("PASSWORD", "Submitting password reset request")
             submit_button = self.find_element_with_multiple_strategies([
                 (By.CSS_SELECTOR, "button[type='submit']"),
                 (By.XPATH, "//button[contains(text(), 'Reset')]"),
@@ -345,22 +316,18 @@ class UserAccountTest(unittest.TestCase):
             ])
             submit_button.click()
             
-            time.sleep(5)
+            self.waiter.ready(label="password reset submit")
             self.take_screenshot("after_password_reset")
             
             page_source = driver.page_source.lower()
             success = any(word in page_source for word in ["email", "sent", "reset", "success"])
             
             self.assertTrue(success, "Password reset success indicator not found")
-            print("[PASSWORD] Password reset test completed successfully")
+            self.log("PASSWORD", "Password reset test completed successfully")
             
         except Exception as e:
             self.take_screenshot("password_reset_error")
             self.fail(f"Password reset test failed: {str(e)}")
 
-    def tearDown(self):
-        if self.driver:
-            self.driver.quit()
-
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,169 @@
+import time
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+import settings
+from instrumentation import get_tracer
+from result_log import log
+
+# Counts in-flight XHR/fetch requests and remembers when the DOM or the network last changed.
+# Registered with Page.addScriptToEvaluateOnNewDocument so it runs before the app's own scripts.
+INSTRUMENT_JS = """
+(function () {
+  if (window.__shopitWait) { return; }
+  var state = window.__shopitWait = { pending: 0, lastChange: performance.now() };
+  function touch() { state.lastChange = performance.now(); }
+
+  var send = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function () {
+    state.pending++;
+    touch();
+    this.addEventListener('loadend', function () { state.pending--; touch(); });
+    return send.apply(this, arguments);
+  };
+
+  if (window.fetch) {
+    var fetch = window.fetch;
+    window.fetch = function () {
+      state.pending++;
+      touch();
+      return fetch.apply(this, arguments).finally(function () { state.pending--; touch(); });
+    };
+  }
+
+  new MutationObserver(touch).observe(document, {
+    childList: true, subtree: true, attributes: true, characterData: true
+  });
+})();
+"""
+
+# Locates a single (by, value) pair the same way find_element would, inside the page
+LOCATE_JS = """
+function locate(by, value) {
+  switch (by) {
+    case 'id': return document.getElementById(value);
+    case 'name': return document.querySelector('[name="' + value + '"]');
+    case 'tag name': return document.getElementsByTagName(value)[0] || null;
+    case 'class name': return document.getElementsByClassName(value)[0] || null;
+    case 'xpath':
+      return document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    case 'link text':
+    case 'partial link text':
+      var links = document.getElementsByTagName('a');
+      for (var i = 0; i < links.length; i++) {
+        var text = links[i].innerText.trim();
+        if (by === 'link text' ? text === value : text.indexOf(value) !== -1) { return links[i]; }
+      }
+      return null;
+    default: return document.querySelector(value);
+  }
+}
+"""
+
+PROBE_JS = LOCATE_JS + """
+var locator = arguments[0];
+var state = window.__shopitWait;
+if (!state) {
+  // The page was loaded without the init script (e.g. CDP unavailable); track from now on
+  eval(arguments[1]);
+  state = window.__shopitWait;
+}
+return {
+  readyState: document.readyState,
+  pending: state.pending,
+  quiet: performance.now() - state.lastChange,
+  element: locator ? locate(locator[0], locator[1]) : null
+};
+"""
+
+PRESENT_JS = LOCATE_JS + """
+var candidates = arguments[0];
+var present = [];
+for (var i = 0; i < candidates.length; i++) {
+  var element = null;
+  try { element = locate(candidates[i][0], candidates[i][1]); } catch (e) { /* invalid selector */ }
+  if (element) { present.push([i, element]); }
+}
+return present;
+"""
+
+
+def find_first(driver, strategies, timeout=10, poll=0.1, grace=settings.LOCATOR_GRACE):
+    """Check every (by, value) candidate in one script per poll tick; return (element, index, missed).
+
+    Only the top-ranked strategy can match during the first grace seconds, so a generic fallback that
+    renders first does not win over it. missed lists the strategies that never matched during the wait;
+    element and index are None when nothing matched in time.
+    """
+    candidates = [list(strategy) for strategy in strategies]
+    seen = set()
+    started = time.monotonic()
+
+    def first_match(driver):
+        present = driver.execute_script(PRESENT_JS, candidates)
+        seen.update(index for index, _ in present)
+        if present and (present[0][0] == 0 or time.monotonic() - started >= grace):
+            return present[0]
+        return False
+
+    with get_tracer().span("find_first", "lookup"):
+        try:
+            index, element = WebDriverWait(driver, timeout, poll_frequency=poll).until(first_match)
+        except TimeoutException:
+            index, element = None, None
+    missed = [strategy for i, strategy in enumerate(strategies[:index]) if i not in seen]
+    return element, index, missed
+
+
+def install_page_hooks(driver):
+    """Make every document the driver opens report its network and render activity"""
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": INSTRUMENT_JS})
+    except (AttributeError, WebDriverException) as e:
+        log("WAIT", f"Could not register page hooks, falling back to late injection: {str(e)}")
+
+
+class PageWaiter:
+    """Waits until the page has no pending requests, has stopped re-rendering and shows the target element"""
+
+    def __init__(self, driver, timeout=10, settle=0.15, poll=0.05):
+        self.driver = driver
+        self.timeout = timeout
+        self.settle = settle
+        self.poll = poll
+        self.timings = []
+
+    def ready(self, locator=None, timeout=None, label=None):
+        """Return the located element (or True without a locator), or None if the page never settled"""
+        timeout = self.timeout if timeout is None else timeout
+        label = label or (f"{locator[0]}={locator[1]}" if locator else self.driver.current_url)
+        settle_ms = self.settle * 1000
+        target = list(locator) if locator else None
+
+        def page_is_ready(driver):
+            state = driver.execute_script(PROBE_JS, target, INSTRUMENT_JS)
+            if state["readyState"] != "complete" or state["pending"] > 0 or state["quiet"] < settle_ms:
+                return False
+            if target:
+                return state["element"] or False
+            return True
+
+        started = time.monotonic()
+        try:
+            with get_tracer().span(label, "wait"):
+                result = WebDriverWait(self.driver, timeout, poll_frequency=self.poll).until(page_is_ready)
+        except TimeoutException:
+            result = None
+        elapsed = time.monotonic() - started
+
+        self.timings.append((label, elapsed, result is not None))
+        if result is None:
+            log("WAIT", f"{label} not ready after {elapsed:.2f}s")
+        else:
+            log("WAIT", f"{label} ready in {elapsed:.2f}s")
+        return result
+
+    def summary(self):
+        total = sum(elapsed for _, elapsed, _ in self.timings)
+        timed_out = sum(1 for _, _, ok in self.timings if not ok)
+        return f"{len(self.timings)} waits took {total:.2f}s ({timed_out} timed out)"
@@ -0,0 +1,218 @@
+import json
+import math
+import os
+import statistics
+from selenium.common.exceptions import WebDriverException
+
+import settings
+from impact import route_for
+from result_log import log
+
+# (metric, unit) in the order they are reported; times are milliseconds from the start of the navigation
+METRICS = [("ttfb", "ms"), ("fcp", "ms"), ("lcp", "ms"), ("domContentLoaded", "ms"), ("load", "ms"), ("cls", ""), ("longTaskTime", "ms")]
+# Smallest increase over the usual value worth a warning, so noise on fast pages stays quiet
+MIN_CHANGE = {"cls": 0.02}
+MIN_CHANGE_MS = 100
+
+# One entry per page a tab shows, kept in sessionStorage (cleared by reset_driver between tests) so it
+# survives full page loads. Client-side route changes start a "soft" entry that only collects CLS and long
+# tasks, since the browser reports paints and Navigation Timing once per document.
+VITALS_JS = """
+(function () {
+  if (window.__shopitVitalsHooks) { return; }
+  window.__shopitVitalsHooks = true;
+  var KEY = '__shopitVitals';
+  var page = { path: location.pathname, navigation: 'hard', fcp: null, lcp: null, cls: 0, longTasks: 0, longTaskTime: 0 };
+  var entry = page;
+  var index = null;
+
+  function save() {
+    try {
+      var entries = JSON.parse(sessionStorage.getItem(KEY) || '[]');
+      if (index === null) { index = entries.length; }
+      entries[index] = entry;
+      sessionStorage.setItem(KEY, JSON.stringify(entries));
+    } catch (e) {}
+  }
+
+  function observe(type, callback) {
+    try {
+      new PerformanceObserver(function (list) {
+        list.getEntries().forEach(callback);
+        save();
+      }).observe({ type: type, buffered: true });
+    } catch (e) {}
+  }
+
+  observe('paint', function (paint) {
+    if (paint.name === 'first-contentful-paint') { page.fcp = paint.startTime; }
+  });
+  observe('largest-contentful-paint', function (paint) {
+    if (entry === page) { page.lcp = paint.startTime; }
+  });
+  observe('layout-shift', function (shift) {
+    if (!shift.hadRecentInput) { entry.cls += shift.value; }
+  });
+  observe('longtask', function (task) {
+    entry.longTasks++;
+    entry.longTaskTime += task.duration;
+  });
+
+  window.addEventListener('load', function () {
+    // loadEventEnd is only filled in once the load handlers have returned
+    setTimeout(function () {
+      var timing = performance.getEntriesByType('navigation')[0];
+      if (!timing) { return; }
+      page.ttfb = timing.responseStart;
+      page.domContentLoaded = timing.domContentLoadedEventEnd;
+      page.load = timing.loadEventEnd;
+      save();
+    }, 0);
+  });
+
+  function routeChanged() {
+    if (location.pathname === entry.path) { return; }
+    save();
+    entry = { path: location.pathname, navigation: 'soft', cls: 0, longTasks: 0, longTaskTime: 0 };
+    index = null;
+    save();
+  }
+  ['pushState', 'replaceState'].forEach(function (name) {
+    var original = history[name];
+    history[name] = function () {
+      var result = original.apply(this, arguments);
+      routeChanged();
+      return result;
+    };
+  });
+  window.addEventListener('popstate', routeChanged);
+  save();
+})();
+"""
+
+
+def install_vitals_hooks(driver):
+    """Make every document the driver opens measure its own rendering"""
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": VITALS_JS})
+    except (AttributeError, WebDriverException) as e:
+        log("VITALS", f"Could not register Web Vitals hooks: {str(e)}")
+
+
+def collect(driver):
+    """Samples of the pages the current tab has shown since the browser was last reset, by App.js route"""
+    try:
+        entries = driver.execute_script("try { return window.sessionStorage.getItem('__shopitVitals'); } catch (e) { return null; }")
+    except WebDriverException:
+        return []
+    samples = []
+    for entry in json.loads(entries) if entries else []:
+        if entry:
+            samples.append(dict(entry, route=route_for(entry["path"])))
+    return samples
+
+
+def p75(values):
+    """75th percentile, the level Web Vitals are assessed at"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(0.75 * len(ordered)) - 1)]
+
+
+def summarize(samples):
+    """{route: {metric: p75, "samples": n}} over every sample that has the metric"""
+    routes = {}
+    for sample in samples:
+        routes.setdefault(sample["route"], []).append(sample)
+    summary = {}
+    for route, route_samples in sorted(routes.items()):
+        summary[route] = {"samples": len(route_samples)}
+        for metric, _ in METRICS:
+            values = [sample[metric] for sample in route_samples if sample.get(metric) is not None]
+            if values:
+                summary[route][metric] = p75(values)
+    return summary
+
+
+class VitalsHistory:
+    """Per-route p75 of every run, kept in one JSON file, checked against the budgets file"""
+
+    def __init__(self, path=settings.VITALS_HISTORY_FILE, budgets_path=settings.VITALS_BUDGETS_FILE, length=settings.VITALS_HISTORY_LENGTH):
+        self.path = path
+        self.length = length
+        self.routes = {}
+        self.budgets = {}
+        try:
+            with open(path) as f:
+                self.routes = json.load(f)
+        except (OSError, ValueError):
+            pass
+        try:
+            with open(budgets_path) as f:
+                self.budgets = json.load(f)
+        except OSError:
+            log("VITALS", f"No budgets file at {budgets_path}, only tracking history")
+
+    def budget(self, route):
+        """The "default" budgets with any route-specific ones laid over them"""
+        return dict(self.budgets.get("default", {}), **self.budgets.get(route, {}))
+
+    def baseline(self, route, metric):
+        """Median p75 over the recorded runs, or None before the first one"""
+        values = [run[metric] for run in self.routes.get(route, []) if metric in run]
+        return statistics.median(values) if values else None
+
+    def check(self, summary):
+        """(violations, warnings): routes over budget, and routes well above their usual value but still within it"""
+        violations = []
+        warnings = []
+        for route, measured in summary.items():
+            budget = self.budget(route)
+            for metric, _ in METRICS:
+                if metric not in measured:
+                    continue
+                value = measured[metric]
+                baseline = self.baseline(route, metric)
+                if metric in budget and value > budget[metric]:
+                    violations.append((route, metric, value, budget[metric], baseline))
+                elif baseline and value > baseline * settings.VITALS_REGRESSION and value - baseline > MIN_CHANGE.get(metric, MIN_CHANGE_MS):
+                    warnings.append((route, metric, value, budget.get(metric), baseline))
+        return violations, warnings
+
+    def add(self, run_id, summary):
+        for route, measured in summary.items():
+            runs = self.routes.setdefault(route, [])
+            runs.append(dict(measured, run=run_id))
+            del runs[:-self.length]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.routes, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+
+def _format(metric, value):
+    if value is None:
+        return "-"
+    return f"{value:.3f}" if metric == "cls" else f"{value:.0f}"
+
+
+def print_vitals(summary):
+    """One row per route with the p75 of each metric"""
+    if not summary:
+        return
+    width = max(len(route) for route in summary)
+    print(f"{'route':<{width}} {'pages':>5} " + " ".join(f"{metric:>16}" for metric, _ in METRICS))
+    for route, measured in summary.items():
+        cells = " ".join(f"{_format(metric, measured.get(metric)):>16}" for metric, _ in METRICS)
+        print(f"{route:<{width}} {measured['samples']:>5} {cells}")
+
+
+def print_budget_check(violations, warnings):
+    units = dict(METRICS)
+    for route, metric, value, budget, baseline in violations:
+        usual = f", usually {_format(metric, baseline)}{units[metric]}" if baseline is not None else ""
+        print(f"[VITALS] {route} {metric} {_format(metric, value)}{units[metric]} is over its budget of {_format(metric, budget)}{units[metric]}{usual}")
+    for route, metric, value, budget, baseline in warnings:
+        print(f"[VITALS] {route} {metric} {_format(metric, value)}{units[metric]} is up from a usual {_format(metric, baseline)}{units[metric]} (budget {_format(metric, budget)}{units[metric]})")
@@ -0,0 +1,64 @@
+import atexit
+import os
+import uuid
+
+from result_log import log
+
+# Set by run_tests.py for each worker process; empty when a module is run directly
+WORKER_ID = os.environ.get("TEST_WORKER_ID", "")
+RUN_ID = os.environ.get("TEST_RUN_ID") or uuid.uuid4().hex[:6]
+
+
+def namespace():
+    """Short token that is unique to this run and worker, for naming test data"""
+    if WORKER_ID:
+        return f"{RUN_ID}w{WORKER_ID}"
+    return RUN_ID
+
+
+def output_dir():
+    if WORKER_ID:
+        path = os.path.join("test_runs", RUN_ID, f"worker-{WORKER_ID}")
+    else:
+        path = "."
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def output_path(filename):
+    """Where this worker should write a result file such as test_user_credentials.txt"""
+    return os.path.join(output_dir(), filename)
+
+
+def screenshot_dir():
+    if WORKER_ID:
+        path = os.path.join(output_dir(), "screenshots")
+    else:
+        path = "screenshots"
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def screenshot_path(name):
+    return os.path.join(screenshot_dir(), f"{name}.png")
+
+
+_session_end_hooks = []
+
+
+def at_session_end(hook):
+    """Run hook once when this test process finishes, whether started directly or by run_tests.py"""
+    _session_end_hooks.append(hook)
+
+
+def run_session_end_hooks():
+    while _session_end_hooks:
+        hook = _session_end_hooks.pop()
+        try:
+            hook()
+        except Exception as e:
+            log("SESSION", f"Cleanup hook {getattr(hook, '__qualname__', hook)} failed: {str(e)}")
+
+
+# Runner workers exit through os._exit and call run_session_end_hooks() themselves
+atexit.register(run_session_end_hooks)